@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import collections
 import functools
+import itertools
 import logging
 import random
 import secrets
+import threading
 import warnings
 from argparse import Namespace
+from array import array
 from collections import Counter, deque, defaultdict
 from collections.abc import Collection, MutableSequence
 from enum import IntEnum, IntFlag
@@ -78,6 +81,12 @@ class MultiWorld():
     is_race: bool = False
     precollected_items: Dict[int, List[Item]]
     state: CollectionState
+    state_type: type[CollectionState]
+    _logic_mixin_functions: Tuple[Tuple[Any, ...], List[Callable[[CollectionState, MultiWorld], None]],
+                                  List[Callable[[CollectionState, CollectionState], CollectionState]]]
+    """CollectionState class used for the states that generation copies a lot, such as multiworld.state"""
+    sphere_analysis: Optional[SphereAnalysis]
+    """Spheres of the final placement, shared by everything inspecting them after analyze_spheres was called"""
 
     plando_options: PlandoOptions
     early_items: Dict[int, Dict[str, int]]
@@ -168,6 +177,9 @@ class MultiWorld():
         self.indirect_connections = {}
         self.start_inventory_from_pool: Dict[int, Options.StartInventoryPool] = {}
         self.plando_item_blocks = {}
+        self.state_type = CollectionState
+        self._logic_mixin_functions = ((), [], [])
+        self.sphere_analysis = None
 
         for player in range(1, players + 1):
             def set_player_attr(attr: str, val) -> None:
@@ -183,6 +195,26 @@ class MultiWorld():
     def get_all_ids(self) -> Tuple[int, ...]:
         return self.player_ids + tuple(self.groups)
 
+    def get_logic_mixin_functions(self) -> Tuple[List[Callable[[CollectionState, MultiWorld], None]],
+                                                 List[Callable[[CollectionState, CollectionState], CollectionState]]]:
+        """Returns the init_mixin and copy_mixin functions for CollectionStates of this MultiWorld, which are the
+        unscoped ones and those of the world packages present. Cached until the worlds or the registered hooks change."""
+        key = (CollectionState.logic_mixin_registrations, *map(type, self.worlds.values()))
+        cached_key, init_functions, copy_functions = self._logic_mixin_functions
+        if cached_key != key:
+            packages = {".".join(world_type.__module__.split(".", 2)[:2])
+                        for world in self.worlds.values() for world_type in type(world).__mro__}
+            packages.update(CollectionState.world_init_functions.keys() - CollectionState.world_packages)
+            packages.update(CollectionState.world_copy_functions.keys() - CollectionState.world_packages)
+            init_functions = CollectionState.additional_init_functions + [
+                function for package, functions in CollectionState.world_init_functions.items()
+                if package in packages for function in functions]
+            copy_functions = CollectionState.additional_copy_functions + [
+                function for package, functions in CollectionState.world_copy_functions.items()
+                if package in packages for function in functions]
+            self._logic_mixin_functions = (key, init_functions, copy_functions)
+        return init_functions, copy_functions
+
     def add_group(self, name: str, game: str, players: AbstractSet[int] = frozenset()) -> Tuple[int, Group]:
         """Create a group with name and return the assigned player ID and group.
         If a group of this name already exists, the set of players is extended instead of creating a new one."""
@@ -428,7 +460,8 @@ class MultiWorld():
         return self.regions.location_cache[player][location_name]
 
     def get_all_state(self, use_cache: bool | None = None, allow_partial_entrances: bool = False,
-                      collect_pre_fill_items: bool = True, perform_sweep: bool = True) -> CollectionState:
+                      collect_pre_fill_items: bool = True, perform_sweep: bool = True,
+                      state_type: type[CollectionState] | None = None) -> CollectionState:
         """
         Creates a new CollectionState, and collects all precollected items, all items in the multiworld itempool, those
         specified in each worlds' `get_pre_fill_items()`, and then sweeps the multiworld collecting any other items
@@ -441,6 +474,7 @@ class MultiWorld():
          state.
         :param perform_sweep: Whether this state should perform a sweep for reachable locations, collecting any placed
          items it can.
+        :param state_type: The type of CollectionState to create, defaulting to CollectionState.
 
         :return: The completed CollectionState.
         """
@@ -448,7 +482,7 @@ class MultiWorld():
             # TODO swap to Utils.deprecate when we want this to crash on source and warn on frozen
             warnings.warn("multiworld.get_all_state no longer caches all_state and this argument will be removed.",
                           DeprecationWarning)
-        ret = CollectionState(self, allow_partial_entrances)
+        ret = (state_type or CollectionState)(self, allow_partial_entrances)
 
         for item in self.itempool:
             self.worlds[item.player].collect(ret, item)
@@ -581,6 +615,14 @@ class MultiWorld():
 
         return False
 
+    def analyze_spheres(self) -> SphereAnalysis:
+        """
+        Analyzes the spheres of the final placement once, to be shared by get_spheres, get_sendable_spheres,
+        fulfills_accessibility and Spoiler.create_playthrough. Placement must not change afterwards.
+        """
+        self.sphere_analysis = SphereAnalysis(self)
+        return self.sphere_analysis
+
     def get_spheres(self) -> Iterator[Set[Location]]:
         """
         yields a set of locations for each logical sphere
@@ -589,24 +631,12 @@ class MultiWorld():
         locations is followed by an empty set, and then a set of all of the
         unreachable locations.
         """
-        state = CollectionState(self)
-        locations = set(self.get_filled_locations())
-
-        while locations:
-            sphere: Set[Location] = set()
-
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
-            yield sphere
-            if not sphere:
-                if locations:
-                    yield locations  # unreachable locations
-                break
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-            locations -= sphere
+        spheres, unreachable = (self.sphere_analysis or SphereAnalysis(self)).get_spheres()
+        for sphere in spheres:
+            yield set(sphere)
+        if unreachable:
+            yield set()
+            yield set(unreachable)  # unreachable locations
 
     def get_sendable_spheres(self) -> Iterator[Set[Location]]:
         """
@@ -615,46 +645,15 @@ class MultiWorld():
         If there are unreachable locations, the last sphere of reachable locations is followed by an empty set,
         and then a set of all of the unreachable locations.
         """
-        state = CollectionState(self)
-        locations: Set[Location] = set()
-        events: Set[Location] = set()
-        for location in self.get_filled_locations():
-            if type(location.item.code) is int and type(location.address) is int:
-                locations.add(location)
-            else:
-                events.add(location)
-
-        while locations:
-            sphere: Set[Location] = set()
-
-            # cull events out
-            done_events: Set[Union[Location, None]] = {None}
-            while done_events:
-                done_events = set()
-                for event in events:
-                    if event.can_reach(state):
-                        state.collect(event.item, True, event)
-                        done_events.add(event)
-                events -= done_events
-
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
-
-            yield sphere
-            if not sphere:
-                if locations:
-                    yield locations  # unreachable locations
-                break
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-            locations -= sphere
+        spheres, unreachable = (self.sphere_analysis or SphereAnalysis(self)).get_sendable_spheres()
+        for sphere in spheres:
+            yield set(sphere)
+        if unreachable:
+            yield set()
+            yield set(unreachable)  # unreachable locations
 
     def fulfills_accessibility(self, state: Optional[CollectionState] = None):
         """Check if accessibility rules are fulfilled with current or supplied state."""
-        if not state:
-            state = CollectionState(self)
         players: Dict[str, Set[int]] = {
             "minimal": set(),
             "items": set(),
@@ -682,8 +681,30 @@ class MultiWorld():
                 return False  # still locations required to be collected
             return True
 
+        def missing_required() -> bool:
+            """Report the relevant locations that cannot be reached"""
+            if __debug__:
+                from Fill import FillError
+                raise FillError(
+                    f"Could not access required locations for accessibility check. Missing: {locations}",
+                    multiworld=self,
+                )
+            # ran out of places and did not finish yet, quit
+            logging.warning(f"Could not access required locations for accessibility check."
+                            f" Missing: {locations}")
+            return False
+
         locations = [location for location in self.get_locations() if location_relevant(location)]
 
+        if not state and self.sphere_analysis and locations:
+            # the spheres were already swept, what is out of reach of the final state stays out of reach
+            locations, beatable_fulfilled = self.sphere_analysis.check_final_state(locations)
+            if all_done():
+                return True
+            return missing_required() if locations else False
+
+        if not state:
+            state = CollectionState(self)
         while locations:
             sphere: List[Location] = []
             for n in range(len(locations) - 1, -1, -1):
@@ -691,16 +712,7 @@ class MultiWorld():
                     sphere.append(locations.pop(n))
 
             if not sphere:
-                if __debug__:
-                    from Fill import FillError
-                    raise FillError(
-                        f"Could not access required locations for accessibility check. Missing: {locations}",
-                        multiworld=self,
-                    )
-                # ran out of places and did not finish yet, quit
-                logging.warning(f"Could not access required locations for accessibility check."
-                                f" Missing: {locations}")
-                return False
+                return missing_required()
 
             for location in sphere:
                 if location.item:
@@ -715,9 +727,564 @@ class MultiWorld():
         return False
 
 
+class SphereAnalysis:
+    """
+    Logical spheres of the filled advancement locations of a multiworld, found by sweeping them from a fresh state and
+    collecting everything reachable at once per sphere, like the spoiler playthrough does. Spheres of the other filled
+    locations are only swept for when a consumer asks for them.
+    Created by MultiWorld.analyze_spheres once the placement is final, so the consumers of the spheres after generation
+    share a single sweep.
+    """
+    multiworld: MultiWorld
+    spheres: List[Set[Location]]
+    """reachable filled advancement locations per sphere, none of them are empty"""
+    sphere_index: Dict[Location, int]
+    """index of the sphere each reachable filled advancement location is in"""
+    unreachable: Set[Location]
+    """filled advancement locations that cannot be reached"""
+    final_state: CollectionState
+    """State that collected every reachable advancement location"""
+    _all_spheres: Optional[Tuple[List[Set[Location]], Set[Location]]]
+    _sendable_spheres: Optional[Tuple[List[Set[Location]], Set[Location]]]
+    _lock: threading.Lock
+
+    def __init__(self, multiworld: MultiWorld) -> None:
+        self.multiworld = multiworld
+        self.spheres = []
+        self.sphere_index = {}
+        self._all_spheres = None
+        self._sendable_spheres = None
+        self._lock = threading.Lock()
+
+        state = multiworld.state_type(multiworld)
+        locations = {location for location in multiworld.get_filled_locations() if location.item.advancement}
+        location_dependencies = state._track_location_dependencies(locations)
+        untracked_locations = {location for location in locations if location.player not in location_dependencies}
+
+        while locations:
+            sphere: Set[Location] = set()
+
+            for location in untracked_locations:
+                if location.can_reach(state):
+                    sphere.add(location)
+            for player, dependencies in location_dependencies.items():
+                sphere.update(state._reach_tracked_locations(player, dependencies))
+            if not sphere:
+                break
+
+            for location in sphere:
+                self.sphere_index[location] = len(self.spheres)
+                state.collect(location.item, True, location)
+            self.spheres.append(sphere)
+            locations -= sphere
+            untracked_locations -= sphere
+
+        self.final_state = state
+        self.unreachable = locations
+
+    def get_sphere_states(self) -> List[CollectionState]:
+        """
+        Returns a state per sphere that has collected the spheres before it, followed by one that collected all of them.
+        These are not kept, as only the playthrough needs them.
+        """
+        state = self.multiworld.state_type(self.multiworld)
+        states: List[CollectionState] = []
+        for sphere in self.spheres:
+            states.append(state.copy())
+            for location in sphere:
+                state.collect(location.item, True, location)
+        states.append(state)
+        return states
+
+    def check_final_state(self, locations: Iterable[Location]) -> Tuple[List[Location], bool]:
+        """
+        Returns the locations the final state cannot reach, and whether it has beaten the game.
+        Locked, as output threads share the analysis.
+        """
+        with self._lock:
+            final_state = self.final_state.copy()
+            # some worlds also count items that are not advancement, so collect whatever else can be reached as well
+            remaining = {location for location in self.multiworld.get_filled_locations()
+                         if location not in self.sphere_index}
+            while True:
+                sphere = {location for location in remaining if location.can_reach(final_state)}
+                if not sphere:
+                    break
+                for location in sphere:
+                    final_state.collect(location.item, True, location)
+                remaining -= sphere
+            return ([location for location in locations if not location.can_reach(final_state)],
+                    self.multiworld.has_beaten_game(final_state))
+
+    def _reached(self, location: Location, sphere_number: int, state: CollectionState) -> bool:
+        """Whether location is reachable in sphere_number of a sweep whose state collected at least the earlier spheres"""
+        index = self.sphere_index.get(location)
+        return (index is not None and index <= sphere_number) or location.can_reach(state)
+
+    @staticmethod
+    def is_sendable(location: Location) -> bool:
+        """Whether the multiserver can send the item at this location, as opposed to an event."""
+        return type(location.item.code) is int and type(location.address) is int
+
+    def get_spheres(self) -> Tuple[List[Set[Location]], Set[Location]]:
+        """
+        Spheres of all reachable filled locations and the unreachable filled locations.
+        Computed when first requested.
+        """
+        with self._lock:
+            if self._all_spheres is None:
+                self._all_spheres = self._sweep_all_spheres()
+        return self._all_spheres
+
+    def _sweep_all_spheres(self) -> Tuple[List[Set[Location]], Set[Location]]:
+        # Some worlds also count items that are not advancement, which can only ever reach locations sooner, so an
+        # advancement location of sphere n is always in sphere n or earlier and only has to be tested in earlier spheres.
+        state = self.multiworld.state_type(self.multiworld)
+        locations = set(self.multiworld.get_filled_locations())
+
+        spheres: List[Set[Location]] = []
+        while locations:
+            sphere = {location for location in locations if self._reached(location, len(spheres), state)}
+            if not sphere:
+                break
+
+            for location in sphere:
+                state.collect(location.item, True, location)
+            locations -= sphere
+            spheres.append(sphere)
+
+        return spheres, locations
+
+    def get_sendable_spheres(self) -> Tuple[List[Set[Location]], Set[Location]]:
+        """
+        Spheres of the reachable sendable locations, where all reachable events are collected before each sphere, and
+        the unreachable sendable locations.
+        Computed when first requested.
+        """
+        with self._lock:
+            if self._sendable_spheres is None:
+                self._sendable_spheres = self._sweep_sendable_spheres()
+        return self._sendable_spheres
+
+    def _sweep_sendable_spheres(self) -> Tuple[List[Set[Location]], Set[Location]]:
+        # Collecting events early only ever reaches locations sooner, so an advancement location of sphere n is always
+        # in sendable sphere n or earlier and only has to be tested in earlier spheres.
+        state = self.multiworld.state_type(self.multiworld)
+        locations: Set[Location] = set()
+        events: Set[Location] = set()
+        for location in self.multiworld.get_filled_locations():
+            if self.is_sendable(location):
+                locations.add(location)
+            else:
+                events.add(location)
+
+        sendable_spheres: List[Set[Location]] = []
+        while locations:
+            sphere_number = len(sendable_spheres)
+
+            # cull events out
+            done_events: Set[Location] = {event for event in events if self._reached(event, sphere_number, state)}
+            while done_events:
+                for event in done_events:
+                    state.collect(event.item, True, event)
+                events -= done_events
+                done_events = {event for event in events if event.can_reach(state)}
+
+            sphere = {location for location in locations if self._reached(location, sphere_number, state)}
+            if not sphere:
+                break
+
+            for location in sphere:
+                state.collect(location.item, True, location)
+            locations -= sphere
+            sendable_spheres.append(sphere)
+
+        return sendable_spheres, locations
+
+
 PathValue = Tuple[str, Optional["PathValue"]]
 
 
+class TrackingCounter(Counter):
+    """
+    Counter used as `CollectionState.prog_items` for worlds with incremental reachability.
+    It records which item names were looked up while `reads` is set, and which item names were changed since the last
+    time `changed` was cleared.
+    """
+    reads: Optional[Set[str]]
+    changed: Set[str]
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.reads = None
+        self.changed = set()
+        super().__init__(*args, **kwargs)
+
+    def __getitem__(self, item: str) -> int:
+        if self.reads is not None:
+            self.reads.add(item)
+        return super().__getitem__(item)
+
+    def __contains__(self, item: object) -> bool:
+        if self.reads is not None:
+            self.reads.add(item)
+        return super().__contains__(item)
+
+    def get(self, item: str, default: Any = None) -> Any:
+        if self.reads is not None:
+            self.reads.add(item)
+        return super().get(item, default)
+
+    def __setitem__(self, item: str, count: int) -> None:
+        self.changed.add(item)
+        super().__setitem__(item, count)
+
+    def __delitem__(self, item: str) -> None:
+        self.changed.add(item)
+        super().__delitem__(item)
+
+    def pop(self, item: str, *args: Any) -> Any:
+        self.changed.add(item)
+        return super().pop(item, *args)
+
+    def clear(self) -> None:
+        self.changed.update(self)
+        super().clear()
+
+    def copy(self) -> TrackingCounter:
+        ret = self.__class__()
+        dict.update(ret, self)
+        ret.changed = self.changed.copy()
+        return ret
+
+
+class IndexedItems(NamedTuple):
+    """A collection of item names precompiled against an ItemIndex, see `World.index_items`."""
+    names: Tuple[str, ...]
+    """all item names, used when prog_items is not an IndexedCounter"""
+    indices: Tuple[int, ...]
+    """indices into IndexedCounter.counts of the indexed item names"""
+    mask: int
+    """bitmask of indices"""
+    unindexed: Tuple[str, ...]
+    """item names without an index, such as events, which are looked up by name"""
+
+
+class ItemIndex:
+    """Per World type table of item name -> index into IndexedCounter.counts, built from item_name_to_id."""
+    __slots__ = ("name_to_index", "item_name_groups", "groups")
+
+    name_to_index: Dict[str, int]
+    item_name_groups: Mapping[str, AbstractSet[str]]
+    groups: Dict[str, IndexedItems]
+    """lazily compiled item_name_groups"""
+
+    def __init__(self, item_name_to_id: Mapping[str, int], item_name_groups: Mapping[str, AbstractSet[str]]) -> None:
+        self.name_to_index = {name: index for index, name in
+                              enumerate(sorted(item_name_to_id, key=item_name_to_id.__getitem__))}
+        self.item_name_groups = item_name_groups
+        self.groups = {}
+
+    def __len__(self) -> int:
+        return len(self.name_to_index)
+
+    def compile(self, item_names: Iterable[str]) -> IndexedItems:
+        names = tuple(dict.fromkeys(item_names))
+        name_to_index = self.name_to_index
+        indices = tuple(name_to_index[name] for name in names if name in name_to_index)
+        mask = 0
+        for index in indices:
+            mask |= 1 << index
+        return IndexedItems(names, indices, mask, tuple(name for name in names if name not in name_to_index))
+
+    def group(self, item_name_group: str) -> IndexedItems:
+        try:
+            return self.groups[item_name_group]
+        except KeyError:
+            items = self.groups[item_name_group] = self.compile(self.item_name_groups[item_name_group])
+            return items
+
+
+class IndexedCounter(Counter):
+    """
+    Counter used as `CollectionState.prog_items` for worlds with indexed_prog_items.
+    Counts of item names known to `item_index` are mirrored into the fixed-width int array `counts`, and `present` is a
+    bitmask of the indices of item names with a positive count, so that IndexedItems can be checked without hashing
+    item names. Counts of indexed item names have to be ints.
+    """
+    item_index: ItemIndex
+    counts: array
+    present: int
+
+    def __init__(self, item_index: ItemIndex, *args: Any, **kwargs: Any) -> None:
+        self.item_index = item_index
+        self.counts = array("q", bytes(8 * len(item_index)))
+        self.present = 0
+        super().__init__(*args, **kwargs)
+
+    def _mirror(self, item: str, count: int) -> None:
+        index = self.item_index.name_to_index.get(item)
+        if index is not None:
+            self.counts[index] = count
+            if count > 0:
+                self.present |= 1 << index
+            else:
+                self.present &= ~(1 << index)
+
+    def __setitem__(self, item: str, count: int) -> None:
+        super().__setitem__(item, count)
+        self._mirror(item, count)
+
+    def __delitem__(self, item: str) -> None:
+        super().__delitem__(item)
+        self._mirror(item, 0)
+
+    def pop(self, item: str, *args: Any) -> Any:
+        ret = super().pop(item, *args)
+        self._mirror(item, 0)
+        return ret
+
+    def popitem(self) -> Tuple[str, int]:
+        item, count = super().popitem()
+        self._mirror(item, 0)
+        return item, count
+
+    def setdefault(self, item: str, default: int = 0) -> int:
+        if item not in self:
+            self[item] = default
+        return self[item]
+
+    def clear(self) -> None:
+        super().clear()
+        self.counts = array("q", bytes(8 * len(self.item_index)))
+        self.present = 0
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        # Counter.update skips __setitem__ when empty, so resync everything
+        super().update(*args, **kwargs)
+        for item, count in self.items():
+            self._mirror(item, count)
+
+    def copy(self) -> IndexedCounter:
+        ret = self.__class__.__new__(self.__class__)
+        dict.update(ret, self)
+        ret.item_index = self.item_index
+        ret.counts = self.counts[:]
+        ret.present = self.present
+        return ret
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return self.__class__, (self.item_index, dict(self))
+
+    def has_all_items(self, items: IndexedItems) -> bool:
+        if self.present & items.mask != items.mask:
+            return False
+        for item in items.unindexed:
+            if not self[item]:
+                return False
+        return True
+
+    def has_any_items(self, items: IndexedItems) -> bool:
+        if self.present & items.mask:
+            return True
+        for item in items.unindexed:
+            if self[item]:
+                return True
+        return False
+
+    def count_items(self, items: IndexedItems) -> int:
+        total = sum(map(self.counts.__getitem__, items.indices))
+        for item in items.unindexed:
+            total += self[item]
+        return total
+
+    def count_items_unique(self, items: IndexedItems) -> int:
+        total = (self.present & items.mask).bit_count()
+        for item in items.unindexed:
+            total += self[item] > 0
+        return total
+
+
+class TrackingIndexedCounter(TrackingCounter, IndexedCounter):
+    """
+    Counter used as `CollectionState.prog_items` for worlds with both incremental_reachability and indexed_prog_items.
+    Checks of IndexedItems record all of their item names as read, as they don't look them up by name.
+    """
+
+    def __init__(self, item_index: ItemIndex, *args: Any, **kwargs: Any) -> None:
+        super().__init__(item_index, *args, **kwargs)
+
+    def copy(self) -> TrackingIndexedCounter:
+        ret = IndexedCounter.copy(self)
+        ret.reads = None
+        ret.changed = self.changed.copy()
+        return ret
+
+    def has_all_items(self, items: IndexedItems) -> bool:
+        if self.reads is not None:
+            self.reads.update(items.names)
+        return super().has_all_items(items)
+
+    def has_any_items(self, items: IndexedItems) -> bool:
+        if self.reads is not None:
+            self.reads.update(items.names)
+        return super().has_any_items(items)
+
+    def count_items(self, items: IndexedItems) -> int:
+        if self.reads is not None:
+            self.reads.update(items.names)
+        return super().count_items(items)
+
+    def count_items_unique(self, items: IndexedItems) -> int:
+        if self.reads is not None:
+            self.reads.update(items.names)
+        return super().count_items_unique(items)
+
+
+class EntranceDependencies:
+    """
+    Remembers, for one player, which item names each blocked Entrance looked up the last time its access failed, so
+    that only the Entrances depending on changed items have to be tested again.
+    """
+    __slots__ = ("dependents", "tested")
+
+    dependents: Dict[Optional[str], Set[Entrance]]
+    """item name -> blocked Entrances that read it. None holds Entrances that read no items, which are always retested"""
+    tested: Set[Entrance]
+    """blocked Entrances with a known failure"""
+
+    def __init__(self) -> None:
+        self.dependents = {}
+        self.tested = set()
+
+    def add_failure(self, entrance: Entrance, reads: Set[str]) -> None:
+        self.tested.add(entrance)
+        dependents = self.dependents
+        if reads:
+            for item in reads:
+                if item in dependents:
+                    dependents[item].add(entrance)
+                else:
+                    dependents[item] = {entrance}
+        elif None in dependents:
+            dependents[None].add(entrance)
+        else:
+            dependents[None] = {entrance}
+
+    def pop_retests(self, changed: Iterable[str], blocked_connections: Set[Entrance]) -> Set[Entrance]:
+        """Returns the blocked Entrances that have to be tested again after the items in `changed` changed."""
+        dependents = self.dependents
+        retests = dependents.pop(None, set())
+        for item in changed:
+            if item in dependents:
+                retests |= dependents.pop(item)
+        tested = self.tested
+        tested -= retests
+        # Entrances added to blocked_connections from outside the search, for example by entrance randomization, have
+        # never been tested.
+        retests |= blocked_connections - tested
+        retests &= blocked_connections
+        return retests
+
+    def copy(self) -> EntranceDependencies:
+        ret = EntranceDependencies()
+        ret.dependents = {item: entrances.copy() for item, entrances in self.dependents.items()}
+        ret.tested = self.tested.copy()
+        return ret
+
+
+class _RegionReadRecorder(dict):
+    """Stands in for CollectionState.reachable_regions to notice access rules checking Region reachability."""
+    read: bool = False
+
+    def __getitem__(self, player: int) -> Set[Region]:
+        self.read = True
+        return super().__getitem__(player)
+
+
+class LocationDependencies:
+    """
+    Remembers, for the unreachable Locations of one player, what they failed on the last time they were tested: item
+    names their access rule looked up, their unreachable parent Region or Region reachability in general. Used by
+    sweeps over worlds with incremental_reachability to only test Locations again once one of those changed.
+    """
+    __slots__ = ("order", "pending", "untested", "dependents", "counts", "region_dependents",
+                 "reachability_dependents", "regions_reached", "untracked")
+
+    order: Dict[Location, int]
+    """Location -> position, to test Locations in their original order"""
+    pending: Set[Location]
+    """Locations that were not found reachable yet"""
+    untested: Set[Location]
+    dependents: Dict[str, Set[Location]]
+    """item name -> Locations whose access rule read it"""
+    counts: Dict[str, int]
+    """item name -> count when it was read"""
+    region_dependents: Dict[Region, Set[Location]]
+    """unreachable parent Region -> its Locations"""
+    reachability_dependents: Set[Location]
+    """Locations whose access rule checked Region reachability"""
+    regions_reached: int
+    """number of reachable Regions when reachability_dependents were tested"""
+    untracked: Set[Location]
+    """Locations whose access rule read nothing, which are always tested again"""
+
+    def __init__(self, locations: Iterable[Location]) -> None:
+        self.order = {location: index for index, location in enumerate(locations)}
+        self.pending = set(self.order)
+        self.untested = set(self.order)
+        self.dependents = {}
+        self.counts = {}
+        self.region_dependents = {}
+        self.reachability_dependents = set()
+        self.regions_reached = 0
+        self.untracked = set()
+
+    def add_failure(self, location: Location, reads: Set[str], prog_items: Counter[str], read_regions: bool) -> None:
+        dependents = self.dependents
+        for item in reads:
+            if item in dependents:
+                dependents[item].add(location)
+            else:
+                dependents[item] = {location}
+                self.counts[item] = prog_items[item]
+        if read_regions:
+            self.reachability_dependents.add(location)
+        elif not reads:
+            self.untracked.add(location)
+
+    def add_region_failure(self, location: Location) -> None:
+        region = location.parent_region
+        if region in self.region_dependents:
+            self.region_dependents[region].add(location)
+        else:
+            self.region_dependents[region] = {location}
+
+    def pop_retests(self, prog_items: Counter[str], reachable_regions: Set[Region]) -> List[Location]:
+        """Returns the pending Locations that have to be tested again, in their original order."""
+        retests = self.untested
+        self.untested = set()
+        retests |= self.untracked
+        self.untracked = set()
+        counts = self.counts
+        changed = [item for item, count in counts.items() if prog_items[item] != count]
+        for item in changed:
+            del counts[item]
+            retests |= self.dependents.pop(item)
+        if self.region_dependents:
+            for region in [region for region in self.region_dependents if region in reachable_regions]:
+                retests |= self.region_dependents.pop(region)
+        if len(reachable_regions) != self.regions_reached:
+            self.regions_reached = len(reachable_regions)
+            retests |= self.reachability_dependents
+            self.reachability_dependents = set()
+        # Locations can still be listed under items that did not change, even after they were retested or reached
+        retests &= self.pending
+        return sorted(retests, key=self.order.__getitem__)
+
+
+_item_generations = itertools.count()
+
+
 class CollectionState():
     prog_items: Dict[int, Counter[str]]
     multiworld: MultiWorld
@@ -728,12 +1295,34 @@ class CollectionState():
     locations_checked: Set[Location]
     stale: Dict[int, bool]
     allow_partial_entrances: bool
+    entrance_dependencies: Dict[int, EntranceDependencies]
+    """per player dependency tracking of blocked Entrances, only for worlds with incremental_reachability"""
+    item_generations: Dict[int, int]
+    """per player number that changes whenever prog_items are changed through CollectionState's methods. States with
+    the same number for a player hold the same prog_items for them."""
     additional_init_functions: List[Callable[[CollectionState, MultiWorld], None]] = []
     additional_copy_functions: List[Callable[[CollectionState, CollectionState], CollectionState]] = []
+    """init_mixin and copy_mixin of LogicMixins outside of world packages, which run for every MultiWorld"""
+    world_init_functions: Dict[str, List[Callable[[CollectionState, MultiWorld], None]]] = {}
+    world_copy_functions: Dict[str, List[Callable[[CollectionState, CollectionState], CollectionState]]] = {}
+    """init_mixin and copy_mixin of LogicMixins by world package ("worlds.name"). Those of packages in world_packages
+    only run for MultiWorlds containing a world from that package, see MultiWorld.get_logic_mixin_functions"""
+    world_packages: Set[str] = set()
+    """world packages that registered a World"""
+    logic_mixin_registrations: int = 0
+    """changes whenever LogicMixin hooks or world_packages change"""
 
     def __init__(self, parent: MultiWorld, allow_partial_entrances: bool = False):
         assert parent.worlds, "CollectionState created without worlds initialized in parent"
         self.prog_items = {player: Counter() for player in parent.get_all_ids()}
+        self.entrance_dependencies = {}
+        for player, world in parent.worlds.items():
+            if world.incremental_reachability:
+                self.prog_items[player] = TrackingIndexedCounter(world.item_index) if world.indexed_prog_items \
+                    else TrackingCounter()
+                self.entrance_dependencies[player] = EntranceDependencies()
+            elif world.indexed_prog_items:
+                self.prog_items[player] = IndexedCounter(world.item_index)
         self.multiworld = parent
         self.reachable_regions = {player: set() for player in parent.get_all_ids()}
         self.blocked_connections = {player: set() for player in parent.get_all_ids()}
@@ -741,8 +1330,9 @@ class CollectionState():
         self.path = {}
         self.locations_checked = set()
         self.stale = {player: True for player in parent.get_all_ids()}
+        self.item_generations = {player: next(_item_generations) for player in parent.get_all_ids()}
         self.allow_partial_entrances = allow_partial_entrances
-        for function in self.additional_init_functions:
+        for function in parent.get_logic_mixin_functions()[0]:
             function(self, parent)
         for items in parent.precollected_items.values():
             for item in items:
@@ -752,7 +1342,9 @@ class CollectionState():
         self.stale[player] = False
         world: AutoWorld.World = self.multiworld.worlds[player]
         reachable_regions = self.reachable_regions[player]
-        queue = deque(self.blocked_connections[player])
+        incremental = player in self.entrance_dependencies
+        # the incremental search builds its own queue from the recorded dependencies
+        queue = deque() if incremental else deque(self.blocked_connections[player])
         start: Region = world.get_region(world.origin_region_name)
 
         # init on first call - this can't be done on construction since the regions don't exist yet
@@ -760,8 +1352,13 @@ class CollectionState():
             reachable_regions.add(start)
             self.blocked_connections[player].update(start.exits)
             queue.extend(start.exits)
+            if incremental:
+                # anything recorded about blocked connections belongs to a previous search
+                self.entrance_dependencies[player] = EntranceDependencies()
 
-        if world.explicit_indirect_conditions:
+        if incremental:
+            self._update_reachable_regions_incremental(player, world.explicit_indirect_conditions)
+        elif world.explicit_indirect_conditions:
             self._update_reachable_regions_explicit_indirect_conditions(player, queue)
         else:
             self._update_reachable_regions_auto_indirect_conditions(player, queue)
@@ -815,6 +1412,54 @@ class CollectionState():
             # sweep for indirect connections, mostly Entrance.can_reach(unrelated_Region)
             queue.extend(blocked_connections)
 
+    def _update_reachable_regions_incremental(self, player: int, explicit_indirect_conditions: bool):
+        reachable_regions = self.reachable_regions[player]
+        blocked_connections = self.blocked_connections[player]
+        dependencies = self.entrance_dependencies[player]
+        player_prog_items: TrackingCounter = self.prog_items[player]
+        queue = deque(dependencies.pop_retests(player_prog_items.changed, blocked_connections))
+        player_prog_items.changed = set()
+        # only retest the blocked connections that looked up a changed item, or ones that were never tested
+        while True:
+            new_region_found = False
+            while queue:
+                connection = queue.popleft()
+                new_region = connection.connected_region
+                if new_region in reachable_regions:
+                    blocked_connections.discard(connection)
+                    continue
+                player_prog_items.reads = reads = set()
+                try:
+                    reached = connection.can_reach(self)
+                finally:
+                    player_prog_items.reads = None
+                if not reached:
+                    dependencies.add_failure(connection, reads)
+                    continue
+                if self.allow_partial_entrances and not new_region:
+                    # has to be retested once it is connected
+                    dependencies.add_failure(connection, set())
+                    continue
+                assert new_region, f"tried to search through an Entrance \"{connection}\" with no connected Region"
+                reachable_regions.add(new_region)
+                blocked_connections.remove(connection)
+                blocked_connections.update(new_region.exits)
+                queue.extend(new_region.exits)
+                self.path[new_region] = (new_region.name, self.path.get(connection, None))
+                new_region_found = True
+
+                if explicit_indirect_conditions:
+                    # Retry connections if the new region can unblock them
+                    for new_entrance in self.multiworld.indirect_connections.get(new_region, set()):
+                        if new_entrance in blocked_connections:
+                            queue.append(new_entrance)
+
+            if explicit_indirect_conditions or not new_region_found:
+                break
+            # Entrance.can_reach(unrelated_Region) is not recorded, so every blocked connection is retested whenever new
+            # regions were found
+            queue.extend(blocked_connections)
+
     def copy(self) -> CollectionState:
         ret = CollectionState(self.multiworld)
         ret.prog_items = {player: counter.copy() for player, counter in self.prog_items.items()}
@@ -825,8 +1470,11 @@ class CollectionState():
         ret.advancements = self.advancements.copy()
         ret.path = self.path.copy()
         ret.locations_checked = self.locations_checked.copy()
+        ret.item_generations = self.item_generations.copy()
         ret.allow_partial_entrances = self.allow_partial_entrances
-        for function in self.additional_copy_functions:
+        ret.entrance_dependencies = {player: dependencies.copy() for player, dependencies in
+                                     self.entrance_dependencies.items()}
+        for function in self.multiworld.get_logic_mixin_functions()[1]:
             ret = function(self, ret)
         return ret
 
@@ -855,6 +1503,55 @@ class CollectionState():
     def can_reach_region(self, spot: str, player: int) -> bool:
         return self.multiworld.get_region(spot, player).can_reach(self)
 
+    def _track_location_dependencies(self, locations: Iterable[Location]) -> Dict[int, LocationDependencies]:
+        """Returns LocationDependencies of the locations of players whose world has incremental_reachability."""
+        if not self.entrance_dependencies:
+            return {}
+        locations_per_player: Dict[int, List[Location]] = defaultdict(list)
+        for location in locations:
+            if location.player in self.entrance_dependencies:
+                locations_per_player[location.player].append(location)
+        return {player: LocationDependencies(player_locations)
+                for player, player_locations in locations_per_player.items()}
+
+    def _reach_tracked_locations(self, player: int, dependencies: LocationDependencies) -> List[Location]:
+        """
+        Tests the pending Locations of `dependencies` that may have become reachable and returns the reachable ones.
+        The others are remembered with what they failed on.
+        """
+        if self.stale[player]:
+            self.update_reachable_regions(player)
+        reachable_regions = self.reachable_regions[player]
+        player_prog_items: TrackingCounter = self.prog_items[player]
+        retests = dependencies.pop_retests(player_prog_items, reachable_regions)
+        if not retests:
+            return []
+        reachable_locations: List[Location] = []
+        # Location.can_reach is split up to check the parent Region separately from reachability checks in access rules
+        all_reachable_regions = self.reachable_regions
+        self.reachable_regions = recorder = _RegionReadRecorder(all_reachable_regions)
+        try:
+            for location in retests:
+                if location.parent_region not in reachable_regions:
+                    dependencies.add_region_failure(location)
+                    continue
+                recorder.read = False
+                player_prog_items.reads = reads = set()
+                try:
+                    reached = location.access_rule(self)
+                finally:
+                    player_prog_items.reads = None
+                if reached:
+                    dependencies.pending.remove(location)
+                    reachable_locations.append(location)
+                else:
+                    dependencies.add_failure(location, reads, player_prog_items, recorder.read)
+        finally:
+            # searches run from within access rules may have replaced per player sets
+            all_reachable_regions.update(recorder)
+            self.reachable_regions = all_reachable_regions
+        return reachable_locations
+
     def sweep_for_events(self, locations: Optional[Iterable[Location]] = None) -> None:
         Utils.deprecate("sweep_for_events has been renamed to sweep_for_advancements. The functionality is the same. "
                         "Please switch over to sweep_for_advancements.")
@@ -868,6 +1565,9 @@ class CollectionState():
         """
         all_players = {player for player, _ in advancements_per_player}
         players_to_check = all_players
+        # Locations of worlds with incremental_reachability are only tested again once what they failed on changed.
+        location_dependencies = self._track_location_dependencies(
+            location for _, locations in advancements_per_player for location in locations)
         # As an optimization, it is assumed that each player's world only logically depends on itself. However, worlds
         # are allowed to logically depend on other worlds, so once there are no more players that should be checked
         # under this assumption, an extra sweep iteration is performed that checks every player, to confirm that the
@@ -886,14 +1586,23 @@ class CollectionState():
                 # stale whenever one of their own items is collected into the state.
                 reachable_locations: List[Location] = []
                 unreachable_locations: List[Location] = []
-                for location in locations:
-                    if location.can_reach(self):
-                        # Locations containing items that do not belong to `player` could be collected immediately
-                        # because they won't stale `player`'s region accessibility cache, but, for simplicity, all the
-                        # items at reachable locations are collected in a single loop.
-                        reachable_locations.append(location)
+                dependencies = location_dependencies.get(player)
+                if dependencies is not None:
+                    reachable_locations = self._reach_tracked_locations(player, dependencies)
+                    if reachable_locations:
+                        unreachable_locations = [location for location in locations
+                                                 if location in dependencies.pending]
                     else:
-                        unreachable_locations.append(location)
+                        unreachable_locations = locations
+                else:
+                    for location in locations:
+                        if location.can_reach(self):
+                            # Locations containing items that do not belong to `player` could be collected immediately
+                            # because they won't stale `player`'s region accessibility cache, but, for simplicity, all
+                            # the items at reachable locations are collected in a single loop.
+                            reachable_locations.append(location)
+                        else:
+                            unreachable_locations.append(location)
                 if unreachable_locations:
                     next_advancements_per_player.append((player, unreachable_locations))
 
@@ -1011,6 +1720,28 @@ class CollectionState():
                 return True
         return False
 
+    def has_all_indexed(self, items: IndexedItems, player: int) -> bool:
+        """Returns True if each item name of items, precompiled with World.index_items, is in state at least once."""
+        player_prog_items = self.prog_items[player]
+        if isinstance(player_prog_items, IndexedCounter):
+            return player_prog_items.has_all_items(items)
+        return self.has_all(items.names, player)
+
+    def has_any_indexed(self, items: IndexedItems, player: int) -> bool:
+        """Returns True if at least one item name of items, precompiled with World.index_items, is in state at least
+        once."""
+        player_prog_items = self.prog_items[player]
+        if isinstance(player_prog_items, IndexedCounter):
+            return player_prog_items.has_any_items(items)
+        return self.has_any(items.names, player)
+
+    def count_indexed(self, items: IndexedItems, player: int) -> int:
+        """Returns the cumulative count of items, precompiled with World.index_items, present in state."""
+        player_prog_items = self.prog_items[player]
+        if isinstance(player_prog_items, IndexedCounter):
+            return player_prog_items.count_items(items)
+        return self.count_from_list(items.names, player)
+
     def has_all_counts(self, item_counts: Mapping[str, int], player: int) -> bool:
         """Returns True if each item name is in the state at least as many times as specified."""
         player_prog_items = self.prog_items[player]
@@ -1071,8 +1802,13 @@ class CollectionState():
     # item name group related
     def has_group(self, item_name_group: str, player: int, count: int = 1) -> bool:
         """Returns True if the state contains at least `count` items present in a specified item group."""
-        found: int = 0
         player_prog_items = self.prog_items[player]
+        if isinstance(player_prog_items, IndexedCounter):
+            items = player_prog_items.item_index.group(item_name_group)
+            if count == 1:
+                return player_prog_items.has_any_items(items)
+            return player_prog_items.count_items(items) >= count
+        found: int = 0
         for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]:
             found += player_prog_items[item_name]
             if found >= count:
@@ -1083,8 +1819,10 @@ class CollectionState():
         """Returns True if the state contains at least `count` items present in a specified item group.
         Ignores duplicates of the same item.
         """
-        found: int = 0
         player_prog_items = self.prog_items[player]
+        if isinstance(player_prog_items, IndexedCounter):
+            return player_prog_items.count_items_unique(player_prog_items.item_index.group(item_name_group)) >= count
+        found: int = 0
         for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]:
             found += player_prog_items[item_name] > 0
             if found >= count:
@@ -1094,6 +1832,8 @@ class CollectionState():
     def count_group(self, item_name_group: str, player: int) -> int:
         """Returns the cumulative count of items from an item group present in state."""
         player_prog_items = self.prog_items[player]
+        if isinstance(player_prog_items, IndexedCounter):
+            return player_prog_items.count_items(player_prog_items.item_index.group(item_name_group))
         return sum(
             player_prog_items[item_name]
             for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]
@@ -1103,6 +1843,8 @@ class CollectionState():
         """Returns the cumulative count of items from an item group present in state.
         Ignores duplicates of the same item."""
         player_prog_items = self.prog_items[player]
+        if isinstance(player_prog_items, IndexedCounter):
+            return player_prog_items.count_items_unique(player_prog_items.item_index.group(item_name_group))
         return sum(
             player_prog_items[item_name] > 0
             for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]
@@ -1116,6 +1858,7 @@ class CollectionState():
         changed = self.multiworld.worlds[item.player].collect(self, item)
 
         self.stale[item.player] = True
+        self.item_generations[item.player] = next(_item_generations)
 
         if changed and not prevent_sweep:
             self.sweep_for_advancements()
@@ -1132,9 +1875,11 @@ class CollectionState():
         """
         assert count > 0
         self.prog_items[player][item] += count
+        self.item_generations[player] = next(_item_generations)
 
     def remove(self, item: Item):
         changed = self.multiworld.worlds[item.player].remove(self, item)
+        self.item_generations[item.player] = next(_item_generations)
         if changed:
             # invalidate caches, nothing can be trusted anymore now
             self.reachable_regions[item.player] = set()
@@ -1153,6 +1898,7 @@ class CollectionState():
         self.prog_items[player][item] -= count
         if self.prog_items[player][item] < 1:
             del (self.prog_items[player][item])
+        self.item_generations[player] = next(_item_generations)
 
     def set_item(self, item: str, player: int, count: int) -> None:
         """
@@ -1167,6 +1913,147 @@ class CollectionState():
             del (self.prog_items[player][item])
         else:
             self.prog_items[player][item] = count
+        self.item_generations[player] = next(_item_generations)
+
+    def get_writable_items(self, player: int) -> Counter[str]:
+        """
+        Returns the player's prog_items to be modified directly outside of World.collect and World.remove, such as by
+        values that access rules cache in them. Unlike set_item, this doesn't count as a change to the player's items.
+
+        :param player: The player whose items to return.
+        """
+        return self.prog_items[player]
+
+
+class _CopyOnWriteAttribute:
+    """
+    Stores a collection shared between a CopyOnWriteCollectionState and its copies, which gets copied on first access
+    after the state was copied, as it can't be known whether the access is going to write.
+    """
+    name: str
+    storage_name: str
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        self.storage_name = f"_shared_{name}"
+
+    def __get__(self, state: Optional[CopyOnWriteCollectionState], owner: type) -> Any:
+        if state is None:
+            return self
+        value = state.__dict__[self.storage_name]
+        if self.name not in state.owned_attributes:
+            value = state.__dict__[self.storage_name] = value.copy()
+            state.owned_attributes.add(self.name)
+        return value
+
+    def __set__(self, state: CopyOnWriteCollectionState, value: Any) -> None:
+        state.__dict__[self.storage_name] = value
+        state.owned_attributes.add(self.name)
+
+
+class CopyOnWriteCollectionState(CollectionState):
+    """
+    CollectionState with a cheap copy(): per player structures are shared with the parent state and its other copies
+    until that player's items or reachability change in one of them.
+
+    prog_items, reachable_regions and blocked_connections may be read directly, but must only be modified through the
+    methods of this class, such as collect, remove, add_item, get_writable_items and update_reachable_regions.
+    World.collect and World.remove may modify the prog_items of their player directly, as they are owned before.
+    """
+    owned_items: Set[int]
+    """players whose prog_items are not shared with another state"""
+    owned_reachability: Set[int]
+    """players whose reachable_regions, blocked_connections and entrance_dependencies are not shared"""
+    owned_attributes: Set[str]
+    """names of the _CopyOnWriteAttributes that are not shared"""
+
+    path = _CopyOnWriteAttribute()
+    advancements = _CopyOnWriteAttribute()
+    locations_checked = _CopyOnWriteAttribute()
+
+    def __init__(self, parent: MultiWorld, allow_partial_entrances: bool = False):
+        self.owned_items = set(parent.get_all_ids())
+        self.owned_reachability = set(parent.get_all_ids())
+        self.owned_attributes = set()
+        super().__init__(parent, allow_partial_entrances)
+
+    def own_items(self, player: int) -> None:
+        """Stop sharing the player's prog_items with other states, so they can be modified."""
+        if player not in self.owned_items:
+            self.prog_items[player] = self.prog_items[player].copy()
+            self.owned_items.add(player)
+
+    def own_reachability(self, player: int) -> None:
+        """Stop sharing the player's region reachability with other states, so it can be modified."""
+        if player not in self.owned_reachability:
+            self.reachable_regions[player] = self.reachable_regions[player].copy()
+            self.blocked_connections[player] = self.blocked_connections[player].copy()
+            if player in self.entrance_dependencies:
+                self.entrance_dependencies[player] = self.entrance_dependencies[player].copy()
+            self.owned_reachability.add(player)
+
+    def copy(self) -> CopyOnWriteCollectionState:
+        ret = self.__class__.__new__(self.__class__)
+        ret.multiworld = self.multiworld
+        ret.owned_items = set()
+        ret.owned_reachability = set()
+        ret.owned_attributes = set()
+        ret.prog_items = self.prog_items.copy()
+        ret.reachable_regions = self.reachable_regions.copy()
+        ret.blocked_connections = self.blocked_connections.copy()
+        ret.entrance_dependencies = self.entrance_dependencies.copy()
+        # sharing keeps reachability valid, so there is no need to search again
+        ret.stale = self.stale.copy()
+        ret.item_generations = self.item_generations.copy()
+        ret.allow_partial_entrances = self.allow_partial_entrances
+        for name in ("path", "advancements", "locations_checked"):
+            storage_name = f"_shared_{name}"
+            ret.__dict__[storage_name] = self.__dict__[storage_name]
+        # everything is shared with the copy now, so the original has to copy before writing as well
+        self.owned_items.clear()
+        self.owned_reachability.clear()
+        self.owned_attributes.clear()
+        init_functions, copy_functions = self.multiworld.get_logic_mixin_functions()
+        for function in init_functions:
+            function(ret, self.multiworld)
+        for function in copy_functions:
+            ret = function(self, ret)
+        return ret
+
+    def update_reachable_regions(self, player: int):
+        self.own_reachability(player)
+        if player in self.entrance_dependencies:
+            # the TrackingCounter records lookups and resets its changes during the search
+            self.own_items(player)
+        super().update_reachable_regions(player)
+
+    def collect(self, item: Item, prevent_sweep: bool = False, location: Optional[Location] = None) -> bool:
+        self.own_items(item.player)
+        return super().collect(item, prevent_sweep, location)
+
+    def remove(self, item: Item):
+        self.own_items(item.player)
+        reachable_regions = self.reachable_regions[item.player]
+        super().remove(item)
+        if self.reachable_regions[item.player] is not reachable_regions:
+            # remove replaced the reachability sets with fresh ones
+            self.owned_reachability.add(item.player)
+
+    def add_item(self, item: str, player: int, count: int = 1) -> None:
+        self.own_items(player)
+        super().add_item(item, player, count)
+
+    def remove_item(self, item: str, player: int, count: int = 1) -> None:
+        self.own_items(player)
+        super().remove_item(item, player, count)
+
+    def set_item(self, item: str, player: int, count: int) -> None:
+        self.own_items(player)
+        super().set_item(item, player, count)
+
+    def get_writable_items(self, player: int) -> Counter[str]:
+        self.own_items(player)
+        return super().get_writable_items(player)
 
 
 class EntranceType(IntEnum):
@@ -1692,61 +2579,40 @@ class Spoiler:
     def create_playthrough(self, create_paths: bool = True) -> None:
         """Destructive to the multiworld while it is run, damage gets repaired afterwards."""
         from itertools import chain
-        # get locations containing progress items
         multiworld = self.multiworld
-        prog_locations = {location for location in multiworld.get_filled_locations() if location.item.advancement}
-        state_cache: List[Optional[CollectionState]] = [None]
+        # build up spheres of collection radius.
+        # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
+        analysis = multiworld.sphere_analysis or SphereAnalysis(multiworld)
+        prog_location_count = len(analysis.sphere_index) + len(analysis.unreachable)
+        state_cache = analysis.get_sphere_states()
         collection_spheres: List[Set[Location]] = []
-        state = CollectionState(multiworld)
-        sphere_candidates = set(prog_locations)
         logging.debug('Building up collection spheres.')
-        while sphere_candidates:
-
-            # build up spheres of collection radius.
-            # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
-
-            sphere = {location for location in sphere_candidates if state.can_reach(location)}
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-
-            sphere_candidates -= sphere
+        for analyzed_sphere in analysis.spheres:
+            sphere = set(analyzed_sphere)
             collection_spheres.append(sphere)
-            state_cache.append(state.copy())
 
             logging.debug('Calculated sphere %i, containing %i of %i progress items.', len(collection_spheres),
                           len(sphere),
-                          len(prog_locations))
-            if not sphere:
-                logging.debug('The following items could not be reached: %s', ['%s (Player %d) at %s (Player %d)' % (
-                    location.item.name, location.item.player, location.name, location.player) for location in
-                                                                               sphere_candidates])
-                if not multiworld.has_beaten_game(state):
-                    raise RuntimeError("During playthrough generation, the game was determined to be unbeatable. "
-                                       "Something went terribly wrong here. "
-                                       f"Unreachable progression items: {sphere_candidates}")
-                else:
-                    self.unreachables = sphere_candidates
-                    break
+                          prog_location_count)
+
+        unreachable_prog_locations = set(analysis.unreachable)
+        if unreachable_prog_locations:
+            logging.debug('The following items could not be reached: %s', ['%s (Player %d) at %s (Player %d)' % (
+                location.item.name, location.item.player, location.name, location.player) for location in
+                                                                           unreachable_prog_locations])
+            if not multiworld.has_beaten_game(analysis.final_state):
+                raise RuntimeError("During playthrough generation, the game was determined to be unbeatable. "
+                                   "Something went terribly wrong here. "
+                                   f"Unreachable progression items: {unreachable_prog_locations}")
+            else:
+                self.unreachables = unreachable_prog_locations
 
         # in the second phase, we cull each sphere such that the game is still beatable,
         # reducing each range of influence to the bare minimum required inside it
-        required_locations = {location for sphere in collection_spheres for location in sphere}
         for num, sphere in reversed(tuple(enumerate(collection_spheres))):
-            to_delete: Set[Location] = set()
-            for location in sphere:
-                # we remove the location from required_locations to sweep from, and check if the game is still beatable
-                logging.debug('Checking if %s (Player %d) is required to beat the game.', location.item.name,
-                              location.item.player)
-                required_locations.remove(location)
-                if multiworld.can_beat_game(state_cache[num], required_locations):
-                    to_delete.add(location)
-                else:
-                    # still required, got to keep it around
-                    required_locations.add(location)
-
             # cull entries in spheres for spoiler walkthrough at end
-            sphere -= to_delete
+            sphere -= self._prune_sphere(state_cache[num], list(sphere), collection_spheres[num + 1:])
+        required_locations = {location for sphere in collection_spheres for location in sphere}
 
         # second phase, sphere 0
         removed_precollected: List[Item] = []
@@ -1805,6 +2671,74 @@ class Spoiler:
         for item in removed_precollected:
             multiworld.push_precollected(item)
 
+    def _prune_sphere(self, state: CollectionState, locations: List[Location],
+                      later_spheres: List[Set[Location]]) -> Set[Location]:
+        """
+        Removes each of the locations of a sphere, in order, if the game can still be beaten from the sphere's state
+        without it and with the required locations of the later spheres, and returns the removed locations.
+        Instead of testing once per location, growing batches of locations are removed at once and batches that turn
+        out to be required are bisected. As more locations can never make the game unbeatable, a batch that can be
+        removed as a whole would also have been removed one location at a time, so the result is the same.
+        """
+        removed: Set[Location] = set()
+
+        def remove_batch(batch: List[Location], required: bool) -> bool:
+            # required means removing the whole batch is already known to make the game unbeatable
+            if not required:
+                logging.debug('Checking if %i progress items starting with %s (Player %d) are required to beat '
+                              'the game.', len(batch), batch[0].item.name, batch[0].item.player)
+                excluded = removed.union(batch)
+                sphere = [location for location in locations if location not in excluded]
+                if self._can_beat_game_from_sphere(state.copy(), [sphere, *later_spheres]):
+                    removed.update(batch)
+                    return True
+            if len(batch) > 1:
+                middle = len(batch) // 2
+                # if the first half could be removed, the second half is what is required
+                remove_batch(batch[middle:], remove_batch(batch[:middle], False))
+            return False
+
+        batch_size = 1
+        index = 0
+        while index < len(locations):
+            batch = locations[index:index + batch_size]
+            index += batch_size
+            if remove_batch(batch, False):
+                batch_size *= 2
+            else:
+                batch_size = max(1, batch_size // 2)
+        return removed
+
+    def _can_beat_game_from_sphere(self, state: CollectionState, spheres: List[Iterable[Location]]) -> bool:
+        """
+        Returns whether the game can be beaten from state, which must be the cached state of the first sphere, by
+        collecting the locations of the spheres.
+        A state that collected less than the sphere analysis can not reach a location in fewer spheres than it did, so
+        locations are only tested from the sphere they were found in on, and the game can not be beaten once a sphere
+        comes up empty.
+        """
+        multiworld = self.multiworld
+        if multiworld.has_beaten_game(state):
+            return True
+        pending: List[Location] = []
+        spheres_iter = iter(spheres)
+        while True:
+            pending.extend(next(spheres_iter, ()))
+            reachable: List[Location] = []
+            unreachable: List[Location] = []
+            for location in pending:
+                if location.can_reach(state):
+                    reachable.append(location)
+                else:
+                    unreachable.append(location)
+            if not reachable:
+                return False
+            for location in reachable:
+                state.collect(location.item, True, location)
+            if multiworld.has_beaten_game(state):
+                return True
+            pending = unreachable
+
     def create_paths(self, state: CollectionState, collection_spheres: List[Set[Location]]) -> None:
         from itertools import zip_longest
         multiworld = self.multiworld
@@ -4,7 +4,8 @@ import logging
 import typing
 from collections import Counter, deque
 
-from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, PlandoItemBlock
+from BaseClasses import CollectionState, Item, Location, LocationDependencies, LocationProgressType, MultiWorld, \
+    PlandoItemBlock
 from Options import Accessibility
 
 from worlds.AutoWorld import call_all
@@ -747,7 +748,7 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
     else:
         logging.info(f"Balancing multiworld progression for {len(balanceable_players)} Players.")
         logging.debug(balanceable_players)
-        state: CollectionState = CollectionState(multiworld)
+        state: CollectionState = multiworld.state_type(multiworld)
         checked_locations: typing.Set[Location] = set()
         unchecked_locations: typing.Set[Location] = set(multiworld.get_locations())
 
@@ -769,10 +770,37 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
         sphere_num: int = 1
         moved_item_count: int = 0
 
+        # The spheres after the current one are swept once, from a frontier state that collected all of them, and are
+        # shared by the following spheres and balancing attempts. Swapping items changes when locations become
+        # reachable, so the frontier starts over from the current state after items were moved.
+        upcoming_spheres: typing.List[typing.Set[Location]] = []
+        frontier_state: typing.Optional[CollectionState] = None
+        frontier_locations: typing.Set[Location] = set()
+        frontier_dependencies: typing.Dict[int, LocationDependencies] = {}
+
         def get_sphere_locations(sphere_state: CollectionState,
                                  locations: typing.Set[Location]) -> typing.Set[Location]:
             return {loc for loc in locations if sphere_state.can_reach(loc)}
 
+        def get_upcoming_sphere(index: int) -> typing.Set[Location]:
+            """Returns the sphere reached `index` spheres after the one the current state reaches."""
+            nonlocal frontier_state, frontier_locations, frontier_dependencies
+            if frontier_state is None:
+                frontier_state = state.copy()
+                # only locations whose dependencies changed are tested again for worlds with incremental_reachability
+                frontier_dependencies = frontier_state._track_location_dependencies(unchecked_locations)
+                frontier_locations = {loc for loc in unchecked_locations if loc.player not in frontier_dependencies}
+            while len(upcoming_spheres) <= index:
+                sphere = get_sphere_locations(frontier_state, frontier_locations)
+                for player, dependencies in frontier_dependencies.items():
+                    sphere.update(frontier_state._reach_tracked_locations(player, dependencies))
+                frontier_locations -= sphere
+                for location in sphere:
+                    if location.advancement:
+                        frontier_state.collect(location.item, True, location)
+                upcoming_spheres.append(sphere)
+            return upcoming_spheres[index]
+
         def item_percentage(player: int, num: int) -> float:
             return num / total_locations_count[player]
 
@@ -784,7 +812,8 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
             # Gather non-locked locations.
             # This ensures that only shuffled locations get counted for progression balancing,
             #   i.e. the items the players will be checking.
-            sphere_locations = get_sphere_locations(state, unchecked_locations)
+            sphere_locations = get_upcoming_sphere(0)
+            del upcoming_spheres[0]
             for location in sphere_locations:
                 unchecked_locations.remove(location)
                 if not location.locked:
@@ -815,9 +844,9 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                 }
                 if balancing_players:
                     balancing_state = state.copy()
-                    balancing_unchecked_locations = unchecked_locations.copy()
+                    balancing_spheres: typing.List[typing.Set[Location]] = []
                     balancing_reachables = reachable_locations_count.copy()
-                    balancing_sphere = sphere_locations.copy()
+                    balancing_sphere = sphere_locations
                     candidate_items: typing.Dict[int, typing.Set[Location]] = collections.defaultdict(set)
                     while True:
                         # Check locations in the current sphere and gather progression items to swap earlier
@@ -832,9 +861,9 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                                         location.progress_type != LocationProgressType.PRIORITY):
                                     candidate_items[player].add(location)
                                     logging.debug(f"Candidate item: {location.name}, {location.item.name}")
-                        balancing_sphere = get_sphere_locations(balancing_state, balancing_unchecked_locations)
+                        balancing_sphere = get_upcoming_sphere(len(balancing_spheres))
+                        balancing_spheres.append(balancing_sphere)
                         for location in balancing_sphere:
-                            balancing_unchecked_locations.remove(location)
                             if not location.locked:
                                 balancing_reachables[location.player] += 1
                         if multiworld.has_beaten_game(balancing_state) or all(
@@ -846,34 +875,70 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                             raise RuntimeError("Not all required items reachable. Something went terribly wrong here.")
                     # Gather a set of locations which we can swap items into
                     unlocked_locations: typing.Dict[int, typing.Set[Location]] = collections.defaultdict(set)
-                    for l in unchecked_locations:
-                        if l not in balancing_unchecked_locations:
-                            unlocked_locations[l.player].add(l)
+                    for l in itertools.chain.from_iterable(balancing_spheres):
+                        unlocked_locations[l.player].add(l)
                     items_to_replace: typing.List[Location] = []
+                    beaten_game = multiworld.has_beaten_game(balancing_state)
                     for player in balancing_players:
                         locations_to_test = unlocked_locations[player]
                         items_to_test = list(candidate_items[player])
                         items_to_test.sort()
                         multiworld.random.shuffle(items_to_test)
+                        # Everything reachable without any of the tested items is swept once, and every test continues
+                        # from there, which reaches the same as sweeping from the current state.
+                        base_state = state.copy()
+                        base_state.sweep_for_advancements(locations=locations_to_test)
+                        base_locations = get_sphere_locations(base_state, locations_to_test)
+                        locations_to_retest = locations_to_test - base_locations
+                        base_count = reachable_locations_count[player] + len(base_locations)
+                        # Collecting more items only ever reaches more, so the outcome of a test is already known if
+                        # fewer of the same items were enough or more of them were not enough.
+                        sufficient_items: typing.List[typing.Counter[str]] = []
+                        insufficient_items: typing.List[typing.Counter[str]] = []
+                        if (multiworld.has_beaten_game(base_state) if beaten_game
+                                else item_percentage(player, base_count) >= threshold_percentages[player]):
+                            sufficient_items.append(Counter())
                         while items_to_test:
                             testing = items_to_test.pop()
-                            reducing_state = state.copy()
-                            for location in itertools.chain((
-                                    l for l in items_to_replace
-                                    if l.item.player == player
-                            ), items_to_test):
+                            kept_locations = [l for l in items_to_replace if l.item.player == player] + items_to_test
+                            kept_items = Counter(location.item.name for location in kept_locations)
+                            if any(items <= kept_items for items in sufficient_items):
+                                continue
+                            if any(kept_items <= items for items in insufficient_items):
+                                items_to_replace.append(testing)
+                                continue
+
+                            reducing_state = base_state.copy()
+                            for location in kept_locations:
                                 reducing_state.collect(location.item, True, location)
 
-                            reducing_state.sweep_for_advancements(locations=locations_to_test)
-
-                            if multiworld.has_beaten_game(balancing_state):
-                                if not multiworld.has_beaten_game(reducing_state):
-                                    items_to_replace.append(testing)
+                            # stop sweeping once enough is reached, as it stays reachable
+                            sufficient = False
+                            for _ in reducing_state.sweep_for_advancements(locations_to_retest, yield_each_sweep=True):
+                                if beaten_game:
+                                    sufficient = multiworld.has_beaten_game(reducing_state)
+                                else:
+                                    swept_count = sum(1 for loc in locations_to_retest
+                                                      if loc in reducing_state.advancements)
+                                    sufficient = (item_percentage(player, base_count + swept_count)
+                                                  >= threshold_percentages[player])
+                                if sufficient:
+                                    break
+                            else:
+                                if beaten_game:
+                                    sufficient = multiworld.has_beaten_game(reducing_state)
+                                else:
+                                    # the sweep collected every reachable advancement, only the others need to be tested
+                                    reduced_count = sum(1 for loc in locations_to_retest
+                                                        if loc in reducing_state.advancements
+                                                        or not loc.advancement and reducing_state.can_reach(loc))
+                                    sufficient = (item_percentage(player, base_count + reduced_count)
+                                                  >= threshold_percentages[player])
+                            if sufficient:
+                                sufficient_items.append(kept_items)
                             else:
-                                reduced_sphere = get_sphere_locations(reducing_state, locations_to_test)
-                                p = item_percentage(player, reachable_locations_count[player] + len(reduced_sphere))
-                                if p < threshold_percentages[player]:
-                                    items_to_replace.append(testing)
+                                insufficient_items.append(kept_items)
+                                items_to_replace.append(testing)
 
                     old_moved_item_count = moved_item_count
 
@@ -902,6 +967,8 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
 
                     if old_moved_item_count < moved_item_count:
                         logging.debug(f"Moved {moved_item_count} items so far\n")
+                        upcoming_spheres.clear()
+                        frontier_state = None
                         unlocked = {fresh for player in balancing_players for fresh in unlocked_locations[player]}
                         for location in get_sphere_locations(state, unlocked):
                             unchecked_locations.remove(location)
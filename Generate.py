@@ -652,6 +652,7 @@ def roll_alttp_settings(ret: argparse.Namespace, weights):
 if __name__ == '__main__':
     import atexit
     confirmation = atexit.register(input, "Press enter to close.")
+    Utils.lazy_world_loading = True
     erargs, seed = main()
     from Main import main as ERmain
     multiworld = ERmain(erargs, seed)
@@ -7,17 +7,17 @@ import tempfile
 import time
 from typing import Any
 import zipfile
-import zlib
 
 import worlds
-from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld
+from BaseClasses import CopyOnWriteCollectionState, Item, Location, LocationProgressType, MultiWorld
 from Fill import FillError, balance_multiworld_progression, distribute_items_restrictive, flood_items, \
     parse_planned_blocks, distribute_planned_blocks, resolve_early_locations_for_planned
-from NetUtils import convert_to_base_types
+from NetUtils import convert_to_base_types, dump_multidata
 from Options import StartInventoryPool
-from Utils import __version__, output_path, restricted_dumps, version_tuple
+from Utils import __version__, output_path, version_tuple
 from settings import get_settings
 from worlds import AutoWorld
+from worlds.Files import DeltaPatchProcessPool
 from worlds.generic.Rules import exclusion_rules, locality_rules
 
 __all__ = ["main"]
@@ -48,24 +48,27 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
         from Options import dump_player_options
         dump_player_options(multiworld)
     multiworld.set_item_links()
-    multiworld.state = CollectionState(multiworld)
+    if get_settings().generator.copy_on_write_state:
+        multiworld.state_type = CopyOnWriteCollectionState
+    multiworld.state = multiworld.state_type(multiworld)
     logger.info('Archipelago Version %s  -  Seed: %s\n', __version__, multiworld.seed)
 
-    logger.info(f"Found {len(AutoWorld.AutoWorldRegister.world_types)} World Types:")
-    longest_name = max(len(text) for text in AutoWorld.AutoWorldRegister.world_types)
+    # from the world index and data package, so that this doesn't import every world
+    games_package = worlds.network_data_package["games"]
+    logger.info(f"Found {len(worlds.world_index)} World Types:")
+    longest_name = max(len(text) for text in worlds.world_index)
 
-    world_classes = AutoWorld.AutoWorldRegister.world_types.values()
+    version_count = max(len(entry["world_version"]) for entry in worlds.world_index.values())
+    item_count = len(str(max(len(games_package[name]["item_name_to_id"]) for name in worlds.world_index)))
+    location_count = len(str(max(len(games_package[name]["location_name_to_id"]) for name in worlds.world_index)))
 
-    version_count = max(len(cls.world_version.as_simple_string()) for cls in world_classes)
-    item_count = len(str(max(len(cls.item_names) for cls in world_classes)))
-    location_count = len(str(max(len(cls.location_names) for cls in world_classes)))
-
-    for name, cls in AutoWorld.AutoWorldRegister.world_types.items():
-        if not cls.hidden and len(cls.item_names) > 0:
+    for name, entry in worlds.world_index.items():
+        item_names = games_package[name]["item_name_to_id"]
+        if not entry["hidden"] and len(item_names) > 0:
             logger.info(f" {name:{longest_name}}: "
-                        f"v{cls.world_version.as_simple_string():{version_count}} | "
-                        f"Items: {len(cls.item_names):{item_count}} | "
-                        f"Locations: {len(cls.location_names):{location_count}}")
+                        f"v{entry['world_version']:{version_count}} | "
+                        f"Items: {len(item_names):{item_count}} | "
+                        f"Locations: {len(games_package[name]['location_name_to_id']):{location_count}}")
 
     del item_count, location_count
 
@@ -226,11 +229,15 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
         logger.info('Done. Skipped multidata modification. Total time: %s', time.perf_counter() - start)
         return multiworld
 
+    # the placement is final, so the spheres can be shared by the accessibility check, multidata and spoiler
+    multiworld.analyze_spheres()
+
     output = tempfile.TemporaryDirectory()
     with output as temp_dir:
         output_players = [player for player in multiworld.player_ids if AutoWorld.World.generate_output.__code__
                           is not multiworld.worlds[player].generate_output.__code__]
-        with concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
+        with DeltaPatchProcessPool(get_settings().generator.delta_patch_processes), \
+                concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
             check_accessibility_task = pool.submit(multiworld.fulfills_accessibility)
 
             output_file_futures = [pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir)]
@@ -350,11 +357,8 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
                 for key in ("slot_data", "er_hint_data"):
                     multidata[key] = convert_to_base_types(multidata[key])
 
-                serialized_multidata = zlib.compress(restricted_dumps(multidata), 9)
-
                 with open(os.path.join(temp_dir, f'{outfilebase}.archipelago'), 'wb') as f:
-                    f.write(bytes([3]))  # version of format
-                    f.write(serialized_multidata)
+                    dump_multidata(multidata, f)
 
             output_file_futures.append(pool.submit(write_multidata))
             if not check_accessibility_task.result():
@@ -12,6 +12,7 @@ import inspect
 import itertools
 import logging
 import math
+import mmap
 import operator
 import pickle
 import random
@@ -43,7 +44,7 @@ import NetUtils
 import Utils
 from Utils import version_tuple, restricted_loads, Version, async_start, get_intended_text
 from NetUtils import Endpoint, ClientStatus, NetworkItem, decode, encode, NetworkPlayer, Permission, NetworkSlot, \
-    SlotType, LocationStore, MultiData, Hint, HintStatus
+    SlotType, LocationStore, LocationChecks, MultiData, Hint, HintStatus
 from BaseClasses import ItemClassification
 
 
@@ -155,6 +156,13 @@ class Client(Endpoint):
         "no_items",
         "no_locations",
         "no_text",
+        "outbox",
+        "flushed",
+        "pending_frames",
+        "send_task",
+        "max_queue_depth",
+        "sent_frames",
+        "sent_bytes",
     )
 
     version: Version
@@ -170,6 +178,16 @@ class Client(Endpoint):
     no_items: bool
     no_locations: bool
     no_text: bool
+    outbox: list[str]
+    """encoded message lists queued to be sent together in the next frame"""
+    flushed: asyncio.Future[bool] | None
+    """resolves to whether the next flush of the outbox could be sent"""
+    pending_frames: collections.deque[tuple[str, asyncio.Future[bool] | None]]
+    """frames waiting for send_task, with the future to resolve once they are sent"""
+    send_task: asyncio.Task[None] | None
+    max_queue_depth: int
+    sent_frames: int
+    sent_bytes: int
 
     def __init__(self, socket: "ServerConnection", ctx: Context) -> None:
         super().__init__(socket)
@@ -186,6 +204,13 @@ class Client(Endpoint):
         self.no_items = False
         self.no_locations = False
         self.no_text = False
+        self.outbox = []
+        self.flushed = None
+        self.pending_frames = collections.deque()
+        self.send_task = None
+        self.max_queue_depth = 0
+        self.sent_frames = 0
+        self.sent_bytes = 0
 
     @property
     def items_handling(self):
@@ -212,6 +237,148 @@ class Client(Endpoint):
 team_slot = typing.Tuple[int, int]
 
 
+class SaveJournal:
+    """
+    Changes to the save data of a Context since it was last saved.
+    Instead of rewriting the save file, these are appended to a journal file next to it, which is compacted into the
+    save file once it outgrows it. Loading replays the journal onto the save data, so the save file keeps the format
+    read by Context.set_save.
+    Changes are recorded and taken on the event loop, which makes them. Only writing the files happens on the saving
+    thread.
+    """
+    filename: str
+    generation: int
+    """generation of the save file changes are recorded for, a journal of another generation is ignored"""
+    file_generation: int
+    """generation of the save file the journal file belongs to"""
+    size: int
+    """size of the journal file in bytes"""
+    save_size: int
+    """size of the save file in bytes"""
+    location_checks: typing.Dict[team_slot, typing.Set[int]]
+    """newly checked locations, replayed as journal_location_checks of the save data, see Context.set_save"""
+    hints: typing.Set[team_slot]
+    """slots whose hints changed"""
+    stored_data: typing.Set[str]
+    """changed data storage keys"""
+    received_items_saved: typing.Dict[typing.Tuple[int, int, bool], int]
+    """how many of each list of received items are saved"""
+    pending: typing.List[typing.Tuple[int, typing.Dict[str, typing.Any]]]
+    """records that were taken but not written yet, with the generation they were taken for"""
+    pending_lock: threading.Lock
+    lock: threading.Lock
+    """held while writing the save file or the journal file"""
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.generation = 0
+        self.file_generation = 0
+        self.size = 0
+        self.save_size = 0
+        self.location_checks = collections.defaultdict(set)
+        self.hints = set()
+        self.stored_data = set()
+        self.received_items_saved = {}
+        self.pending = []
+        self.pending_lock = threading.Lock()
+        self.lock = threading.Lock()
+
+    @property
+    def needs_compaction(self) -> bool:
+        return self.size >= self.save_size
+
+    def start_generation(self, ctx: Context) -> int:
+        """
+        Starts recording changes for a new save file that contains all current changes, returning its generation.
+        Runs on the event loop.
+        """
+        with self.pending_lock:
+            self.generation += 1
+            self.location_checks = collections.defaultdict(set)
+            self.hints = set()
+            self.stored_data = set()
+            self.received_items_saved = {key: len(items) for key, items in ctx.received_items.items()}
+            return self.generation
+
+    def reset(self, generation: int, save_size: int) -> None:
+        """Starts a new journal file for the save file of `generation`, which was just written."""
+        self.file_generation = generation
+        self.save_size = save_size
+        with open(self.filename, "wb") as f:
+            self.size = f.write(self.encode_record({"journal_generation": generation}))
+        self.write_pending()
+
+    def take_record(self, ctx: Context) -> None:
+        """Takes the changes since the last record, to be written by write_pending. Runs on the event loop."""
+        record = ctx.get_save_state()
+        received_items: typing.Dict[typing.Tuple[int, int, bool], typing.Tuple[int, typing.List[NetworkItem]]] = {}
+        for key, items in ctx.received_items.items():
+            saved = self.received_items_saved.get(key, 0)
+            if len(items) > saved:
+                received_items[key] = saved, items[saved:]
+                self.received_items_saved[key] = len(items)
+        location_checks, self.location_checks = self.location_checks, collections.defaultdict(set)
+        hints, self.hints = self.hints, set()
+        stored_data, self.stored_data = self.stored_data, set()
+        record["received_items"] = received_items
+        record["location_checks"] = dict(location_checks)
+        record["hints"] = {key: set(ctx.hints[key]) for key in hints}
+        record["stored_data"] = {key: copy.deepcopy(ctx.stored_data[key]) for key in stored_data}
+        with self.pending_lock:
+            self.pending.append((self.generation, record))
+
+    def write_pending(self) -> None:
+        """Appends the records taken for the current journal file to it. Called while holding lock."""
+        with self.pending_lock:
+            pending = self.pending
+            # records taken for a newer save file wait for it to be written, older ones are part of the save file
+            self.pending = [(generation, record) for generation, record in pending
+                            if generation > self.file_generation]
+        records = [record for generation, record in pending if generation == self.file_generation]
+        if records:
+            with open(self.filename, "ab") as f:
+                for record in records:
+                    self.size += f.write(self.encode_record(record))
+
+    @staticmethod
+    def encode_record(record: typing.Dict[str, typing.Any]) -> bytes:
+        # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
+        data = zlib.compress(pickle.dumps(record))
+        return len(data).to_bytes(4, "little") + data
+
+    @staticmethod
+    def replay(savedata: typing.Dict[str, typing.Any], filename: str) -> int:
+        """Applies the changes recorded in the journal file to savedata. Returns the number of replayed records."""
+        try:
+            with open(filename, "rb") as f:
+                journal = f.read()
+        except FileNotFoundError:
+            return 0
+        records: typing.List[typing.Dict[str, typing.Any]] = []
+        position = 0
+        while position + 4 <= len(journal):
+            size = int.from_bytes(journal[position:position + 4], "little")
+            data = journal[position + 4:position + 4 + size]
+            if len(data) < size:
+                break  # the last record was not written completely
+            records.append(restricted_loads(zlib.decompress(data)))
+            position += 4 + size
+        if not records or records[0].get("journal_generation") != savedata.get("journal_generation"):
+            return 0  # belongs to another save file
+        for record in records[1:]:
+            for key, (start, items) in record.pop("received_items").items():
+                received_items = savedata["received_items"].setdefault(key, [])
+                del received_items[start:]
+                received_items.extend(items)
+            # the save data stores bitsets that can only be decoded with the LocationStore
+            for key, locations in record.pop("location_checks").items():
+                savedata.setdefault("journal_location_checks", {}).setdefault(key, set()).update(locations)
+            savedata["hints"].update(record.pop("hints"))
+            savedata.setdefault("stored_data", {}).update(record.pop("stored_data"))
+            savedata.update(record)
+        return len(records) - 1
+
+
 class Context:
     dumper = staticmethod(encode)
     loader = staticmethod(decode)
@@ -230,10 +397,10 @@ class Context:
     clients: typing.Dict[int, typing.Dict[int, typing.List[Client]]]
     endpoints: list[Client]
     locations: LocationStore  # typing.Dict[int, typing.Dict[int, typing.Tuple[int, int, int]]]
-    location_checks: typing.Dict[typing.Tuple[int, int], typing.Set[int]]
+    location_checks: LocationChecks
     hints_used: typing.Dict[typing.Tuple[int, int], int]
     groups: typing.Dict[int, typing.Set[int]]
-    save_version = 2
+    save_version = 3
     stored_data: typing.Dict[str, object]
     read_data: typing.Dict[str, object]
     stored_data_notification_clients: typing.Dict[str, typing.Set[Client]]
@@ -261,10 +428,15 @@ class Context:
         self.log_network = log_network
         self.endpoints = []
         self.clients = {}
+        self.flushing_clients: typing.Dict[Client, None] = {}  # clients with queued messages, in queueing order
+        self.flush_handle: typing.Optional[asyncio.Handle] = None
         self.compatibility: int = compatibility
         self.shutdown_task = None
         self.data_filename = None
+        self.multidata_map: typing.Optional[mmap.mmap] = None  # loaded .archipelago file, read as sections are needed
+        self.mapped_multidata: typing.Optional[NetUtils.SectionedMultiData] = None
         self.save_filename = None
+        self.save_journal: typing.Optional[SaveJournal] = None
         self.saving = False
         self.player_names: typing.Dict[team_slot, str] = {}
         self.player_name_lookup: typing.Dict[str, team_slot] = {}
@@ -276,14 +448,18 @@ class Context:
         self.password = password
         self.server = None
         self.countdown_timer = 0
-        self.received_items = {}
+        self.received_items: typing.Dict[typing.Tuple[int, int, bool], typing.List[NetworkItem]] = {}
+        self.pending_receivers: typing.Set[team_slot] = set()  # slots with received items not sent to clients yet
         self.start_inventory = {}
         self.name_aliases: typing.Dict[team_slot, str] = {}
-        self.location_checks = collections.defaultdict(set)
+        self.location_checks = LocationChecks()
         self.hint_cost = hint_cost
         self.location_check_points = location_check_points
         self.hints_used = collections.defaultdict(int)
         self.hints: typing.Dict[team_slot, typing.Set[Hint]] = collections.defaultdict(set)
+        # (team, finding player, location) -> hints for that location, an index of self.hints
+        self.hints_by_location: typing.Dict[typing.Tuple[int, int, int], typing.Set[Hint]] = \
+            collections.defaultdict(set)
         self.release_mode: str = release_mode
         self.remaining_mode: str = remaining_mode
         self.collect_mode: str = collect_mode
@@ -302,6 +478,7 @@ class Context:
         self.client_ids: typing.Dict[typing.Tuple[int, int], datetime.datetime] = {}
         self.auto_save_interval = 60  # in seconds
         self.auto_saver_thread: typing.Optional[threading.Thread] = None
+        self.main_loop: typing.Optional[asyncio.AbstractEventLoop] = None  # where the state of the server changes
         self.save_dirty = False
         self.tags = ['AP']
         self.games: typing.Dict[int, str] = {}
@@ -333,19 +510,18 @@ class Context:
     # Data package retrieval
     def _load_game_data(self):
         import worlds
-        self.gamespackage = worlds.network_data_package["games"]
-
-        self.item_name_groups = {world_name: world.item_name_groups for world_name, world in
-                                 worlds.AutoWorldRegister.world_types.items()}
-        self.location_name_groups = {world_name: world.location_name_groups for world_name, world in
-                                     worlds.AutoWorldRegister.world_types.items()}
-        for world_name, world in worlds.AutoWorldRegister.world_types.items():
-            self.non_hintable_names[world_name] = world.hint_blacklist
-
-        for game_package in self.gamespackage.values():
-            # remove groups from data sent to clients
-            del game_package["item_name_groups"]
-            del game_package["location_name_groups"]
+        # from the data package and world index, so that worlds don't have to be imported
+        self.gamespackage = {
+            world_name: {key: value for key, value in game_package.items()
+                         if key not in ("item_name_groups", "location_name_groups")}  # not sent to clients
+            for world_name, game_package in worlds.network_data_package["games"].items()
+        }
+        self.item_name_groups = {world_name: game_package["item_name_groups"] for world_name, game_package in
+                                 worlds.network_data_package["games"].items()}
+        self.location_name_groups = {world_name: game_package["location_name_groups"] for world_name, game_package in
+                                     worlds.network_data_package["games"].items()}
+        for world_name, entry in worlds.world_index.items():
+            self.non_hintable_names[world_name] = frozenset(entry["hint_blacklist"])
 
     def _init_game_data(self):
         for game_name, game_package in self.gamespackage.items():
@@ -374,49 +550,152 @@ class Context:
         return self.gamespackage[game]["location_name_to_id"] if game in self.gamespackage else None
 
     # General networking
-    async def send_msgs(self, endpoint: Endpoint, msgs: typing.Iterable[dict]) -> bool:
-        if not endpoint.socket or not endpoint.socket.open:
-            return False
-        msg = self.dumper(msgs)
+    # Messages are queued per client and every message queued for a client during one event loop iteration is sent
+    # in a single frame. Message lists are encoded once for all of their recipients, and so are the resulting frames.
+    max_frame_size: int = 1 << 20  # in characters, above which queued messages are split across frames
+
+    def queue_encoded_msgs(self, endpoints: typing.Iterable[Client], msg: str) -> None:
+        """Queue an encoded message list to be sent to each of the endpoints in their next frame."""
+        for endpoint in endpoints:
+            if not endpoint.socket or not endpoint.socket.open:
+                continue
+            endpoint.outbox.append(msg)
+            if len(endpoint.outbox) > endpoint.max_queue_depth:
+                endpoint.max_queue_depth = len(endpoint.outbox)
+            self.flushing_clients[endpoint] = None
+        if self.flushing_clients and not self.flush_handle:
+            self.flush_handle = asyncio.get_running_loop().call_soon(self.flush_outboxes)
+
+    def flush_outboxes(self) -> None:
+        """Send every client its queued messages, with clients that have the same messages queued sharing frames."""
+        self.flush_handle = None
+        flushing_clients, self.flushing_clients = self.flushing_clients, {}
+        recipients: typing.Dict[typing.Tuple[str, ...], typing.List[Client]] = collections.defaultdict(list)
+        for client in flushing_clients:
+            if client.outbox:
+                recipients[tuple(client.outbox)].append(client)
+                client.outbox.clear()
+        for msgs, endpoints in recipients.items():
+            frames = self.get_frames(msgs)
+            if not frames:
+                for endpoint in endpoints:
+                    if endpoint.flushed:
+                        endpoint.flushed.set_result(True)
+                        endpoint.flushed = None
+            elif len(endpoints) == 1:
+                # a single recipient is sent to directly, which waits for the connection to take the data
+                endpoint = endpoints[0]
+                for frame in frames[:-1]:
+                    self.queue_frame(endpoint, frame, None)
+                self.queue_frame(endpoint, frames[-1], endpoint.flushed)
+                endpoint.flushed = None
+            else:
+                for frame in frames:
+                    self.send_frame(endpoints, frame)
+                for endpoint in endpoints:
+                    if not endpoint.flushed:
+                        continue
+                    if endpoint.pending_frames:
+                        # resolve once the last frame queued behind earlier ones is sent
+                        endpoint.pending_frames[-1] = (endpoint.pending_frames[-1][0], endpoint.flushed)
+                    else:
+                        endpoint.flushed.set_result(bool(endpoint.socket and endpoint.socket.open))
+                    endpoint.flushed = None
+
+    def get_frames(self, msgs: typing.Sequence[str]) -> typing.List[str]:
+        """Join encoded message lists into as few message lists as max_frame_size allows."""
+        if len(msgs) == 1:
+            return [msgs[0]]
+        frames: typing.List[str] = []
+        parts: typing.List[str] = []
+        size = 0
+        for msg in msgs:
+            if msg == "[]":
+                continue
+            if parts and size + len(msg) > self.max_frame_size:
+                frames.append("[" + ",".join(parts) + "]")
+                parts.clear()
+                size = 0
+            parts.append(msg[1:-1])
+            size += len(msg)
+        if parts:
+            frames.append("[" + ",".join(parts) + "]")
+        return frames
+
+    def send_frame(self, endpoints: typing.Sequence[Client], frame: str) -> None:
+        """Send a frame shared by several clients. websockets.broadcast does not wait for slow connections, so any
+        clients still sending an earlier frame get this one queued behind it instead, to keep their messages in order."""
+        sockets = []
+        broadcast_endpoints = []
+        for endpoint in endpoints:
+            if endpoint.pending_frames:
+                self.queue_frame(endpoint, frame, None)
+            elif endpoint.socket and endpoint.socket.open:
+                sockets.append(endpoint.socket)
+                broadcast_endpoints.append(endpoint)
+        if sockets:
+            websockets.broadcast(sockets, frame)
+            self.count_sent_frame(broadcast_endpoints, frame)
+
+    def queue_frame(self, endpoint: Client, frame: str, sent: asyncio.Future[bool] | None) -> None:
+        """Queue a frame to be sent to a single client, resolving sent once it is sent."""
+        endpoint.pending_frames.append((frame, sent))
+        if not endpoint.send_task:
+            endpoint.send_task = asyncio.create_task(self.send_pending_frames(endpoint))
+
+    async def send_pending_frames(self, endpoint: Client) -> None:
+        connection_closed = False
         try:
-            await endpoint.socket.send(msg)
-        except websockets.ConnectionClosed:
-            self.logger.exception(f"Exception during send_msgs, could not send {msg}")
+            while endpoint.pending_frames and endpoint.socket and endpoint.socket.open:
+                frame, sent = endpoint.pending_frames[0]
+                try:
+                    await endpoint.socket.send(frame)
+                except websockets.ConnectionClosed:
+                    self.logger.exception("Exception during send_pending_frames")
+                    connection_closed = True
+                    break
+                endpoint.pending_frames.popleft()
+                self.count_sent_frame((endpoint,), frame)
+                if sent and not sent.done():
+                    sent.set_result(True)
+            for frame, sent in endpoint.pending_frames:
+                if sent and not sent.done():
+                    sent.set_result(False)
+            endpoint.pending_frames.clear()
+        finally:
+            endpoint.send_task = None
+        if connection_closed:
             await self.disconnect(endpoint)
+
+    def count_sent_frame(self, endpoints: typing.Sequence[Client], frame: str) -> None:
+        frame_size = len(frame.encode("utf-8"))
+        for endpoint in endpoints:
+            endpoint.sent_frames += 1
+            endpoint.sent_bytes += frame_size
+        if self.log_network:
+            self.logger.info(f"Outgoing message: {frame}")
+
+    async def wait_flushed(self, endpoint: Client) -> bool:
+        """Wait until the messages queued for the endpoint so far are sent, returning whether they could be sent."""
+        if not endpoint.flushed:
+            endpoint.flushed = asyncio.get_running_loop().create_future()
+        return await asyncio.shield(endpoint.flushed)
+
+    async def send_msgs(self, endpoint: Endpoint, msgs: typing.Iterable[typing.Dict[str, typing.Any]]) -> bool:
+        if not endpoint.socket or not endpoint.socket.open:
             return False
-        else:
-            if self.log_network:
-                self.logger.info(f"Outgoing message: {msg}")
-            return True
+        self.queue_encoded_msgs((endpoint,), self.dumper(msgs))
+        return await self.wait_flushed(endpoint)
 
     async def send_encoded_msgs(self, endpoint: Endpoint, msg: str) -> bool:
         if not endpoint.socket or not endpoint.socket.open:
             return False
-        try:
-            await endpoint.socket.send(msg)
-        except websockets.ConnectionClosed:
-            self.logger.exception("Exception during send_encoded_msgs")
-            await self.disconnect(endpoint)
-            return False
-        else:
-            if self.log_network:
-                self.logger.info(f"Outgoing message: {msg}")
-            return True
+        self.queue_encoded_msgs((endpoint,), msg)
+        return await self.wait_flushed(endpoint)
 
     async def broadcast_send_encoded_msgs(self, endpoints: typing.Iterable[Endpoint], msg: str) -> bool:
-        sockets = []
-        for endpoint in endpoints:
-            if endpoint.socket and endpoint.socket.open:
-                sockets.append(endpoint.socket)
-        try:
-            websockets.broadcast(sockets, msg)
-        except RuntimeError:
-            self.logger.exception("Exception during broadcast_send_encoded_msgs")
-            return False
-        else:
-            if self.log_network:
-                self.logger.info(f"Outgoing broadcast: {msg}")
-            return True
+        self.queue_encoded_msgs(endpoints, msg)
+        return True
 
     def broadcast_all(self, msgs: typing.List[dict]):
         msg_is_text = all(msg["cmd"] == "PrintJSON" for msg in msgs)
@@ -426,9 +705,9 @@ class Context:
             for endpoint in self.endpoints
             if endpoint.auth and not (msg_is_text and endpoint.no_text)
         )
-        async_start(self.broadcast_send_encoded_msgs(endpoints, data))
+        self.queue_encoded_msgs(endpoints, data)
 
-    def broadcast_text_all(self, text: str, additional_arguments: dict = {}):
+    def broadcast_text_all(self, text: str, additional_arguments: typing.Dict[str, typing.Any] = {}):
         self.logger.info("Notice (all): %s" % text)
         self.broadcast_all([{**{"cmd": "PrintJSON", "data": [{ "text": text }]}, **additional_arguments}])
 
@@ -440,15 +719,19 @@ class Context:
             for endpoint in itertools.chain.from_iterable(self.clients[team].values())
             if not (msg_is_text and endpoint.no_text)
         )
-        async_start(self.broadcast_send_encoded_msgs(endpoints, data))
+        self.queue_encoded_msgs(endpoints, data)
 
-    def broadcast(self, endpoints: typing.Iterable[Client], msgs: typing.List[dict]):
-        msgs = self.dumper(msgs)
-        async_start(self.broadcast_send_encoded_msgs(endpoints, msgs))
+    def broadcast(self, endpoints: typing.Iterable[Client], msgs: typing.List[typing.Dict[str, typing.Any]]):
+        self.queue_encoded_msgs(endpoints, self.dumper(msgs))
 
     async def disconnect(self, endpoint: Client):
         if endpoint in self.endpoints:
             self.endpoints.remove(endpoint)
+        endpoint.outbox.clear()
+        self.flushing_clients.pop(endpoint, None)
+        if endpoint.flushed and not endpoint.flushed.done():
+            endpoint.flushed.set_result(False)
+        endpoint.flushed = None
         if endpoint.slot and endpoint in self.clients[endpoint.team][endpoint.slot]:
             self.clients[endpoint.team][endpoint.slot].remove(endpoint)
         await on_client_disconnected(self, endpoint)
@@ -457,17 +740,17 @@ class Context:
         if not client.auth or client.no_text:
             return
         self.logger.info("Notice (Player %s in team %d): %s" % (client.name, client.team + 1, text))
-        async_start(self.send_msgs(client, [{"cmd": "PrintJSON", "data": [{ "text": text }], **additional_arguments}]))
+        self.broadcast((client,), [{"cmd": "PrintJSON", "data": [{ "text": text }], **additional_arguments}])
 
     def notify_client_multiple(self, client: Client, texts: typing.List[str], additional_arguments: dict = {}):
         if not client.auth or client.no_text:
             return
-        async_start(self.send_msgs(client,
-                                   [{"cmd": "PrintJSON", "data": [{ "text": text }], **additional_arguments}
-                                    for text in texts]))
+        self.broadcast((client,), [{"cmd": "PrintJSON", "data": [{ "text": text }], **additional_arguments}
+                                   for text in texts])
 
     # loading
     def load(self, multidatapath: str, use_embedded_server_options: bool = False):
+        self.close_multidata()
         if multidatapath.lower().endswith(".zip"):
             import zipfile
             with zipfile.ZipFile(multidatapath) as zf:
@@ -479,17 +762,27 @@ class Context:
                     raise Exception("No .archipelago found in archive.")
         else:
             with open(multidatapath, 'rb') as f:
-                data = f.read()
+                # sections of the multidata are only read from the file as they are needed
+                data = self.multidata_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
-        self._load(self.decompress(data), {}, use_embedded_server_options)
+        decoded_obj = self.decompress(data)
+        if self.multidata_map is not None and isinstance(decoded_obj, NetUtils.SectionedMultiData):
+            self.mapped_multidata = decoded_obj
+        self._load(decoded_obj, {}, use_embedded_server_options)
         self.data_filename = multidatapath
 
+    def close_multidata(self) -> None:
+        """Closes the loaded .archipelago file. Sections of the multidata that were not read yet are dropped."""
+        if self.mapped_multidata is not None:
+            self.mapped_multidata.release()
+            self.mapped_multidata = None
+        if self.multidata_map is not None:
+            self.multidata_map.close()
+            self.multidata_map = None
+
     @staticmethod
-    def decompress(data: bytes) -> dict:
-        format_version = data[0]
-        if format_version > 3:
-            raise Utils.VersionException("Incompatible multidata.")
-        return restricted_loads(zlib.decompress(data[1:]))
+    def decompress(data: bytes) -> typing.Union[MultiData, NetUtils.SectionedMultiData]:
+        return NetUtils.load_multidata(data)
 
     def _load(self, decoded_obj: MultiData, game_data_packages: typing.Dict[str, typing.Any],
               use_embedded_server_options: bool):
@@ -534,6 +827,7 @@ class Context:
         self.random.seed(self.seed_name)
         self.connect_names = decoded_obj['connect_names']
         self.locations = LocationStore(decoded_obj.pop("locations"))  # pre-emptively free memory
+        self.location_checks = LocationChecks(self.locations)
         self.slot_data = decoded_obj['slot_data']
         for slot, data in self.slot_data.items():
             self.read_data[f"slot_data_{slot}"] = lambda data=data: data
@@ -546,6 +840,7 @@ class Context:
 
         for slot, hints in decoded_obj["precollected_hints"].items():
             self.hints[0, slot].update(hints)
+            self.index_hints(0, hints)
 
         # declare slots that aren't players as done
         for slot, slot_info in self.slot_info.items():
@@ -591,33 +886,95 @@ class Context:
         return False
 
     def _save(self, exit_save: bool = False) -> bool:
+        journal = self.save_journal
+        if journal is None or exit_save or journal.needs_compaction:
+            return self._save_full()
         try:
+            self.run_on_main_loop(journal.take_record, self)
+            with journal.lock:
+                journal.write_pending()
+        except Exception as e:
+            self.logger.exception(e)
+            journal.save_size = 0  # compact on the next save, to not lose the changes
+            return False
+        else:
+            return True
+
+    def _save_full(self) -> bool:
+        """Writes the whole save file and, if journaling, starts a new journal for it."""
+        journal = self.save_journal
+
+        def take_save() -> typing.Dict[str, typing.Any]:
+            save = self.get_save()
+            if journal:
+                save["journal_generation"] = journal.start_generation(self)
+            return save
+
+        try:
+            save = self.run_on_main_loop(take_save)
             # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
-            encoded_save = pickle.dumps(self.get_save())
-            with open(self.save_filename, "wb") as f:
-                f.write(zlib.compress(encoded_save))
+            encoded_save = zlib.compress(pickle.dumps(save))
+            with journal.lock if journal else contextlib.nullcontext():
+                if journal and save["journal_generation"] < journal.file_generation:
+                    return True  # a newer save was written in the meantime
+                with open(self.save_filename, "wb") as f:
+                    f.write(encoded_save)
+                if journal:
+                    journal.reset(save["journal_generation"], len(encoded_save))
         except Exception as e:
             self.logger.exception(e)
             return False
         else:
             return True
 
+    def run_on_main_loop(self, function: typing.Callable[..., _Return], *args: typing.Any) -> _Return:
+        """
+        Runs function on the event loop of the server, where the state it reads is changed, and returns its result.
+        Calls it directly if that loop is not running or this is its thread.
+        """
+        loop = self.main_loop
+        if loop is None or not loop.is_running():
+            return function(*args)
+        try:
+            if asyncio.get_running_loop() is loop:
+                return function(*args)
+        except RuntimeError:
+            pass  # not running in an event loop
+
+        async def call() -> _Return:
+            return function(*args)
+
+        return asyncio.run_coroutine_threadsafe(call(), loop).result()
+
     def init_save(self, enabled: bool = True):
         self.saving = enabled
         if self.saving:
+            if self.main_loop is None:
+                with contextlib.suppress(RuntimeError):
+                    self.main_loop = asyncio.get_running_loop()
             if not self.save_filename:
                 import os
                 name, ext = os.path.splitext(self.data_filename)
                 self.save_filename = name + '.apsave' if ext.lower() in ('.archipelago', '.zip') \
                     else self.data_filename + '_' + 'apsave'
+            journal = SaveJournal(self.save_filename + ".journal")
             try:
                 with open(self.save_filename, 'rb') as f:
                     save_data = restricted_loads(zlib.decompress(f.read()))
-                    self.set_save(save_data)
+                replayed = journal.replay(save_data, journal.filename)
+                if replayed:
+                    self.logger.info(f"Replayed {replayed} journaled saves.")
+                self.set_save(save_data)
+                journal.generation = journal.file_generation = save_data.get("journal_generation", 0)
             except FileNotFoundError:
                 self.logger.error('No save data found, starting a new game')
             except Exception as e:
                 self.logger.exception(e)
+                journal = None  # keep the save file as it is until the next save
+            if journal:
+                # compact right away, so the journal only has to record changes from here on
+                self.save_journal = journal
+                self._save_full()
             self._start_async_saving()
 
     def _start_async_saving(self, atexit_save: bool = True):
@@ -651,16 +1008,25 @@ class Context:
                 import atexit
                 atexit.register(self._save, True)  # make sure we save on exit too
 
-    def get_save(self) -> dict:
+    def get_save(self) -> typing.Dict[str, typing.Any]:
         self.recheck_hints()
         d = {
             "version": self.save_version,
             "connect_names": self.connect_names,
             "received_items": self.received_items,
-            "hints_used": dict(self.hints_used),
             "hints": dict(self.hints),
-            "location_checks": dict(self.location_checks),
-            "name_aliases": self.name_aliases,
+            "location_checks": self.location_checks.dump(),
+            "stored_data": self.stored_data,
+            **self.get_save_state(),
+        }
+
+        return d
+
+    def get_save_state(self) -> typing.Dict[str, typing.Any]:
+        """The parts of the save data that are small enough to be written in full with every journaled save."""
+        return {
+            "hints_used": dict(self.hints_used),
+            "name_aliases": dict(self.name_aliases),
             "client_game_state": dict(self.client_game_state),
             "client_activity_timers": tuple(
                 (key, value.timestamp()) for key, value in self.client_activity_timers.items()),
@@ -668,19 +1034,15 @@ class Context:
                 (key, value.timestamp()) for key, value in self.client_connection_timers.items()),
             "random_state": self.random.getstate(),
             "group_collected": dict(self.group_collected),
-            "stored_data": self.stored_data,
             "game_options": {"hint_cost": self.hint_cost, "location_check_points": self.location_check_points,
                              "server_password": self.server_password, "password": self.password,
                              "release_mode": self.release_mode,
                              "remaining_mode": self.remaining_mode, "collect_mode": self.collect_mode,
                              "countdown_mode": self.countdown_mode,
                              "item_cheat": self.item_cheat, "compatibility": self.compatibility}
-
         }
 
-        return d
-
-    def set_save(self, savedata: dict):
+    def set_save(self, savedata: typing.Dict[str, typing.Any]):
         if self.connect_names != savedata["connect_names"]:
             raise Exception("This savegame does not appear to match the loaded multiworld.")
         if savedata["version"] > self.save_version:
@@ -688,6 +1050,10 @@ class Context:
         self.received_items = savedata["received_items"]
         self.hints_used.update(savedata["hints_used"])
         self.hints.update(savedata["hints"])
+        # hints of the multidata may have been replaced by the save
+        self.hints_by_location.clear()
+        for (team, _), hints in self.hints.items():
+            self.index_hints(team, hints)
 
         self.name_aliases.update(savedata["name_aliases"])
         self.client_game_state.update(savedata["client_game_state"])
@@ -697,7 +1063,9 @@ class Context:
         self.client_activity_timers.update(
             {tuple(key): datetime.datetime.fromtimestamp(value, datetime.timezone.utc) for key, value
              in savedata["client_activity_timers"]})
-        self.location_checks.update(savedata["location_checks"])
+        self.location_checks.load(savedata["location_checks"])
+        for key, locations in savedata.get("journal_location_checks", {}).items():
+            self.location_checks[key] |= locations
         self.random.setstate(savedata["random_state"])
 
         if "game_options" in savedata:
@@ -741,17 +1109,44 @@ class Context:
             if slot != hint_slot and slot is not None:
                 continue  # Check specified slot only, all if slot is None
             new_hints: typing.Set[Hint] = set()
+            modified = False
             for hint in self.hints[hint_team, hint_slot]:
                 new_hint = hint.re_check(self, hint_team)
                 new_hints.add(new_hint)
                 if hint == new_hint:
                     continue
+                modified = True
+                self.hints_by_location[hint_team, hint.finding_player, hint.location].discard(hint)
+                self.hints_by_location[hint_team, new_hint.finding_player, new_hint.location].add(new_hint)
                 for player in self.slot_set(hint.receiving_player) | {hint.finding_player}:
                     if changed is not None:
                         changed.add((hint_team,player))
                     if slot is not None and slot != player:
                         self.replace_hint(hint_team, player, hint, new_hint)
             self.hints[hint_team, hint_slot] = new_hints
+            if modified and self.save_journal:
+                self.save_journal.hints.add((hint_team, hint_slot))
+
+    def recheck_location_hints(self, team: int, slot: int, locations: typing.Iterable[int],
+                               changed: typing.Optional[typing.Set[team_slot]] = None) -> None:
+        """Refreshes the hints for the specified locations of team/slot, such as after they were checked.
+        If a set is passed for 'changed', each (team,slot) pair that has at least one hint modified will be added to
+        the set.
+        """
+        for location in locations:
+            for hint in tuple(self.hints_by_location.get((team, slot, location), ())):
+                new_hint = hint.re_check(self, team)
+                if hint == new_hint:
+                    continue
+                for player in self.slot_set(hint.receiving_player) | {hint.finding_player}:
+                    if changed is not None:
+                        changed.add((team, player))
+                    self.replace_hint(team, player, hint, new_hint)
+
+    def index_hints(self, team: int, hints: typing.Iterable[Hint]) -> None:
+        """Adds hints of team to hints_by_location."""
+        for hint in hints:
+            self.hints_by_location[team, hint.finding_player, hint.location].add(hint)
 
     def get_rechecked_hints(self, team: int, slot: int):
         self.recheck_hints(team, slot)
@@ -823,26 +1218,28 @@ class Context:
                 # we can check once if hint already exists
                 if hint not in self.hints[team, hint.finding_player]:
                     self.hints[team, hint.finding_player].add(hint)
+                    self.hints_by_location[team, hint.finding_player, hint.location].add(hint)
                     new_hint_events.add(hint.finding_player)
                     for player in self.slot_set(hint.receiving_player):
                         self.hints[team, player].add(hint)
                         new_hint_events.add(player)
+                    if self.save_journal:
+                        self.save_journal.hints.update((team, player) for player in new_hint_events)
 
             self.logger.info("Notice (Team #%d): %s" % (team + 1, format_hint(self, team, hint)))
         for slot in new_hint_events:
             self.on_new_hint(team, slot)
         for slot, hint_data in concerns.items():
             if recipients is None or slot in recipients:
-                clients = filter(lambda c: not c.no_text, self.clients[team].get(slot, []))
+                clients = [client for client in self.clients[team].get(slot, []) if not client.no_text]
                 if not clients:
                     continue
                 client_hints = [datum[1] for datum in sorted(hint_data, key=lambda x: x[0].finding_player != slot)]
-                for client in clients:
-                    async_start(self.send_msgs(client, client_hints))
+                self.broadcast(clients, client_hints)
 
     def get_hint(self, team: int, finding_player: int, seeked_location: int) -> typing.Optional[Hint]:
-        for hint in self.hints[team, finding_player]:
-            if hint.location == seeked_location and hint.finding_player == finding_player:
+        for hint in self.hints_by_location.get((team, finding_player, seeked_location), ()):
+            if hint in self.hints[team, finding_player]:
                 return hint
         return None
     
@@ -850,6 +1247,10 @@ class Context:
         if old_hint in self.hints[team, slot]:
             self.hints[team, slot].remove(old_hint)
             self.hints[team, slot].add(new_hint)
+            self.hints_by_location[team, old_hint.finding_player, old_hint.location].discard(old_hint)
+            self.hints_by_location[team, new_hint.finding_player, new_hint.location].add(new_hint)
+            if self.save_journal:
+                self.save_journal.hints.add((team, slot))
     
     # "events"
 
@@ -887,9 +1288,7 @@ def update_aliases(ctx: Context, team: int):
     cmd = ctx.dumper([{"cmd": "RoomUpdate",
                        "players": ctx.get_players_package()}])
 
-    for clients in ctx.clients[team].values():
-        for client in clients:
-            async_start(ctx.send_encoded_msgs(client, cmd))
+    ctx.queue_encoded_msgs(itertools.chain.from_iterable(ctx.clients[team].values()), cmd)
 
 
 async def server(websocket: "ServerConnection", path: str = "/", ctx: Context = None) -> None:
@@ -1057,6 +1456,15 @@ def get_status_string(ctx: Context, team: int, tag: str):
     return text
 
 
+def get_traffic_string(ctx: Context) -> str:
+    text = "Outgoing traffic per connection:"
+    for client in ctx.endpoints:
+        name = ctx.get_aliased_name(client.team, client.slot) if client.auth else "(not connected to a slot)"
+        text += f"\n{name}: {client.sent_bytes} bytes in {client.sent_frames} frames, " \
+                f"up to {client.max_queue_depth} queued message lists, {len(client.outbox)} queued now"
+    return text
+
+
 def get_received_items(ctx: Context, team: int, player: int, remote_items: bool) -> typing.List[NetworkItem]:
     return ctx.received_items.setdefault((team, player, remote_items), [])
 
@@ -1066,19 +1474,25 @@ def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool)
 
 
 def send_new_items(ctx: Context):
-    for team, clients in ctx.clients.items():
-        for slot, clients in clients.items():
-            for client in clients:
-                if client.no_items:
-                    continue
-                start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
-                items = get_received_items(ctx, team, slot, client.remote_items)
-                if len(start_inventory) + len(items) > client.send_index:
-                    first_new_item = max(0, client.send_index - len(start_inventory))
-                    async_start(ctx.send_msgs(client, [{
-                        "cmd": "ReceivedItems",
-                        "index": client.send_index,
-                        "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
+    """Sends newly received items to the clients of ctx.pending_receivers."""
+    pending_receivers, ctx.pending_receivers = ctx.pending_receivers, set()
+    for team, slot in pending_receivers:
+        clients = ctx.clients.get(team, {}).get(slot, ())
+        # clients that are at the same index of the same items get the same message, so it is only encoded once
+        receivers: typing.Dict[typing.Tuple[bool, bool, int], typing.List[Client]] = collections.defaultdict(list)
+        for client in clients:
+            if not client.no_items:
+                receivers[client.remote_items, client.remote_start_inventory, client.send_index].append(client)
+        for (remote_items, remote_start_inventory, send_index), endpoints in receivers.items():
+            start_inventory = get_start_inventory(ctx, slot, remote_start_inventory)
+            items = get_received_items(ctx, team, slot, remote_items)
+            if len(start_inventory) + len(items) > send_index:
+                first_new_item = max(0, send_index - len(start_inventory))
+                ctx.broadcast(endpoints, [{
+                    "cmd": "ReceivedItems",
+                    "index": send_index,
+                    "items": start_inventory[send_index:] + items[first_new_item:]}])
+                for client in endpoints:
                     client.send_index = len(start_inventory) + len(items)
 
 
@@ -1127,6 +1541,7 @@ def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem
             if item.player != target_slot:
                 get_received_items(ctx, team, target, False).append(item)
             get_received_items(ctx, team, target, True).append(item)
+        ctx.pending_receivers.add((team, target))
 
 
 def register_location_checks(ctx: Context, team: int, slot: int, locations: typing.Iterable[int],
@@ -1164,6 +1579,8 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
         del sortable
 
         ctx.location_checks[team, slot] |= new_locations
+        if ctx.save_journal:
+            ctx.save_journal.location_checks[team, slot] |= new_locations
         send_new_items(ctx)
         ctx.broadcast(ctx.clients[team][slot], [{
             "cmd": "RoomUpdate",
@@ -1171,7 +1588,7 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
             "checked_locations": new_locations,  # send back new checks only
         }])
         updated_slots: typing.Set[tuple[int, int]] = set()
-        ctx.recheck_hints(team, slot, updated_slots)
+        ctx.recheck_location_hints(team, slot, new_locations, updated_slots)
         for hint_team, hint_slot in updated_slots:
             ctx.on_changed_hints(hint_team, hint_slot)
         ctx.save()
@@ -1663,6 +2080,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
                 new_item = NetworkItem(names[item_name], -1, self.client.slot)
                 get_received_items(self.ctx, self.client.team, self.client.slot, False).append(new_item)
                 get_received_items(self.ctx, self.client.team, self.client.slot, True).append(new_item)
+                self.ctx.pending_receivers.add((self.client.team, self.client.slot))
                 self.ctx.broadcast_text_all(
                     'Cheat console: sending "' + item_name + '" to ' + self.ctx.get_aliased_name(self.client.team,
                                                                                                  self.client.slot),
@@ -1680,9 +2098,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
         points_available = get_client_points(self.ctx, self.client)
         cost = self.ctx.get_hint_cost(self.client.slot)
         if not input_text:
-            hints = {hint.re_check(self.ctx, self.client.team) for hint in
-                     self.ctx.hints[self.client.team, self.client.slot]}
-            self.ctx.hints[self.client.team, self.client.slot] = hints
+            hints = self.ctx.get_rechecked_hints(self.client.team, self.client.slot)
             self.ctx.notify_hints(self.client.team, list(hints), recipients=(self.client.slot,))
             self.output(f"A hint costs {self.ctx.get_hint_cost(self.client.slot)} points. "
                         f"You have {points_available} points.")
@@ -2175,6 +2591,8 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                 func = modify_functions[operation["operation"]]
                 value = func(value, operation["value"])
             ctx.stored_data[args["key"]] = args["value"] = value
+            if ctx.save_journal:
+                ctx.save_journal.stored_data.add(args["key"])
             targets = set(ctx.stored_data_notification_clients[args["key"]])
             if args.get("want_reply", False):
                 targets.add(client)
@@ -2243,6 +2661,11 @@ class ServerCommandProcessor(CommonCommandProcessor):
             self.output(get_status_string(self.ctx, team, tag))
         return True
 
+    def _cmd_traffic(self) -> bool:
+        """Get the bytes and frames sent to each connection and how many message lists were queued for them."""
+        self.output(get_traffic_string(self.ctx))
+        return True
+
     def _cmd_exit(self) -> bool:
         """Shutdown the server"""
         try:
@@ -2730,11 +3153,13 @@ async def main(args: argparse.Namespace):
     console_task.cancel()
     if ctx.shutdown_task:
         await ctx.shutdown_task
+    ctx.close_multidata()
 
 
 client_message_processor = ClientMessageProcessor
 
 if __name__ == '__main__':
+    Utils.lazy_world_loading = True
     try:
         asyncio.run(main(parse_args()))
     except asyncio.exceptions.CancelledError:
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
+from bisect import bisect_left
 from collections.abc import Mapping, Sequence
 import typing
 import enum
+import struct
 import warnings
+import zlib
 from json import JSONEncoder, JSONDecoder
 
 if typing.TYPE_CHECKING:
     from websockets import WebSocketServerProtocol as ServerConnection
 
-from Utils import ByValue, Version
+from Utils import ByValue, Version, VersionException, restricted_dumps, restricted_loads
 
 
 class HintStatus(ByValue, enum.IntEnum):
@@ -415,8 +418,12 @@ class Hint(typing.NamedTuple):
 
 
 class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tuple[int, int, int]]]):
+    _sorted_locations: typing.Dict[int, typing.List[int]]
+    """locations of each slot in ascending order, the order of the bits of CheckedLocations"""
+
     def __init__(self, values: typing.MutableMapping[int, typing.Dict[int, typing.Tuple[int, int, int]]]):
         super().__init__(values)
+        self._sorted_locations = {}
 
         if not self:
             raise ValueError(f"Rejecting game with 0 players")
@@ -473,6 +480,142 @@ class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tu
                         location_id in player_locations if
                         location_id not in checked])
 
+    def _get_sorted_locations(self, slot: int) -> typing.List[int]:
+        try:
+            return self._sorted_locations[slot]
+        except KeyError:
+            locations = self._sorted_locations[slot] = sorted(self[slot])
+            return locations
+
+    def get_location_index(self, slot: int, location: int) -> int:
+        """Returns the position of location among the locations of slot in ascending order, or -1 if it has none."""
+        locations = self._get_sorted_locations(slot)
+        index = bisect_left(locations, location)
+        if index < len(locations) and locations[index] == location:
+            return index
+        return -1
+
+    def get_checked_from_bits(self, slot: int, bits: typing.Union[bytes, bytearray]) -> typing.List[int]:
+        """Returns the locations of slot whose bits are set, in ascending order."""
+        locations = self._get_sorted_locations(slot)
+        checked: typing.List[int] = []
+        for byte_index, byte in enumerate(bits):
+            if byte:
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        checked.append(locations[byte_index * 8 + bit])
+        return checked
+
+
+class CheckedLocations(typing.MutableSet[int]):
+    """
+    The checked locations of a slot, stored as a bitset over the locations of the slot in a LocationStore in ascending
+    order. Behaves like a set of location ids, while to_bytes gives the bitset for save files.
+    """
+    __slots__ = ("store", "slot", "bits", "_count")
+    store: LocationStore
+    slot: int
+    bits: bytearray
+    _count: int
+
+    def __init__(self, store: LocationStore, slot: int,
+                 data: typing.Union[bytes, bytearray, typing.Iterable[int]] = b"") -> None:
+        self.store = store
+        self.slot = slot
+        size = (len(store[slot]) + 7) // 8
+        if isinstance(data, (bytes, bytearray)):
+            if len(data) > size:
+                raise ValueError(f"Too many checked location bits for player {slot}")
+            self.bits = bytearray(data) + bytes(size - len(data))
+            self._count = int.from_bytes(self.bits, "little").bit_count()
+        else:
+            self.bits = bytearray(size)
+            self._count = 0
+            self |= data
+
+    @classmethod
+    def _from_iterable(cls, iterable: typing.Iterable[int]) -> typing.Set[int]:
+        # results of set operations are plain sets
+        return set(iterable)
+
+    def __contains__(self, location: object) -> bool:
+        if not isinstance(location, int):
+            return False
+        index = self.store.get_location_index(self.slot, location)
+        return index >= 0 and bool(self.bits[index >> 3] >> (index & 7) & 1)
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self.store.get_checked_from_bits(self.slot, self.bits))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({set(self)!r})"
+
+    def add(self, location: int) -> None:
+        index = self.store.get_location_index(self.slot, location)
+        if index < 0:
+            raise KeyError(f"No location {location} for player {self.slot}")
+        mask = 1 << (index & 7)
+        if not self.bits[index >> 3] & mask:
+            self.bits[index >> 3] |= mask
+            self._count += 1
+
+    def discard(self, location: int) -> None:
+        index = self.store.get_location_index(self.slot, location)
+        if index >= 0:
+            mask = 1 << (index & 7)
+            if self.bits[index >> 3] & mask:
+                self.bits[index >> 3] &= ~mask
+                self._count -= 1
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.bits)
+
+
+def decode_checked_locations(data: typing.Union[bytes, typing.Iterable[int]], locations: typing.Iterable[int]
+                             ) -> typing.Set[int]:
+    """
+    Returns the set of checked locations from a save file, which stores the bits of CheckedLocations, for readers
+    without a LocationStore. locations are all locations of the slot. Older save files store the set itself.
+    """
+    if not isinstance(data, (bytes, bytearray)):
+        return set(data)
+    checked = int.from_bytes(data, "little")
+    return {location for index, location in enumerate(sorted(locations)) if checked >> index & 1}
+
+
+class LocationChecks(typing.Dict[typing.Tuple[int, int], typing.Set[int]]):
+    """
+    Checked locations by team and slot. Once there is a LocationStore, those are CheckedLocations of it, before that
+    they are plain sets.
+    """
+    store: typing.Optional[LocationStore]
+
+    def __init__(self, store: typing.Optional[LocationStore] = None) -> None:
+        super().__init__()
+        self.store = store
+
+    def __missing__(self, key: typing.Tuple[int, int]) -> typing.Set[int]:
+        value = self[key] = set() if self.store is None else CheckedLocations(self.store, key[1])
+        return value
+
+    def load(self, saved: typing.Mapping[typing.Tuple[int, int], typing.Union[bytes, typing.Iterable[int]]]) -> None:
+        """Loads checked locations as written by dump, or the sets of older save files."""
+        for key, data in saved.items():
+            if self.store is not None:
+                self[key] = CheckedLocations(self.store, key[1], data)
+            elif isinstance(data, (bytes, bytearray)):
+                raise ValueError("Checked locations stored as bits can't be loaded without a LocationStore")
+            else:
+                self[key] = set(data)
+
+    def dump(self) -> typing.Dict[typing.Tuple[int, int], typing.Union[bytes, typing.Set[int]]]:
+        """Returns the checked locations for a save file, as bytes of the bitsets of CheckedLocations."""
+        return {key: checked.to_bytes() if isinstance(checked, CheckedLocations) else set(checked)
+                for key, checked in self.items()}
+
 
 class MinimumVersions(typing.TypedDict):
     server: tuple[int, int, int]
@@ -510,6 +653,113 @@ class MultiData(typing.TypedDict):
     race_mode: int
 
 
+multidata_format_version = 4
+"""
+First byte of .archipelago files. Up to 3, the rest of the file is the zlib compressed pickled MultiData.
+Since 4, each top-level key of MultiData is a section of its own, which is pickled and zlib compressed on its own, so
+that it can be written and read without holding the others in memory. The sections are followed by the pickled table
+of contents, {key: (offset, size)}, and its size as 8 byte little endian unsigned integer.
+"""
+
+
+class SectionedMultiData(typing.MutableMapping[str, typing.Any]):
+    """
+    MultiData read from the sectioned format, which only decompresses a section when it is first accessed.
+    `data` may be an mmap of the file.
+    """
+    raw_sections: dict[str, memoryview]
+    """compressed sections that were not decompressed yet"""
+    sections: dict[str, typing.Any]
+    """decompressed sections"""
+    keys_order: dict[str, None]
+    view: memoryview
+    """view of the whole data, which the compressed sections are views of"""
+
+    def __init__(self, data: typing.Union[bytes, bytearray, memoryview, typing.Any]) -> None:
+        self.view = view = memoryview(data)
+        toc_size, = struct.unpack_from("<Q", view, len(view) - 8)
+        toc_offset = len(view) - 8 - toc_size
+        toc: dict[str, tuple[int, int]] = restricted_loads(view[toc_offset:toc_offset + toc_size])
+        self.raw_sections = {key: view[offset:offset + size] for key, (offset, size) in toc.items()}
+        self.sections = {}
+        self.keys_order = dict.fromkeys(toc)
+
+    def __getitem__(self, key: str) -> typing.Any:
+        try:
+            return self.sections[key]
+        except KeyError:
+            raw_section = self.raw_sections.get(key)
+            if raw_section is None:
+                # unknown, or decompressed by another thread in the meantime
+                return self.sections[key]
+            value = self.sections[key] = restricted_loads(zlib.decompress(raw_section))
+            self.raw_sections.pop(key, None)
+            return value
+
+    def __setitem__(self, key: str, value: typing.Any) -> None:
+        self.raw_sections.pop(key, None)
+        self.sections[key] = value
+        self.keys_order[key] = None
+
+    def __delitem__(self, key: str) -> None:
+        del self.keys_order[key]
+        self.raw_sections.pop(key, None)
+        self.sections.pop(key, None)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.keys_order)
+
+    def __len__(self) -> int:
+        return len(self.keys_order)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.keys_order
+
+    def release(self) -> None:
+        """
+        Releases the views of the data, so it can be closed if it is an mmap.
+        Sections that were not accessed yet are dropped.
+        """
+        for key, section in self.raw_sections.items():
+            section.release()
+            del self.keys_order[key]
+        self.raw_sections.clear()
+        self.view.release()
+
+
+def dump_multidata(multidata: typing.Mapping[str, typing.Any], file: typing.BinaryIO) -> None:
+    """
+    Writes multidata to file in the sectioned format, one section at a time.
+    Sections of a SectionedMultiData that were never accessed are copied without decompressing them.
+    """
+    raw_sections = multidata.raw_sections if isinstance(multidata, SectionedMultiData) else {}
+    toc: dict[str, tuple[int, int]] = {}
+    file.write(bytes([multidata_format_version]))
+    offset = 1
+    for key in multidata:
+        if key in raw_sections:
+            section: typing.Union[bytes, memoryview] = raw_sections[key]
+        else:
+            section = zlib.compress(restricted_dumps(multidata[key]), 9)
+        file.write(section)
+        toc[key] = offset, len(section)
+        offset += len(section)
+    encoded_toc = restricted_dumps(toc)
+    file.write(encoded_toc)
+    file.write(struct.pack("<Q", len(encoded_toc)))
+
+
+def load_multidata(data: typing.Union[bytes, bytearray, memoryview, typing.Any]
+                   ) -> typing.Union[MultiData, SectionedMultiData]:
+    """Reads multidata of any known format version from the contents of an .archipelago file."""
+    format_version = data[0]
+    if format_version > multidata_format_version:
+        raise VersionException("Incompatible multidata.")
+    if format_version == multidata_format_version:
+        return SectionedMultiData(data)
+    return restricted_loads(zlib.decompress(data[1:]))
+
+
 if typing.TYPE_CHECKING:  # type-check with pure python implementation until we have a typing stub
     LocationStore = _LocationStore
 else:
@@ -55,6 +55,9 @@ is_linux = sys.platform.startswith("linux")
 is_macos = sys.platform == "darwin"
 is_windows = sys.platform in ("win32", "cygwin", "msys")
 
+# set before worlds is first imported to only import worlds when they are looked up, see worlds/__init__.py
+lazy_world_loading = False
+
 
 def int16_as_bytes(value: int) -> typing.List[int]:
     value = value & 0xFFFF
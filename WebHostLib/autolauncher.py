@@ -15,6 +15,8 @@ from Utils import restricted_loads
 from .locker import Locker, AlreadyRunningException
 
 _stop_event = Event()
+_hosters: list[MultiworldInstance] = []
+"""MultiworldInstances started by autohost in this process"""
 
 
 def stop() -> None:
@@ -25,6 +27,13 @@ def stop() -> None:
     stop_event.set()
 
 
+def notify_room_command(room_id: UUID) -> None:
+    """Wakes up the command dispatcher of the hoster of the room, if autohost runs in this process."""
+    hosters = _hosters
+    if hosters:
+        hosters[room_id.int % len(hosters)].room_commands.put(room_id)
+
+
 def handle_generation_success(seed_id):
     logging.info(f"Generation finished for seed {seed_id}")
 
@@ -124,6 +133,7 @@ def autohost(config: dict):
                     hoster = MultiworldInstance(config, x)
                     hosters.append(hoster)
                     hoster.start()
+                _hosters[:] = hosters
 
                 while not stop_event.wait(0.1):
                     with db_session:
@@ -137,6 +147,8 @@ def autohost(config: dict):
 
         except AlreadyRunningException:
             logging.info("Autohost reports as already running, not starting another.")
+        finally:
+            _hosters.clear()
 
     Thread(target=keep_running, name="AP_Autohost").start()
 
@@ -189,20 +201,37 @@ class MultiworldInstance():
         self.host = config["HOST_ADDRESS"]
         self.rooms_to_start = multiprocessing.Queue()
         self.rooms_shutting_down = multiprocessing.Queue()
+        self.room_commands = multiprocessing.Queue()
+        self.tracker_snapshots = multiprocessing.Queue()
+        self.snapshot_receiver: typing.Optional[Thread] = None
         self.name = f"MultiHoster{id}"
 
     def start(self):
         if self.process and self.process.is_alive():
             return False
 
+        # snapshots of rooms of a previous process may never have been dropped
+        for room_id in self.room_ids:
+            update_tracker_snapshot(room_id, None)
+        if not self.snapshot_receiver:
+            self.snapshot_receiver = Thread(target=self.receive_tracker_snapshots, name=f"{self.name}_Snapshots",
+                                            daemon=True)
+            self.snapshot_receiver.start()
+
         process = multiprocessing.Process(group=None, target=run_server_process,
                                           args=(self.name, self.ponyconfig, get_static_server_data(),
                                                 self.cert, self.key, self.host,
-                                                self.rooms_to_start, self.rooms_shutting_down),
+                                                self.rooms_to_start, self.rooms_shutting_down, self.room_commands,
+                                                self.tracker_snapshots),
                                           name=self.name)
         process.start()
         self.process = process
 
+    def receive_tracker_snapshots(self):
+        while 1:
+            room_id, changes = self.tracker_snapshots.get(block=True, timeout=None)
+            update_tracker_snapshot(room_id, changes)
+
     def start_room(self, room_id):
         while not self.rooms_shutting_down.empty():
             self.room_ids.remove(self.rooms_shutting_down.get(block=True, timeout=None))
@@ -227,4 +256,5 @@ class MultiworldInstance():
 
 from .models import Room, Generation, STATE_QUEUED, STATE_STARTED, STATE_ERROR, db, Seed, Slot
 from .customserver import run_server_process, get_static_server_data
+from .tracker import update_tracker_snapshot
 from .generate import gen_game
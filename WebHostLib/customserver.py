@@ -10,9 +10,9 @@ import pickle
 import random
 import socket
 import threading
-import time
 import typing
 import sys
+from uuid import UUID
 
 import websockets
 from pony.orm import commit, db_session, select
@@ -62,6 +62,10 @@ class DBCommandProcessor(ServerCommandProcessor):
 
 class WebHostContext(Context):
     room_id: int
+    tracker_snapshots: typing.Optional[multiprocessing.Queue] = None
+    """receives the changes to the tracker snapshot of the room, see get_tracker_snapshot_changes"""
+    _published_tracker_state: typing.Dict[str, typing.Dict[typing.Any, typing.Any]]
+    _tracker_snapshots_lock: threading.Lock
 
     def __init__(self, static_server_data: dict, logger: logging.Logger):
         # static server data is used during _load_game_data to load required data,
@@ -74,6 +78,8 @@ class WebHostContext(Context):
         self.main_loop = asyncio.get_running_loop()
         self.video = {}
         self.tags = ["AP", "WebHost"]
+        self._published_tracker_state = {}
+        self._tracker_snapshots_lock = threading.Lock()
 
     def __del__(self):
         try:
@@ -89,20 +95,6 @@ class WebHostContext(Context):
             setattr(self, key, value)
         self.non_hintable_names = collections.defaultdict(frozenset, self.non_hintable_names)
 
-    def listen_to_db_commands(self):
-        cmdprocessor = DBCommandProcessor(self)
-
-        while not self.exit_event.is_set():
-            with db_session:
-                commands = select(command for command in Command if command.room.id == self.room_id)
-                if commands:
-                    for command in commands:
-                        self.main_loop.call_soon_threadsafe(cmdprocessor, command.commandtext)
-                        command.delete()
-                    commit()
-            del commands
-            time.sleep(5)
-
     @db_session
     def load(self, room_id: int):
         self.room_id = room_id
@@ -158,24 +150,128 @@ class WebHostContext(Context):
                 if savegame_data:
                     self.set_save(restricted_loads(Room.get(id=self.room_id).multisave))
             self._start_async_saving(atexit_save=False)
-        threading.Thread(target=self.listen_to_db_commands, daemon=True).start()
 
     @db_session
     def _save(self, exit_save: bool = False) -> bool:
+        # rooms are not journaled, the tracker reads the whole save from Room.multisave
         room = Room.get(id=self.room_id)
         # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
         room.multisave = pickle.dumps(self.get_save())
         # saving only occurs on activity, so we can "abuse" this information to mark this as last_activity
         if not exit_save:  # we don't want to count a shutdown as activity, which would restart the server again
             room.last_activity = datetime.datetime.utcnow()
+        with self._tracker_snapshots_lock:
+            if self.tracker_snapshots is not None:
+                changes = self.get_tracker_snapshot_changes()
+                if changes:
+                    self.tracker_snapshots.put((self.room_id, changes))
         return True
 
+    def close_tracker_snapshots(self) -> None:
+        """Drops the tracker snapshot of the room. Saves still running on the saving thread won't publish afterwards."""
+        with self._tracker_snapshots_lock:
+            if self.tracker_snapshots is not None:
+                self.tracker_snapshots.put((self.room_id, None))
+                self.tracker_snapshots = None
+
+    def get_tracker_snapshot_changes(self) -> typing.Dict[str, typing.Dict[typing.Any, typing.Any]]:
+        """
+        Returns the entries of the parts of the save read by WebHostLib.tracker.TrackerData that changed since the last
+        call, by section. Applied to each other in order, they give the state of the room without unpickling the save.
+        """
+        # checked locations and received items only ever grow, so comparing their size is enough
+        sections = {
+            "location_checks": (self.location_checks, len, set),
+            "received_items": ({key: items for key, items in self.received_items.items() if key[2]}, len, list),
+            "hints": (self.hints, frozenset, set),
+            "client_game_state": (self.client_game_state, None, None),
+            "name_aliases": (self.name_aliases, None, None),
+            "client_activity_timers": ({key: timer.timestamp() for key, timer in self.client_activity_timers.items()},
+                                       None, None),
+            "video": (self.video, None, None),
+        }
+        changes = {}
+        for section, (entries, get_version, copy) in sections.items():
+            published = self._published_tracker_state.setdefault(section, {})
+            changed = {}
+            for key, value in list(entries.items()):
+                version = get_version(value) if get_version else value
+                if key not in published or published[key] != version:
+                    published[key] = version
+                    # the queue pickles in the background, so mutable values are copied now
+                    changed[key] = copy(value) if copy else value
+            if changed:
+                changes[section] = changed
+        return changes
+
     def get_save(self) -> dict:
         d = super(WebHostContext, self).get_save()
         d["video"] = [(tuple(playerslot), videodata) for playerslot, videodata in self.video.items()]
         return d
 
 
+class CommandDispatcher(threading.Thread):
+    """
+    Delivers the commands queued for rooms through the WebHost to the rooms running in this process, fetching the
+    commands of all of them in one query. Checks every poll_interval seconds, or right away when a room id is put into
+    the notifications queue.
+    """
+    poll_interval: float = 5
+    notifications: typing.Optional[multiprocessing.Queue]
+    _rooms: typing.Dict[UUID, typing.Tuple[asyncio.AbstractEventLoop, DBCommandProcessor]]
+
+    def __init__(self, notifications: typing.Optional[multiprocessing.Queue] = None):
+        super().__init__(name="CommandDispatcher", daemon=True)
+        self.notifications = notifications
+        self._rooms = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def add_room(self, ctx: WebHostContext) -> None:
+        with self._lock:
+            self._rooms[ctx.room_id] = ctx.main_loop, DBCommandProcessor(ctx)
+
+    def remove_room(self, room_id: UUID) -> None:
+        with self._lock:
+            self._rooms.pop(room_id, None)
+
+    def dispatch(self) -> int:
+        """Hands every queued command of the running rooms to its room's event loop. Returns the number of commands."""
+        with self._lock:
+            rooms = dict(self._rooms)
+        if not rooms:
+            return 0
+
+        room_ids = list(rooms)
+        dispatched = 0
+        with db_session:
+            commands = select(command for command in Command if command.room.id in room_ids).order_by(Command.id)
+            for command in commands:
+                loop, cmdprocessor = rooms[command.room.id]
+                loop.call_soon_threadsafe(cmdprocessor, command.commandtext)
+                command.delete()
+                dispatched += 1
+            if dispatched:
+                commit()
+        return dispatched
+
+    def _wait_for_notifications(self):
+        while 1:
+            self.notifications.get(block=True, timeout=None)
+            self._wakeup.set()
+
+    def run(self):
+        if self.notifications is not None:
+            threading.Thread(target=self._wait_for_notifications, name="CommandNotifications", daemon=True).start()
+        while 1:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            try:
+                self.dispatch()
+            except Exception as e:
+                logging.exception(e)
+
+
 def get_random_port():
     return random.randint(49152, 65535)
 
@@ -185,8 +281,8 @@ def get_static_server_data() -> dict:
     import worlds
     data = {
         "non_hintable_names": {
-            world_name: world.hint_blacklist
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
+            world_name: frozenset(entry["hint_blacklist"])
+            for world_name, entry in worlds.world_index.items()
         },
         "gamespackage": {
             world_name: {
@@ -197,12 +293,12 @@ def get_static_server_data() -> dict:
             for world_name, game_package in worlds.network_data_package["games"].items()
         },
         "item_name_groups": {
-            world_name: world.item_name_groups
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
+            world_name: game_package["item_name_groups"]
+            for world_name, game_package in worlds.network_data_package["games"].items()
         },
         "location_name_groups": {
-            world_name: world.location_name_groups
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
+            world_name: game_package["location_name_groups"]
+            for world_name, game_package in worlds.network_data_package["games"].items()
         },
     }
 
@@ -231,7 +327,9 @@ def set_up_logging(room_id) -> logging.Logger:
 
 def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                        cert_file: typing.Optional[str], cert_key_file: typing.Optional[str],
-                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue):
+                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue,
+                       room_commands: typing.Optional[multiprocessing.Queue] = None,
+                       tracker_snapshots: typing.Optional[multiprocessing.Queue] = None):
     from setproctitle import setproctitle
 
     setproctitle(name)
@@ -275,14 +373,18 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
     gc.collect()  # free intermediate objects used during setup
 
     loop = asyncio.get_event_loop()
+    dispatcher = CommandDispatcher(room_commands)
+    dispatcher.start()
 
     async def start_room(room_id):
         with Locker(f"RoomLocker {room_id}"):
             try:
                 logger = set_up_logging(room_id)
                 ctx = WebHostContext(static_server_data, logger)
+                ctx.tracker_snapshots = tracker_snapshots
                 ctx.load(room_id)
                 ctx.init_save()
+                dispatcher.add_room(ctx)
                 assert ctx.server is None
                 try:
                     ctx.server = websockets.serve(
@@ -339,9 +441,12 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                     ctx._save()
                     setattr(asyncio.current_task(), "save", None)
             finally:
+                dispatcher.remove_room(room_id)
                 try:
                     ctx.save_dirty = False  # make sure the saving thread does not write to DB after final wakeup
                     ctx.exit_event.set()  # make sure the saving thread stops at some point
+                    # after any save the saving thread is still in, so its changes can't recreate the snapshot
+                    ctx.close_tracker_snapshots()
                     # NOTE: async saving should probably be an async task and could be merged with shutdown_task
                     with db_session:
                         # ensure the Room does not spin up again on its own, minute of safety buffer
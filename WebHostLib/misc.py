@@ -217,8 +217,10 @@ def host_room_command(room: UUID):
     if room.owner == session["_id"]:
         cmd = request.form["cmd"]
         if cmd:
+            from .autolauncher import notify_room_command
             Command(room=room, commandtext=cmd)
             commit()
+            notify_room_command(room.id)
     return redirect(url_for("host_room", room=room.id))
 
 
@@ -1,7 +1,8 @@
 import datetime
 import collections
+import functools
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, NamedTuple, Counter
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple, NamedTuple, Counter
 from uuid import UUID
 from email.utils import parsedate_to_datetime
 
@@ -9,16 +10,18 @@ from flask import make_response, render_template, request, Request, Response
 from werkzeug.exceptions import abort
 
 from MultiServer import Context, get_saving_second
-from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
+from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType, decode_checked_locations
 from Utils import restricted_loads, KeyedDefaultDict
 from . import app, cache
-from .models import GameDataPackage, Room
+from .models import GameDataPackage, Room, Seed
 
 # Multisave is currently updated, at most, every minute.
 TRACKER_CACHE_TIMEOUT_IN_SECONDS = 60
 
 _multiworld_trackers: Dict[str, Callable] = {}
 _player_trackers: Dict[str, Callable] = {}
+_tracker_snapshots: Dict[UUID, Dict[str, Dict[Any, Any]]] = {}
+"""the parts of the multisave read by TrackerData, published by the server processes of running rooms"""
 
 TeamPlayer = Tuple[int, int]
 ItemMetadata = Tuple[int, int, int]
@@ -40,6 +43,69 @@ def _cache_results(func: Callable) -> Callable:
     return method_wrapper
 
 
+def update_tracker_snapshot(room_id: UUID, changes: Optional[Dict[str, Dict[Any, Any]]]) -> None:
+    """Applies changes published by the server process of a room to its snapshot, or drops the snapshot if changes is
+    None, which the room publishes when it shuts down. See WebHostContext.get_tracker_snapshot_changes.
+    """
+    if changes is None:
+        _tracker_snapshots.pop(room_id, None)
+        return
+
+    # replaced instead of updated, so a TrackerData that is reading the old snapshot does not see partial changes
+    snapshot = dict(_tracker_snapshots.get(room_id, {}))
+    for section, entries in changes.items():
+        snapshot[section] = {**snapshot.get(section, {}), **entries}
+    _tracker_snapshots[room_id] = snapshot
+
+
+@functools.lru_cache(maxsize=512)
+def _get_datapackage_tables(checksum: str) -> Tuple[Dict[int, str], Dict[int, str], Dict[str, int], Dict[str, int]]:
+    """Returns the inverse and normal lookup tables of items and locations of a data package, cached per checksum.
+    The tables are shared by every request for a room using the data package, so they must not be modified.
+    """
+    game_package = restricted_loads(GameDataPackage.get(checksum=checksum).data)
+    return (
+        {id: name for name, id in game_package["item_name_to_id"].items()},
+        {id: name for name, id in game_package["location_name_to_id"].items()},
+        game_package["item_name_to_id"],
+        game_package["location_name_to_id"],
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _get_multidata(seed_id: UUID) -> Mapping[str, Any]:
+    """Returns the multidata of a seed, which never changes, cached per seed. Must not be modified."""
+    return Context.decompress(Seed.get(id=seed_id).multidata)
+
+
+class _IdToName(Mapping[int, str]):
+    """Read-only view of a cached id -> name table, which names unknown ids with the unknown format string instead of
+    raising KeyError. Unlike KeyedDefaultDict, looking up unknown ids doesn't add them to the table."""
+    __slots__ = ("table", "unknown")
+
+    def __init__(self, table: Dict[int, str], unknown: str) -> None:
+        self.table = table
+        self.unknown = unknown
+
+    def __getitem__(self, code: int) -> str:
+        try:
+            return self.table[code]
+        except KeyError:
+            return self.unknown.format(code)
+
+    def __contains__(self, code: object) -> bool:
+        return code in self.table
+
+    def get(self, code: int, default: Any = None) -> Any:
+        return self.table.get(code, default)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.table)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+
 @dataclass
 class TrackerData:
     """A helper dataclass that is instantiated each time an HTTP request comes in for tracker data.
@@ -48,37 +114,36 @@ class TrackerData:
     subsequent helper method calls do not need to recompute results during the lifetime of this instance.
     """
     room: Room
-    _multidata: Dict[str, Any]
+    _multidata: Mapping[str, Any]
+    """sections of the multidata are only decompressed once the tracker accesses them"""
     _multisave: Dict[str, Any]
     _tracker_cache: Dict[str, Any]
 
     def __init__(self, room: Room):
         """Initialize a new RoomMultidata object for the current room."""
         self.room = room
-        self._multidata = Context.decompress(room.seed.multidata)
-        self._multisave = restricted_loads(room.multisave) if room.multisave else {}
+        self._multidata = _get_multidata(room.seed.id)
+        # a running room publishes its state to this process, otherwise it's read from the last save
+        self._multisave = _tracker_snapshots.get(room.id)
+        if self._multisave is None:
+            self._multisave = restricted_loads(room.multisave) if room.multisave else {}
         self._tracker_cache = {}
 
         self.item_name_to_id: Dict[str, Dict[str, int]] = {}
         self.location_name_to_id: Dict[str, Dict[str, int]] = {}
 
         # Generate inverse lookup tables from data package, useful for trackers.
-        self.item_id_to_name: Dict[str, Dict[int, str]] = KeyedDefaultDict(lambda game_name: {
+        self.item_id_to_name: Dict[str, Mapping[int, str]] = KeyedDefaultDict(lambda game_name: {
             game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Item (ID: {code})")
         })
-        self.location_id_to_name: Dict[str, Dict[int, str]] = KeyedDefaultDict(lambda game_name: {
+        self.location_id_to_name: Dict[str, Mapping[int, str]] = KeyedDefaultDict(lambda game_name: {
             game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Location (ID: {code})")
         })
         for game, game_package in self._multidata["datapackage"].items():
-            game_package = restricted_loads(GameDataPackage.get(checksum=game_package["checksum"]).data)
-            self.item_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
-                id: name for name, id in game_package["item_name_to_id"].items()})
-            self.location_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
-                id: name for name, id in game_package["location_name_to_id"].items()})
-
-            # Normal lookup tables as well.
-            self.item_name_to_id[game] = game_package["item_name_to_id"]
-            self.location_name_to_id[game] = game_package["location_name_to_id"]
+            item_id_to_name, location_id_to_name, self.item_name_to_id[game], self.location_name_to_id[game] = \
+                _get_datapackage_tables(game_package["checksum"])
+            self.item_id_to_name[game] = _IdToName(item_id_to_name, "Unknown Item (ID: {})")
+            self.location_id_to_name[game] = _IdToName(location_id_to_name, "Unknown Location (ID: {})")
 
     def get_seed_name(self) -> str:
         """Retrieves the seed name."""
@@ -108,9 +173,11 @@ class TrackerData:
         """Retrieves a list of all item codes a given slot starts with."""
         return self._multidata["precollected_items"][player]
 
+    @_cache_results
     def get_player_checked_locations(self, team: int, player: int) -> Set[int]:
         """Retrieves the set of all locations marked complete by this player."""
-        return self._multisave.get("location_checks", {}).get((team, player), set())
+        checked = self._multisave.get("location_checks", {}).get((team, player), set())
+        return decode_checked_locations(checked, self.get_player_locations(player))
 
     @_cache_results
     def get_player_missing_locations(self, team: int, player: int) -> Set[int]:
@@ -274,7 +341,8 @@ class TrackerData:
         """
         last_activity: Dict[TeamPlayer, datetime.timedelta] = {}
         now = datetime.datetime.utcnow()
-        for (team, player), timestamp in self._multisave.get("client_activity_timers", []):
+        # the multisave stores pairs, a snapshot stores a dict
+        for (team, player), timestamp in dict(self._multisave.get("client_activity_timers", ())).items():
             last_activity[team, player] = now - datetime.datetime.utcfromtimestamp(timestamp)
 
         return last_activity
@@ -286,7 +354,7 @@ class TrackerData:
         Only supported platforms are Twitch and YouTube.
         """
         video_feeds = {}
-        for (team, player), video_data in self._multisave.get("video", []):
+        for (team, player), video_data in dict(self._multisave.get("video", ())).items():
             video_feeds[team, player] = video_data
 
         return video_feeds
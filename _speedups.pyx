@@ -265,51 +265,121 @@ cdef class LocationStore:
 
         # This used to validate checks actually exist. A remnant from the past.
         # If the order of locations becomes relevant at some point, we could not do sorted(set), so leaving it.
-        cdef set checked = state[team, slot]
+        checked = state[team, slot]
 
         if not len(checked):
             # Skips loop if none have been checked.
             # This optimizes the case where everyone connects to a fresh game at the same time.
             return []
 
-        # Unless the set is close to empty, it's cheaper to use the python set directly, so we do that.
         cdef LocationEntry* entry
         cdef size_t start = self.sender_index[sender].start
         cdef size_t count = self.sender_index[sender].count
+        cdef const unsigned char[:] bits
+        cdef size_t i
+        if not isinstance(checked, set):
+            # CheckedLocations, the bits are in the order of entries
+            bits = checked.bits
+            return [self.entries[start + i].location for
+                    i in range(count) if
+                    bits[i >> 3] >> (i & 7) & 1]
+
+        # Unless the set is close to empty, it's cheaper to use the python set directly, so we do that.
+        cdef set checked_set = checked
         return [entry.location for
                 entry in self.entries[start:start+count] if
-                entry.location in checked]
+                entry.location in checked_set]
 
     def get_missing(self, state: State, team: int, slot: int) -> List[int]:
         cdef LocationEntry* entry
         cdef ap_player_t sender = slot
         if sender < 0 or sender >= self.sender_index_size:
             raise KeyError(slot)
-        cdef set checked = state[team, slot]
+        checked = state[team, slot]
         cdef size_t start = self.sender_index[sender].start
         cdef size_t count = self.sender_index[sender].count
+        cdef const unsigned char[:] bits
+        cdef size_t i
+        cdef set checked_set
         if not len(checked):
             # Skip `in` if none have been checked.
             # This optimizes the case where everyone connects to a fresh game at the same time.
             return [entry.location for
                     entry in self.entries[start:start + count]]
+        elif not isinstance(checked, set):
+            # CheckedLocations, the bits are in the order of entries
+            bits = checked.bits
+            return [self.entries[start + i].location for
+                    i in range(count) if
+                    not bits[i >> 3] >> (i & 7) & 1]
         else:
             # Unless the set is close to empty, it's cheaper to use the python set directly, so we do that.
+            checked_set = checked
             return [entry.location for
                     entry in self.entries[start:start + count] if
-                    entry.location not in checked]
+                    entry.location not in checked_set]
 
     def get_remaining(self, state: State, team: int, slot: int) -> List[Tuple[int, int]]:
         cdef LocationEntry* entry
         cdef ap_player_t sender = slot
         if sender < 0 or sender >= self.sender_index_size:
             raise KeyError(slot)
-        cdef set checked = state[team, slot]
+        checked = state[team, slot]
         cdef size_t start = self.sender_index[sender].start
         cdef size_t count = self.sender_index[sender].count
+        cdef const unsigned char[:] bits
+        cdef size_t i
+        cdef set checked_set
+        if not isinstance(checked, set):
+            # CheckedLocations, the bits are in the order of entries
+            bits = checked.bits
+            return sorted([(self.entries[start + i].receiver, self.entries[start + i].item) for
+                           i in range(count) if
+                           not bits[i >> 3] >> (i & 7) & 1])
+        checked_set = checked
         return sorted([(entry.receiver, entry.item) for
                         entry in self.entries[start:start+count] if
-                        entry.location not in checked])
+                        entry.location not in checked_set])
+
+    cdef size_t _get_index(self, size_t sender, ap_id_t loc):
+        # Binary search in the sorted locations of sender. Returns INVALID_SIZE if sender does not have loc.
+        cdef size_t start = self.sender_index[sender].start
+        cdef size_t l = start
+        cdef size_t e = l + self.sender_index[sender].count
+        cdef size_t r = e
+        cdef size_t m
+        while l < r:
+            m = (l + r) // 2
+            if self.entries[m].location < loc:
+                l = m + 1
+            else:
+                r = m
+        if l < e and self.entries[l].location == loc:
+            return l - start
+        return INVALID_SIZE
+
+    def get_location_index(self, slot: int, location: int) -> int:
+        """Returns the position of location among the locations of slot in ascending order, or -1 if it has none."""
+        if slot < 1 or slot >= self.sender_index_size:
+            raise KeyError(slot)
+        if location < -0x8000000000000000 or location > 0x7fffffffffffffff:
+            return -1
+        cdef size_t index = self._get_index(slot, location)
+        if index == INVALID_SIZE:
+            return -1
+        return index
+
+    def get_checked_from_bits(self, slot: int, bits: Union[bytes, bytearray]) -> List[int]:
+        """Returns the locations of slot whose bits are set, in ascending order."""
+        if slot < 1 or slot >= self.sender_index_size:
+            raise KeyError(slot)
+        cdef const unsigned char[:] view = bits
+        cdef size_t start = self.sender_index[slot].start
+        cdef size_t count = min(self.sender_index[slot].count, <size_t>view.shape[0] * 8)
+        cdef size_t i
+        return [self.entries[start + i].location for
+                i in range(count) if
+                view[i >> 3] >> (i & 7) & 1]
 
 
 @cython.auto_pickle(False)
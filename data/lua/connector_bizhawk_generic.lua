@@ -20,7 +20,7 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 ]]
 
-local SCRIPT_VERSION = 1
+local SCRIPT_VERSION = 3
 
 -- Set to log incoming requests
 -- Will cause lag due to large console output
@@ -37,6 +37,22 @@ field `type`. The value of `type` determines what other fields may exist.
 To get the script version, instead of JSON, send "VERSION" to get the script
 version directly (e.g. "2").
 
+A message may instead be an object with an `id` and its list of `requests`.
+The response is then an object with the same `id` and the list of
+`responses`, which lets a client have several messages in flight and match
+responses to them. Every message that arrived is processed on the same frame.
+
+Request: `{"id": 7, "requests": [{"type": "PING"}]}`
+
+Response: `{"id": 7, "responses": [{"type": "PONG"}]}`
+
+Ranges of memory registered with `WATCH` are compared against their previous
+data at the end of every frame. If any of them changed, the script sends an
+object with a list of `watches` without being asked, holding the changed part
+of each watch that changed.
+
+Update: `{"watches": [{"id": 1, "offset": 4, "value": "AAE="}]}`
+
 #### Ex. 1
 
 Request: `[{"type": "PING"}]`
@@ -178,6 +194,26 @@ Response:
     - `domain` (`string`): The name of the memory domain the address
     corresponds to
 
+- `WATCH`  
+    Starts watching an array of bytes at the provided address, sending the
+    changed bytes whenever they differ at the end of a frame.
+
+    Expected Response Type: `WATCH_RESPONSE`
+
+    Additional Fields:
+    - `address` (`int`): The address of the memory to watch
+    - `size` (`int`): The number of bytes to watch
+    - `domain` (`string`): The name of the memory domain the address
+    corresponds to
+
+- `UNWATCH`  
+    Stops watching the memory registered by a `WATCH` request.
+
+    Expected Response Type: `UNWATCH_RESPONSE`
+
+    Additional Fields:
+    - `id` (`int`): The id from the `WATCH_RESPONSE`
+
 - `DISPLAY_MESSAGE`  
     Adds a message to the message queue which will be displayed using
     `gui.addmessage` according to the message interval.
@@ -254,6 +290,16 @@ Response:
 - `WRITE_RESPONSE`  
     Acknowledges `WRITE`.
 
+- `WATCH_RESPONSE`  
+    Contains the id of the new watch and the current data of the memory.
+
+    Additional Fields:
+    - `id` (`int`): The id updates for this watch will be sent with
+    - `value` (`string`): A base64 string representing the watched data
+
+- `UNWATCH_RESPONSE`  
+    Acknowledges `UNWATCH`.
+
 - `DISPLAY_MESSAGE_RESPONSE`  
     Acknowledges `DISPLAY_MESSAGE`.
 
@@ -311,6 +357,9 @@ local locked = false
 
 local rom_hash = nil
 
+local watches = {}
+local next_watch_id = 1
+
 function queue_push (self, value)
     self[self.right] = value
     self.right = self.right + 1
@@ -451,6 +500,28 @@ request_handlers = {
         return res
     end,
 
+    ["WATCH"] = function (req)
+        local res = {}
+        local data = memory.read_bytes_as_array(req["address"], req["size"], req["domain"])
+
+        watches[next_watch_id] = {address = req["address"], size = req["size"], domain = req["domain"], data = data}
+        res["type"] = "WATCH_RESPONSE"
+        res["id"] = next_watch_id
+        res["value"] = base64.encode(data)
+        next_watch_id = next_watch_id + 1
+
+        return res
+    end,
+
+    ["UNWATCH"] = function (req)
+        local res = {}
+
+        res["type"] = "UNWATCH_RESPONSE"
+        watches[req["id"]] = nil
+
+        return res
+    end,
+
     ["DISPLAY_MESSAGE"] = function (req)
         local res = {}
 
@@ -488,6 +559,7 @@ function process_request (req)
 end
 
 -- Receive data from AP client and send message back
+-- Returns true if a message was processed
 function send_receive ()
     local message, err = client_socket:receive()
 
@@ -521,8 +593,12 @@ function send_receive ()
     else
         local res = {}
         local data = json.decode(message)
+        local requests = data
+        if data["requests"] ~= nil then
+            requests = data["requests"]
+        end
         local failed_guard_response = nil
-        for i, req in ipairs(data) do
+        for i, req in ipairs(requests) do
             if failed_guard_response ~= nil then
                 res[i] = failed_guard_response
             else
@@ -542,7 +618,45 @@ function send_receive ()
             end
         end
 
-        client_socket:send(json.encode(res).."\n")
+        if data["requests"] ~= nil then
+            client_socket:send(json.encode({id = data["id"], responses = res}).."\n")
+        else
+            client_socket:send(json.encode(res).."\n")
+        end
+    end
+
+    return true
+end
+
+-- Send the changed part of every watch whose memory differs from the last frame
+function send_watch_updates ()
+    local updates = {}
+
+    for id, watch in pairs(watches) do
+        local data = memory.read_bytes_as_array(watch["address"], watch["size"], watch["domain"])
+        local first = nil
+        local last = nil
+        for i, byte in ipairs(data) do
+            if byte ~= watch["data"][i] then
+                if first == nil then
+                    first = i
+                end
+                last = i
+            end
+        end
+
+        if first ~= nil then
+            local changed = {}
+            for i = first, last do
+                changed[#changed + 1] = data[i]
+            end
+            updates[#updates + 1] = {id = id, offset = first - 1, value = base64.encode(changed)}
+            watch["data"] = data
+        end
+    end
+
+    if #updates > 0 then
+        client_socket:send(json.encode({watches = updates}).."\n")
     end
 end
 
@@ -603,15 +717,22 @@ function main ()
                     print("Client connected")
                     current_state = STATE_CONNECTED
                     client_socket = client
+                    watches = {}
                     server:close()
                     server = nil
                     client_socket:settimeout(0)
                 end
             end
         else
+            -- process every message that arrived, clients may have several in flight
+            local received
             repeat
-                send_receive()
-            until not locked
+                received = send_receive()
+            until not locked and not received
+
+            if current_state == STATE_CONNECTED then
+                send_watch_updates()
+            end
 
             if timeout_timer <= 0 then
                 print("Client timed out")
@@ -5,7 +5,7 @@ import time
 from collections import deque
 from collections.abc import Callable, Iterable
 
-from BaseClasses import CollectionState, Entrance, Region, EntranceType
+from BaseClasses import CollectionState, CopyOnWriteCollectionState, Entrance, Region, EntranceType
 from Options import Accessibility
 from worlds.AutoWorld import World
 
@@ -174,8 +174,11 @@ class ERPlacementState:
     """A list of pairings of connected entrance names, of the form (source_exit, target_entrance)"""
     world: World
     """The world which is having its entrances randomized"""
-    collection_state: CollectionState
-    """The CollectionState backing the entrance randomization logic"""
+    collection_state: CopyOnWriteCollectionState
+    """
+    The CollectionState backing the entrance randomization logic. Speculative copies of it only copy the structures of
+    the randomized world once they change.
+    """
     entrance_lookup: EntranceLookup
     """A lookup table of all unconnected ER targets"""
     coupled: bool
@@ -186,13 +189,27 @@ class ERPlacementState:
         self.pairings = []
         self.world = world
         self.coupled = coupled
-        self.collection_state = world.multiworld.get_all_state(False, True)
+        # the initial sweep collects what every world can reach, later sweeps only need to look at this world
+        self.collection_state = world.multiworld.get_all_state(False, True, state_type=CopyOnWriteCollectionState)
         self.entrance_lookup = entrance_lookup
 
     @property
     def placed_regions(self) -> set[Region]:
         return self.collection_state.reachable_regions[self.world.player]
 
+    def update_reachability(self, state: CollectionState | None = None) -> None:
+        """
+        Searches the randomized world for newly reachable regions and collects the advancements placed in it that
+        became reachable. Connecting this world's entrances doesn't change what the other worlds can reach, so their
+        locations are not swept again.
+
+        :param state: The state to update, defaulting to the collection state of the entrance randomization.
+        """
+        if state is None:
+            state = self.collection_state
+        state.update_reachable_regions(self.world.player)
+        state.sweep_for_advancements(self.world.multiworld.get_locations(self.world.player))
+
     def find_placeable_exits(self, check_validity: bool, usable_exits: list[Entrance]) -> list[Entrance]:
         if check_validity:
             blocked_connections = self.collection_state.blocked_connections[self.world.player]
@@ -222,11 +239,11 @@ class ERPlacementState:
         copied_state = self.collection_state.copy()
         # simulated connection. A real connection is unsafe because the region graph is shallow-copied and would
         # propagate back to the real multiworld.
+        copied_state.own_reachability(self.world.player)
         copied_state.reachable_regions[self.world.player].add(target_entrance.connected_region)
         copied_state.blocked_connections[self.world.player].remove(source_exit)
         copied_state.blocked_connections[self.world.player].update(target_entrance.connected_region.exits)
-        copied_state.update_reachable_regions(self.world.player)
-        copied_state.sweep_for_advancements()
+        self.update_reachability(copied_state)
         # test that at there are newly reachable randomized exits that are ACTUALLY reachable
         available_randomized_exits = copied_state.blocked_connections[self.world.player]
         for _exit in available_randomized_exits:
@@ -401,13 +418,11 @@ def randomize_entrances(
     def do_placement(source_exit: Entrance, target_entrance: Entrance) -> None:
         placed_exits, paired_entrances = er_state.connect(source_exit, target_entrance)
         # propagate new connections
-        er_state.collection_state.update_reachable_regions(world.player)
-        er_state.collection_state.sweep_for_advancements()
+        er_state.update_reachability()
         if on_connect:
             change = on_connect(er_state, placed_exits, paired_entrances)
             if change:
-                er_state.collection_state.update_reachable_regions(world.player)
-                er_state.collection_state.sweep_for_advancements()
+                er_state.update_reachability()
 
     def needs_speculative_sweep(dead_end: bool, require_new_exits: bool, placeable_exits: list[Entrance]) -> bool:
         # speculative sweep is expensive. We currently only do it as a last resort, if we might cap off the graph
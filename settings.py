@@ -24,24 +24,22 @@ __all__ = [
 
 no_gui = False
 skip_autosave = False
-_world_settings_name_cache: dict[str, str] = {}  # TODO: cache on disk and update when worlds change
+_world_settings_name_cache: dict[str, str] = {}  # from worlds.world_index, which is cached on disk
 _world_settings_name_cache_updated = False
 _lock = Lock()
 
 
 def _update_cache() -> None:
-    """Load all worlds and update world_settings_name_cache"""
+    """Update world_settings_name_cache from the world index"""
     global _world_settings_name_cache_updated
     if _world_settings_name_cache_updated:
         return
 
     try:
-        from worlds.AutoWorld import AutoWorldRegister
-        for world in AutoWorldRegister.world_types.values():
-            annotation = world.__annotations__.get("settings", None)
-            if annotation is None or annotation == "ClassVar[Optional['Group']]":
-                continue
-            _world_settings_name_cache[world.settings_key] = f"{world.__module__}.{world.__name__}"
+        from worlds import world_index
+        for entry in world_index.values():
+            if entry["settings_class"]:
+                _world_settings_name_cache[entry["settings_key"]] = entry["settings_class"]
     finally:
         _world_settings_name_cache_updated = True
 
@@ -679,6 +677,19 @@ class GeneratorOptions(Group):
         OFF = 0
         ON = 1
 
+    class CopyOnWriteState(Bool):
+        """
+        Share unchanged per player data between copies of the fill's CollectionStates, lowering memory use and copy
+        time for large multiworlds. Requires all worlds to only modify state through CollectionState methods, or
+        World.collect and World.remove, and prog_items outside of those through CollectionState.get_writable_items.
+        """
+
+    class DeltaPatchProcesses(int):
+        """
+        Number of processes that the bsdiff4 diffs of delta patches are created in. 0 creates them in the generating
+        process. Other output, including patching the roms, always runs in the generating process.
+        """
+
     class PanicMethod(str):
         """
         What to do if the current item placements appear unsolvable.
@@ -696,6 +707,8 @@ class GeneratorOptions(Group):
     race: Race = Race(0)
     plando_options: PlandoOptions = PlandoOptions("bosses, connections, texts")
     panic_method: PanicMethod = PanicMethod("swap")
+    copy_on_write_state: CopyOnWriteState | bool = False
+    delta_patch_processes: DeltaPatchProcesses = DeltaPatchProcesses(0)
     loglevel: str = "info"
     logtime: bool = False
 
@@ -5,3 +5,11 @@ if __name__ == "__main__":
     load_worlds.run_load_worlds_benchmark()
     import locations
     locations.run_locations_benchmark()
+    import collection_state
+    collection_state.run_collection_state_benchmark()
+    import received_items
+    received_items.run_received_items_benchmark()
+    import playthrough
+    playthrough.run_playthrough_benchmark()
+    import entrance_randomization
+    entrance_randomization.run_entrance_rando_benchmark()
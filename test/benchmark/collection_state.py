@@ -0,0 +1,115 @@
+def run_collection_state_benchmark(freeze_gc: bool = True) -> None:
+    """
+    Run a benchmark comparing CollectionState.copy() with CopyOnWriteCollectionState.copy() on a large multiworld.
+
+    :param freeze_gc: Whether to freeze gc before benchmarking and unfreeze gc afterward.
+    """
+    import argparse
+    import gc
+    import logging
+    import tracemalloc
+    import typing
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from BaseClasses import MultiWorld, CollectionState, CopyOnWriteCollectionState
+    from worlds import AutoWorld
+    from worlds.AutoWorld import call_all
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    class BenchmarkRunner:
+        gen_steps: typing.Tuple[str, ...] = (
+            "generate_early",
+            "create_regions",
+            "create_items",
+            "set_rules",
+            "connect_entrances",
+            "generate_basic",
+            "pre_fill",
+        )
+
+        games: typing.Tuple[str, ...] = ("A Link to the Past", "Ocarina of Time", "Hollow Knight", "TUNIC")
+        players_per_game: int = 10
+        copy_iterations: int = 1_000
+        held_copies: int = 100
+
+        def create_multiworld(self) -> MultiWorld:
+            games = [game for game in self.games if game in AutoWorld.AutoWorldRegister.world_types]
+            multiworld = MultiWorld(len(games) * self.players_per_game)
+            multiworld.game = {player: games[(player - 1) % len(games)] for player in multiworld.player_ids}
+            multiworld.player_name = {player: f"Tester{player}" for player in multiworld.player_ids}
+            multiworld.set_seed(0)
+            args = argparse.Namespace()
+            for player in multiworld.player_ids:
+                world_type = AutoWorld.AutoWorldRegister.world_types[multiworld.game[player]]
+                for name, option in world_type.options_dataclass.type_hints.items():
+                    player_options = getattr(args, name, {})
+                    player_options[player] = option.from_any(option.default)
+                    setattr(args, name, player_options)
+            multiworld.set_options(args)
+            multiworld.state = CollectionState(multiworld)
+            with TimeIt(f"{multiworld.players} player multiworld generation steps", logger):
+                for step in self.gen_steps:
+                    call_all(multiworld, step)
+            return multiworld
+
+        def copy_test(self, state: CollectionState) -> float:
+            state_name = state.__class__.__name__
+            if freeze_gc:
+                gc.freeze()
+            with TimeIt(f"{self.copy_iterations} copies of {state_name}", logger) as t:
+                for _ in range(self.copy_iterations):
+                    state.copy()
+                gc.collect()
+            if freeze_gc:
+                gc.unfreeze()
+
+            tracemalloc.start()
+            copies = [state.copy() for _ in range(self.held_copies)]
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            logger.info(f"{self.held_copies} copies of {state_name} hold {size / 1024 / 1024:.2f} MiB.")
+            del copies
+            return t.dif
+
+        def collect_test(self, state: CollectionState, multiworld: MultiWorld) -> float:
+            # copy, collect a single item and check reachability, similar to what fill and progression balancing do
+            items = [item for item in multiworld.itempool if item.advancement][:self.copy_iterations]
+            with TimeIt(f"{len(items)} copy, collect and reachability checks of {state.__class__.__name__}",
+                        logger) as t:
+                for item in items:
+                    new_state = state.copy()
+                    new_state.collect(item, True)
+                    multiworld.worlds[item.player].get_region(
+                        multiworld.worlds[item.player].origin_region_name).can_reach(new_state)
+            return t.dif
+
+        def main(self) -> None:
+            multiworld = self.create_multiworld()
+            # an all_state has the largest per player structures
+            all_state = multiworld.get_all_state(False)
+            cow_state = CopyOnWriteCollectionState(multiworld)
+            for item in multiworld.itempool:
+                multiworld.worlds[item.player].collect(cow_state, item)
+            cow_state.sweep_for_advancements()
+
+            copy_time = self.copy_test(all_state)
+            cow_copy_time = self.copy_test(cow_state)
+            logger.info(f"CopyOnWriteCollectionState.copy() is {copy_time / cow_copy_time:.2f} times as fast.")
+
+            collect_time = self.collect_test(all_state, multiworld)
+            cow_collect_time = self.collect_test(cow_state, multiworld)
+            logger.info(f"Copy and collect with CopyOnWriteCollectionState is "
+                        f"{collect_time / cow_collect_time:.2f} times as fast.")
+
+    runner = BenchmarkRunner()
+    runner.main()
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_collection_state_benchmark()
@@ -0,0 +1,120 @@
+def run_entrance_rando_benchmark() -> None:
+    """
+    Run a benchmark of generic entrance randomization in a multiworld with several entrance randomized worlds next to
+    other large worlds, comparing sweeps scoped to the randomized world with sweeping and copying the whole multiworld.
+    """
+    import argparse
+    import logging
+    import typing
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from BaseClasses import CollectionState, MultiWorld
+    from worlds import AutoWorld
+    from worlds.AutoWorld import call_all
+    import entrance_rando
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    class UnscopedPlacementState(entrance_rando.ERPlacementState):
+        # how the placement state worked before sweeps were scoped to the randomized world
+        def __init__(self, *args: typing.Any) -> None:
+            super().__init__(*args)
+            self.collection_state = self.world.multiworld.get_all_state(False, True)  # type: ignore[assignment]
+
+        def update_reachability(self, state: typing.Optional[CollectionState] = None) -> None:
+            if state is None:
+                state = self.collection_state
+            state.update_reachable_regions(self.world.player)
+            state.sweep_for_advancements()
+
+        def test_speculative_connection(self, source_exit, target_entrance, usable_exits) -> bool:
+            copied_state = self.collection_state.copy()
+            copied_state.reachable_regions[self.world.player].add(target_entrance.connected_region)
+            copied_state.blocked_connections[self.world.player].remove(source_exit)
+            copied_state.blocked_connections[self.world.player].update(target_entrance.connected_region.exits)
+            self.update_reachability(copied_state)
+            available_randomized_exits = copied_state.blocked_connections[self.world.player]
+            for _exit in available_randomized_exits:
+                if _exit.connected_region:
+                    continue
+                if _exit.name == source_exit.name or (self.coupled and _exit.name == target_entrance.name):
+                    continue
+                if _exit not in usable_exits:
+                    continue
+                if _exit.can_reach(copied_state):
+                    return True
+            return False
+
+    class BenchmarkRunner:
+        games: typing.Tuple[str, ...] = ("Stardew Valley", "A Link to the Past", "Hollow Knight", "Timespinner")
+        er_game: str = "Stardew Valley"
+        er_options: typing.Dict[str, str] = {"entrance_randomization": "buildings"}
+        players_per_game: int = 4
+        gen_steps: typing.Tuple[str, ...] = (
+            "generate_early",
+            "create_regions",
+            "create_items",
+            "set_rules",
+        )
+
+        def create_multiworld(self) -> MultiWorld:
+            multiworld = MultiWorld(len(self.games) * self.players_per_game)
+            multiworld.game = {player: self.games[(player - 1) % len(self.games)] for player in multiworld.player_ids}
+            multiworld.player_name = {player: f"Player{player}" for player in multiworld.player_ids}
+            multiworld.set_seed(0)
+            args = argparse.Namespace()
+            for player in multiworld.player_ids:
+                world_type = AutoWorld.AutoWorldRegister.world_types[multiworld.game[player]]
+                for name, option in world_type.options_dataclass.type_hints.items():
+                    option_values = getattr(args, name, {})
+                    value = self.er_options.get(name, option.default) if multiworld.game[player] == self.er_game \
+                        else option.default
+                    option_values[player] = option.from_any(value)
+                    setattr(args, name, option_values)
+            multiworld.set_options(args)
+            multiworld.state = CollectionState(multiworld)
+            for step in self.gen_steps:
+                call_all(multiworld, step)
+            return multiworld
+
+        def entrance_rando_test(self, name: str) -> typing.Tuple[float, typing.List[typing.List[typing.Tuple[str, str]]]]:
+            multiworld = self.create_multiworld()
+            pairings: typing.List[typing.List[typing.Tuple[str, str]]] = []
+            original_randomize_entrances = entrance_rando.randomize_entrances
+
+            def randomize_entrances(*args: typing.Any, **kwargs: typing.Any) -> entrance_rando.ERPlacementState:
+                er_state = original_randomize_entrances(*args, **kwargs)
+                pairings.append(er_state.pairings)
+                return er_state
+
+            placement_state = entrance_rando.ERPlacementState
+            if name == "unscoped":
+                entrance_rando.ERPlacementState = UnscopedPlacementState  # type: ignore[misc]
+            entrance_rando.randomize_entrances = randomize_entrances
+            try:
+                with TimeIt(f"{multiworld.players} players entrance randomization {name}", logger) as t:
+                    call_all(multiworld, "connect_entrances")
+            finally:
+                entrance_rando.ERPlacementState = placement_state  # type: ignore[misc]
+                entrance_rando.randomize_entrances = original_randomize_entrances
+            return t.dif, pairings
+
+        def main(self) -> None:
+            unscoped_time, unscoped_pairings = self.entrance_rando_test("unscoped")
+            scoped_time, scoped_pairings = self.entrance_rando_test("scoped")
+            if unscoped_pairings != scoped_pairings:
+                logger.error("The pairings differ.")
+            logger.info(f"{sum(map(len, scoped_pairings))} pairings in {len(scoped_pairings)} worlds, "
+                        f"scoped sweeps are {unscoped_time / scoped_time:.2f} times as fast.")
+
+    runner = BenchmarkRunner()
+    runner.main()
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_entrance_rando_benchmark()
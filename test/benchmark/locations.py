@@ -1,6 +1,7 @@
 def run_locations_benchmark(freeze_gc: bool = True) -> None:
     """
-    Run a benchmark of location access rule performance against an empty_state and an all_state.
+    Run a benchmark of location access rule performance against an empty_state and an all_state, and against an
+    all_state with indexed_prog_items to show its speedup per game.
 
     :param freeze_gc: Whether to freeze gc before benchmarking and unfreeze gc afterward. Freezing gc moves all objects
         tracked by the garbage collector to a permanent generation, ignoring them in all future collections. Freezing
@@ -60,6 +61,7 @@ def run_locations_benchmark(freeze_gc: bool = True) -> None:
                 summary_data: typing.Dict[str, collections.Counter[str]] = {
                     "empty_state": collections.Counter(),
                     "all_state": collections.Counter(),
+                    "indexed_all_state": collections.Counter(),
                 }
                 try:
                     multiworld = MultiWorld(1)
@@ -89,6 +91,11 @@ def run_locations_benchmark(freeze_gc: bool = True) -> None:
                         continue
 
                     all_state = multiworld.get_all_state(False)
+                    world = multiworld.worlds[1]
+                    indexed_prog_items = world.indexed_prog_items
+                    world.indexed_prog_items = True
+                    indexed_all_state = multiworld.get_all_state(False)
+                    world.indexed_prog_items = indexed_prog_items
                     for location in locations:
                         time_taken = self.location_test(location, multiworld.state, "empty_state")
                         summary_data["empty_state"][location.name] = time_taken
@@ -96,12 +103,19 @@ def run_locations_benchmark(freeze_gc: bool = True) -> None:
                         time_taken = self.location_test(location, all_state, "all_state")
                         summary_data["all_state"][location.name] = time_taken
 
+                        time_taken = self.location_test(location, indexed_all_state, "indexed_all_state")
+                        summary_data["indexed_all_state"][location.name] = time_taken
+
                     total_empty_state = sum(summary_data["empty_state"].values())
                     total_all_state = sum(summary_data["all_state"].values())
+                    total_indexed_all_state = sum(summary_data["indexed_all_state"].values())
 
                     logger.info(f"{game} took {total_empty_state/len(locations):.4f} "
                                 f"seconds per location in empty_state and {total_all_state/len(locations):.4f} "
                                 f"in all_state. (all times summed for {self.rule_iterations} runs.)")
+                    logger.info(f"{game} all_state with indexed_prog_items took "
+                                f"{total_indexed_all_state/len(locations):.4f} seconds per location, "
+                                f"{total_all_state/total_indexed_all_state:.2f} times as fast.")
                     logger.info(f"Top times in empty_state:\n"
                                 f"{self.format_times_from_counter(summary_data['empty_state'])}")
                     logger.info(f"Top times in all_state:\n"
@@ -0,0 +1,93 @@
+def run_playthrough_benchmark() -> None:
+    """
+    Run a benchmark of creating the spoiler playthrough of a multiworld with several players per game, comparing
+    pruning the required locations in batches with checking each of them on its own.
+    """
+    import argparse
+    import logging
+    import typing
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from BaseClasses import CollectionState, Location, MultiWorld, Spoiler
+    from worlds import AutoWorld
+    from worlds.AutoWorld import call_all
+    from Fill import distribute_items_restrictive
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    def prune_each_location(spoiler: Spoiler, state: CollectionState, locations: typing.List[Location],
+                            later_spheres: typing.List[typing.Set[Location]]) -> typing.Set[Location]:
+        # how create_playthrough pruned the required locations before it did so in batches
+        required_locations = set(locations).union(*later_spheres)
+        removed: typing.Set[Location] = set()
+        for location in locations:
+            required_locations.remove(location)
+            if spoiler.multiworld.can_beat_game(state, required_locations):
+                removed.add(location)
+            else:
+                required_locations.add(location)
+        return removed
+
+    class BenchmarkRunner:
+        games: typing.Tuple[str, ...] = ("A Link to the Past", "Hollow Knight", "Timespinner", "Celeste 64")
+        players_per_game: int = 5
+        gen_steps: typing.Tuple[str, ...] = (
+            "generate_early",
+            "create_regions",
+            "create_items",
+            "set_rules",
+            "connect_entrances",
+            "generate_basic",
+            "pre_fill",
+        )
+
+        def create_multiworld(self) -> MultiWorld:
+            multiworld = MultiWorld(len(self.games) * self.players_per_game)
+            multiworld.game = {player: self.games[(player - 1) % len(self.games)] for player in multiworld.player_ids}
+            multiworld.player_name = {player: f"Player{player}" for player in multiworld.player_ids}
+            multiworld.set_seed(0)
+            args = argparse.Namespace()
+            for player in multiworld.player_ids:
+                world_type = AutoWorld.AutoWorldRegister.world_types[multiworld.game[player]]
+                for name, option in world_type.options_dataclass.type_hints.items():
+                    option_values = getattr(args, name, {})
+                    option_values[player] = option.from_any(option.default)
+                    setattr(args, name, option_values)
+            multiworld.set_options(args)
+            multiworld.state = CollectionState(multiworld)
+            for step in self.gen_steps:
+                call_all(multiworld, step)
+            distribute_items_restrictive(multiworld)
+            call_all(multiworld, "post_fill")
+            multiworld.analyze_spheres()
+            return multiworld
+
+        def playthrough_test(self, multiworld: MultiWorld, name: str) -> typing.Tuple[float, typing.Dict]:
+            spoiler = Spoiler(multiworld)
+            if name == "each location":
+                spoiler._prune_sphere = \
+                    lambda *args: prune_each_location(spoiler, *args)  # type: ignore[method-assign]
+            with TimeIt(f"{multiworld.players} players playthrough pruning {name}", logger) as t:
+                spoiler.create_playthrough(create_paths=False)
+            return t.dif, spoiler.playthrough
+
+        def main(self) -> None:
+            multiworld = self.create_multiworld()
+            each_time, each_playthrough = self.playthrough_test(multiworld, "each location")
+            batch_time, batch_playthrough = self.playthrough_test(multiworld, "in batches")
+            if each_playthrough != batch_playthrough:
+                logger.error("The playthroughs differ.")
+            logger.info(f"{sum(len(sphere) for sphere in batch_playthrough.values())} required items, "
+                        f"pruning in batches is {each_time / batch_time:.2f} times as fast.")
+
+    runner = BenchmarkRunner()
+    runner.main()
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_playthrough_benchmark()
@@ -0,0 +1,98 @@
+def run_received_items_benchmark() -> None:
+    """
+    Run a benchmark of sending received items in a room with 1000 connected clients, comparing send_new_items with
+    scanning all clients for the ones that fell behind.
+    """
+    import asyncio
+    import logging
+    import random
+    import typing
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from MultiServer import Client, Context, get_received_items, get_start_inventory, send_items_to, send_new_items
+    from NetUtils import NetworkItem
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    class Socket:
+        """Stands in for an open websocket connection."""
+        open = True
+
+        async def send(self, frame: str) -> None:
+            pass
+
+    class BenchmarkContext(Context):
+        """Encodes outgoing messages, but only counts the frames instead of sending them."""
+        messages: int = 0
+
+        def send_frame(self, endpoints, frame: str) -> None:
+            self.count_sent_frame(endpoints, frame)
+
+        def count_sent_frame(self, endpoints, frame: str) -> None:
+            self.messages += 1
+            super().count_sent_frame(endpoints, frame)
+
+    def scan_all_clients(ctx: Context) -> None:
+        # how send_new_items found the receivers before it kept track of pending receivers
+        for team, clients in ctx.clients.items():
+            for slot, clients in clients.items():
+                for client in clients:
+                    if client.no_items:
+                        continue
+                    start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
+                    items = get_received_items(ctx, team, slot, client.remote_items)
+                    if len(start_inventory) + len(items) > client.send_index:
+                        first_new_item = max(0, client.send_index - len(start_inventory))
+                        asyncio.create_task(ctx.send_msgs(client, [{
+                            "cmd": "ReceivedItems",
+                            "index": client.send_index,
+                            "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
+                        client.send_index = len(start_inventory) + len(items)
+
+    class BenchmarkRunner:
+        slots: int = 500
+        clients_per_slot: int = 2
+        checks: int = 10_000
+
+        def create_context(self) -> BenchmarkContext:
+            ctx = BenchmarkContext("", 0, "", "", 0, 0, False)
+            ctx.clients = {0: {}}
+            for slot in range(1, self.slots + 1):
+                ctx.clients[0][slot] = []
+                for _ in range(self.clients_per_slot):
+                    client = Client(Socket(), ctx)
+                    client.auth = True
+                    client.team = 0
+                    client.slot = slot
+                    ctx.clients[0][slot].append(client)
+            return ctx
+
+        async def send_test(self, send: typing.Callable[[Context], None]) -> float:
+            ctx = self.create_context()
+            rng = random.Random(0)
+            with TimeIt(f"{self.checks} checks sent to {self.slots * self.clients_per_slot} clients "
+                        f"with {send.__name__}", logger) as t:
+                for location in range(self.checks):
+                    finding_player = rng.randint(1, self.slots)
+                    send_items_to(ctx, 0, rng.randint(1, self.slots), NetworkItem(location, location, finding_player))
+                    send(ctx)
+                    await asyncio.sleep(0)
+            logger.info(f"{ctx.messages} frames of ReceivedItems messages were sent.")
+            return t.dif
+
+        async def main(self) -> None:
+            scan_time = await self.send_test(scan_all_clients)
+            pending_time = await self.send_test(send_new_items)
+            logger.info(f"send_new_items is {scan_time / pending_time:.2f} times as fast.")
+
+    runner = BenchmarkRunner()
+    asyncio.run(runner.main())
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_received_items_benchmark()
@@ -303,6 +303,29 @@ class TestRandomizeEntrances(unittest.TestCase):
         self.assertEqual(80, len(result.pairings))
         self.assertEqual(80, len(result.placements))
 
+    def test_speculative_connection_not_applied(self):
+        """tests that testing a speculative connection leaves the placement state unchanged"""
+        multiworld = generate_test_multiworld()
+        generate_disconnected_region_grid(multiworld, 5)
+        exits = [ex for region in multiworld.get_regions(1) for ex in region.exits if not ex.connected_region]
+        er_targets = [entrance for region in multiworld.get_regions(1)
+                      for entrance in region.entrances if not entrance.parent_region]
+        er_state = ERPlacementState(
+            multiworld.worlds[1],
+            EntranceLookup(multiworld.worlds[1].random, coupled=True, usable_exits=set(exits), targets=er_targets),
+            coupled=True
+        )
+        er_state.update_reachability()
+        placed_regions = set(er_state.placed_regions)
+        blocked_connections = set(er_state.collection_state.blocked_connections[1])
+
+        source_exit = multiworld.get_entrance("region0_right", 1)
+        target_entrance = er_state.entrance_lookup.find_target("region1_left")
+        self.assertTrue(er_state.test_speculative_connection(source_exit, target_entrance, set(exits)))
+        self.assertEqual(placed_regions, er_state.placed_regions)
+        self.assertEqual(blocked_connections, er_state.collection_state.blocked_connections[1])
+        self.assertNotIn(target_entrance.connected_region, er_state.placed_regions)
+
     def test_coupled(self):
         """tests that in coupled mode, all 2 way transitions have an inverse"""
         multiworld = generate_test_multiworld()
@@ -856,6 +856,17 @@ class TestBalanceMultiworldProgression(unittest.TestCase):
         self.assertRegionContains(
             self.player1.regions[1], self.player2.prog_items[0])
 
+    def test_balances_progression_incremental_reachability(self) -> None:
+        """Test that progression balancing moves the same items when spheres only retest changed dependencies"""
+        for world in self.multiworld.worlds.values():
+            world.options.progression_balancing.value = 50
+            world.incremental_reachability = True
+
+        balance_multiworld_progression(self.multiworld)
+
+        self.assertRegionContains(
+            self.player1.regions[1], self.player2.prog_items[0])
+
     def test_skips_balancing_progression(self) -> None:
         """Test that progression balancing is skipped when players have it disabled"""
         self.multiworld.worlds[self.player1.id].options.progression_balancing.value = 0
@@ -1,6 +1,14 @@
-﻿import unittest
+﻿import io
+import os
+import tempfile
+import unittest
+import zipfile
+
+import bsdiff4
+
 from worlds.AutoWorld import AutoWorldRegister
-from worlds.Files import AutoPatchRegister
+from worlds.Files import APDeltaPatch, APProcedurePatch, APTokenMixin, APTokenTypes, AutoPatchRegister, \
+    DeltaPatchProcessPool
 
 
 class TestPatches(unittest.TestCase):
@@ -9,3 +17,76 @@ class TestPatches(unittest.TestCase):
             with self.subTest(game=game_name):
                 self.assertIn(game_name, AutoWorldRegister.world_types.keys(),
                               f"Patch '{game_name}' does not match the name of any world.")
+
+    def test_delta_patch_process_pool(self) -> None:
+        """Tests that delta patches created in a DeltaPatchProcessPool match the ones created in process."""
+        class TestDeltaPatch(APDeltaPatch):
+            hash = None
+
+            @classmethod
+            def get_source_data(cls) -> bytes:
+                return bytes(range(256)) * 64
+
+        patched_data = bytearray(TestDeltaPatch.get_source_data())
+        patched_data[100:200] = b"\xFF" * 100
+        with tempfile.TemporaryDirectory() as temp_dir:
+            patched_path = os.path.join(temp_dir, "patched.bin")
+            with open(patched_path, "wb") as f:
+                f.write(patched_data)
+
+            deltas = []
+            for processes in (0, 2):
+                with DeltaPatchProcessPool(processes):
+                    patch = TestDeltaPatch(patched_path=patched_path)
+                    with zipfile.ZipFile(io.BytesIO(), "w") as opened_zipfile:
+                        patch.write_contents(opened_zipfile)
+                deltas.append(patch.files["delta.bsdiff4"])
+        self.assertEqual(deltas[0], deltas[1])
+        self.assertEqual(bsdiff4.patch(TestDeltaPatch.get_source_data(), deltas[1]), patched_data)
+
+    def test_procedure_steps(self) -> None:
+        """Tests the built-in procedure steps, and that steps which only take bytes get bytes."""
+        class TestProcedurePatch(APProcedurePatch, APTokenMixin):
+            hash = None
+            procedure = [
+                ("apply_tokens", ["tokens.bin"]),
+                ("calc_snes_crc", []),
+                ("apply_bsdiff4", ["delta.bsdiff4"]),
+                ("apply_tokens", ["tokens.bin"]),
+            ]
+
+            @classmethod
+            def get_source_data(cls) -> bytes:
+                return bytes(0x8000)
+
+            def read(self) -> None:
+                pass
+
+        patch = TestProcedurePatch()
+        patch.write_token(APTokenTypes.WRITE, 0x10, b"\x01\x02\x03\x04")
+        patch.write_token(APTokenTypes.COPY, 0x20, (4, 0x10))
+        patch.write_token(APTokenTypes.RLE, 0x30, (3, 0x55))
+        patch.write_token(APTokenTypes.OR_8, 0x40, 0xF0)
+        patch.write_token(APTokenTypes.AND_8, 0x10, 0xFE)
+        patch.write_token(APTokenTypes.XOR_8, 0x11, 0x03)
+        patch.write_file("tokens.bin", patch.get_token_binary())
+
+        expected = bytearray(0x8000)
+        expected[0x10:0x14] = b"\x00\x01\x03\x04"
+        expected[0x20:0x24] = b"\x01\x02\x03\x04"
+        expected[0x30:0x33] = b"\x55\x55\x55"
+        expected[0x40] = 0xF0
+        crc = (sum(expected[:0x7FDC] + expected[0x7FE0:]) + 0x01FE) & 0xFFFF
+        expected[0x7FDC:0x7FE0] = (crc ^ 0xFFFF).to_bytes(2, "little") + crc.to_bytes(2, "little")
+        patch.write_file("delta.bsdiff4", bsdiff4.diff(bytes(expected), bytes(expected[::-1])))
+        expected = bytearray(expected[::-1])
+        expected[0x10:0x14] = b"\x00\x01\x03\x04"
+        expected[0x20:0x24] = b"\x01\x02\x03\x04"
+        expected[0x30:0x33] = b"\x55\x55\x55"
+        expected[0x40] |= 0xF0
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target = os.path.join(temp_dir, "patched.sfc")
+            patch.patch(target)
+            with open(target, "rb") as f:
+                self.assertEqual(f.read(), expected)
@@ -1,8 +1,10 @@
 import unittest
+from collections import Counter
+from typing import Callable, Set
 
-from BaseClasses import CollectionState
+from BaseClasses import CollectionState, Entrance, IndexedCounter, Item, ItemClassification, ItemIndex, Location, Region
 from worlds.AutoWorld import AutoWorldRegister
-from . import setup_solo_multiworld, gen_steps
+from . import generate_test_multiworld, setup_solo_multiworld, gen_steps
 
 
 class TestBase(unittest.TestCase):
@@ -79,3 +81,125 @@ class TestBase(unittest.TestCase):
                             locations.add(location)
                     self.assertGreater(len(locations), 0,
                                        msg="Need to be able to reach at least one location to get started.")
+
+
+class TestIncrementalReachability(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld()
+        self.multiworld.worlds[1].incremental_reachability = True
+        self.rule_calls = Counter()
+        menu = self.multiworld.get_region("Menu", 1)
+        region_a, region_b, region_c, region_d = (Region(name, 1, self.multiworld) for name in "ABCD")
+        self.multiworld.regions += [region_a, region_b, region_c, region_d]
+        self.add_connection(menu, region_a, lambda state: state.has("Key A", 1))
+        self.add_connection(region_a, region_b, lambda state: state.has_all(("Key A", "Key B"), 1))
+        self.add_connection(menu, region_c, lambda state: state.has("Key C", 1, 2))
+        to_d = self.add_connection(menu, region_d, lambda state: state.has("Key D", 1) or state.can_reach_region("B", 1))
+        self.multiworld.register_indirect_condition(region_b, to_d)
+
+    def add_connection(self, source: Region, target: Region, rule: Callable[[CollectionState], bool]) -> Entrance:
+        def counted_rule(state: CollectionState) -> bool:
+            self.rule_calls[target.name] += 1
+            return rule(state)
+        return source.connect(target, rule=counted_rule)
+
+    def collect(self, state: CollectionState, item_name: str) -> None:
+        state.collect(Item(item_name, ItemClassification.progression, None, 1), True)
+
+    def reachable(self, state: CollectionState) -> Set[str]:
+        return {region.name for region in self.multiworld.get_regions() if region.can_reach(state)}
+
+    def test_matches_full_search(self) -> None:
+        """Ensure the incremental search finds the same regions as the full search at every step."""
+        state = CollectionState(self.multiworld)
+        self.multiworld.worlds[1].incremental_reachability = False
+        full_state = CollectionState(self.multiworld)
+        for item_name in ("Key C", "Key B", "Key C", "Key A"):
+            self.collect(state, item_name)
+            self.collect(full_state, item_name)
+            self.assertEqual(self.reachable(state), self.reachable(full_state))
+        self.assertEqual(self.reachable(state), {"Menu", "A", "B", "C", "D"})
+
+    def test_unrelated_item_skips_retest(self) -> None:
+        """Ensure collecting an item only retests the entrances that looked it up."""
+        state = CollectionState(self.multiworld)
+        self.assertEqual(self.reachable(state), {"Menu"})
+        self.rule_calls.clear()
+        self.collect(state, "Key C")
+        self.assertEqual(self.reachable(state), {"Menu"})
+        self.assertEqual(self.rule_calls, {"C": 1})
+
+        copied_state = state.copy()
+        self.rule_calls.clear()
+        self.collect(copied_state, "Key A")
+        self.assertEqual(self.reachable(copied_state), {"Menu", "A"})
+        self.assertEqual(self.rule_calls, {"A": 1, "B": 1})
+
+    def test_remove_resets_dependencies(self) -> None:
+        """Ensure removing an item falls back to a fresh search."""
+        state = CollectionState(self.multiworld)
+        self.collect(state, "Key A")
+        self.collect(state, "Key B")
+        self.assertEqual(self.reachable(state), {"Menu", "A", "B", "D"})
+        state.remove(Item("Key B", ItemClassification.progression, None, 1))
+        self.assertEqual(self.reachable(state), {"Menu", "A"})
+
+    def test_indexed_prog_items(self) -> None:
+        """Ensure rules checking indexed items are retested once those change, if the world also indexes prog_items."""
+        world = self.multiworld.worlds[1]
+        world.indexed_prog_items = True
+        world.item_index = ItemIndex({"Key A": 1, "Key B": 2}, {})
+        keys = world.item_index.compile(("Key A", "Key B"))
+        region_e = Region("E", 1, self.multiworld)
+        self.multiworld.regions.append(region_e)
+        self.add_connection(self.multiworld.get_region("Menu", 1), region_e,
+                            lambda state: state.has_all_indexed(keys, 1))
+
+        state = CollectionState(self.multiworld)
+        self.assertIsInstance(state.prog_items[1], IndexedCounter)
+        self.assertEqual(self.reachable(state), {"Menu"})
+        self.rule_calls.clear()
+        self.collect(state, "Key C")
+        self.assertEqual(self.reachable(state), {"Menu"})
+        self.assertNotIn("E", self.rule_calls)
+
+        self.collect(state, "Key A")
+        self.assertEqual(self.reachable(state), {"Menu", "A"})
+        self.collect(state.copy(), "Key B")
+        self.collect(state, "Key B")
+        self.assertEqual(self.reachable(state), {"Menu", "A", "B", "D", "E"})
+
+    def add_location(self, region_name: str, item_name: str, rule: Callable[[CollectionState], bool]) -> Location:
+        location = Location(1, f"Get {item_name}", None, self.multiworld.get_region(region_name, 1))
+        location.parent_region.locations.append(location)
+
+        def counted_rule(state: CollectionState) -> bool:
+            self.rule_calls[location.name] += 1
+            return rule(state)
+        location.access_rule = counted_rule
+        location.place_locked_item(Item(item_name, ItemClassification.progression, None, 1))
+        return location
+
+    def test_sweep_skips_unchanged_locations(self) -> None:
+        """Ensure sweeps and spheres only retest locations once what they failed on changed."""
+        self.add_location("Menu", "Key A", lambda state: True)
+        self.add_location("A", "Key B", lambda state: True)
+        self.add_location("Menu", "Key Z", lambda state: state.has("Key Y", 1))
+        self.add_location("Menu", "Key X", lambda state: state.can_reach_region("B", 1))
+        self.add_location("Menu", "Key C", lambda state: state.has_all(("Key A", "Key X"), 1))
+
+        self.multiworld.worlds[1].incremental_reachability = False
+        full_state = CollectionState(self.multiworld)
+        full_state.sweep_for_advancements()
+        full_spheres = list(self.multiworld.get_spheres())
+        self.multiworld.worlds[1].incremental_reachability = True
+
+        self.rule_calls.clear()
+        state = CollectionState(self.multiworld)
+        state.sweep_for_advancements()
+        self.assertEqual(state.advancements, full_state.advancements)
+        self.assertEqual(state.prog_items, full_state.prog_items)
+        self.assertEqual(self.rule_calls["Get Key Z"], 1)
+        self.assertEqual(self.rule_calls["Get Key B"], 1)
+        self.assertEqual(list(self.multiworld.get_spheres()), full_spheres)
+
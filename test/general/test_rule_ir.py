@@ -0,0 +1,84 @@
+import unittest
+
+from BaseClasses import CollectionState, Region
+from worlds.generic.Rules import add_rule, set_rule
+from worlds.generic.RuleIR import (And, CanReachRegion, Count, Has, HasAll, HasAny, Or, Rule, RuleCompiler,
+                                   get_item_dependencies, false_, true_)
+from . import generate_test_multiworld
+
+
+class CountedHas(Has):
+    """Has that counts its evaluations."""
+    __slots__ = ("calls",)
+
+    def __init__(self, item: str, player: int) -> None:
+        super().__init__(item, player)
+        self.calls = 0
+
+    def __call__(self, state: CollectionState) -> bool:
+        self.calls += 1
+        return super().__call__(state)
+
+
+class TestRuleIR(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld()
+        self.compiler = RuleCompiler()
+
+    def test_simplification(self) -> None:
+        """Ensure nested rules are flattened, literals removed and single item lookups merged."""
+        compile_rule = self.compiler.compile
+        self.assertEqual(compile_rule(Has("A", 1) & (Has("B", 1) & true_)), HasAll(("A", "B"), 1))
+        self.assertEqual(compile_rule(Has("A", 1) | HasAny(("B", "A"), 1)), HasAny(("A", "B"), 1))
+        self.assertIs(compile_rule(Has("A", 1) & false_), false_)
+        self.assertIs(compile_rule(Has("A", 1) | true_), true_)
+        self.assertEqual(compile_rule(Count(("A", "B"), 1, 1)), HasAny(("A", "B"), 1))
+        self.assertEqual(compile_rule(HasAll(("A",), 1)), Has("A", 1))
+        self.assertEqual(compile_rule(And(Has("A", 1, 2), CanReachRegion("Menu", 1), Has("A", 1, 2))),
+                         And(Has("A", 1, 2), CanReachRegion("Menu", 1)))
+
+    def test_interning(self) -> None:
+        """Ensure identical rules compile to the same instance."""
+        first = self.compiler.compile(Or(Has("A", 1), Has("B", 1, 2)))
+        second = self.compiler.compile(Or(Has("A", 1), Has("B", 1, 2)))
+        self.assertIs(first, second)
+        self.assertIs(self.compiler.compile(And(first, Has("C", 1))).rules[0], first)
+
+    def test_cached_result(self) -> None:
+        """Ensure compiled item only rules are evaluated once per item generation."""
+        counted = CountedHas("A", 1)
+        rule = self.compiler.compile(Or(counted, Has("B", 1, 2)))
+        state = CollectionState(self.multiworld)
+        self.assertFalse(rule(state))
+        self.assertFalse(rule(state))
+        self.assertEqual(counted.calls, 1)
+        copied_state = state.copy()
+        self.assertFalse(rule(copied_state))
+        self.assertEqual(counted.calls, 1)
+
+        state.add_item("A", 1)
+        self.assertTrue(rule(state))
+        self.assertFalse(rule(copied_state))
+        self.assertEqual(counted.calls, 3)
+
+        region_rule = self.compiler.compile(Or(counted, CanReachRegion("Menu", 1)))
+        self.assertIsNone(region_rule.cache_player)
+
+    def test_dependencies(self) -> None:
+        """Ensure the looked up items and regions of a rule can be inspected."""
+        rule = self.compiler.compile(Has("A", 1) & (Count(("B", "C"), 1, 2) | CanReachRegion("Menu", 1)))
+        self.assertEqual(rule.item_dependencies(), {("A", 1), ("B", 1), ("C", 1)})
+        self.assertEqual(rule.region_dependencies(), {("Menu", 1)})
+
+        region = Region("Locked", 1, self.multiworld)
+        entrance = self.multiworld.get_region("Menu", 1).connect(region)
+        self.assertIsNone(get_item_dependencies(entrance))
+        set_rule(entrance, Has("A", 1))
+        add_rule(entrance, Has("B", 1))
+        self.assertIsInstance(entrance.access_rule, Rule)
+        self.assertEqual(get_item_dependencies(entrance), {("A", 1), ("B", 1)})
+        state = CollectionState(self.multiworld)
+        state.add_item("A", 1)
+        self.assertFalse(entrance.can_reach(state))
+        state.add_item("B", 1)
+        self.assertTrue(entrance.can_reach(state))
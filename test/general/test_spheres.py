@@ -0,0 +1,116 @@
+import unittest
+from typing import List, Set
+
+from BaseClasses import CollectionState, Location, MultiWorld
+from Fill import distribute_items_restrictive
+from worlds.AutoWorld import AutoWorldRegister, call_all
+from . import setup_solo_multiworld
+
+
+def sweep_spheres(multiworld: MultiWorld) -> List[Set[Location]]:
+    """Spheres of all filled locations found by sweeping from a fresh state, without a SphereAnalysis."""
+    state = CollectionState(multiworld)
+    locations = set(multiworld.get_filled_locations())
+
+    spheres: List[Set[Location]] = []
+    while locations:
+        sphere = {location for location in locations if location.can_reach(state)}
+        spheres.append(sphere)
+        if not sphere:
+            spheres.append(locations)
+            break
+        for location in sphere:
+            state.collect(location.item, True, location)
+        locations -= sphere
+    return spheres
+
+
+def sweep_sendable_spheres(multiworld: MultiWorld) -> List[Set[Location]]:
+    """Sendable spheres found by sweeping from a fresh state, without a SphereAnalysis."""
+    state = CollectionState(multiworld)
+    locations: Set[Location] = set()
+    events: Set[Location] = set()
+    for location in multiworld.get_filled_locations():
+        if type(location.item.code) is int and type(location.address) is int:
+            locations.add(location)
+        else:
+            events.add(location)
+
+    spheres: List[Set[Location]] = []
+    while locations:
+        done_events: Set[Location] = {event for event in events if event.can_reach(state)}
+        while done_events:
+            for event in done_events:
+                state.collect(event.item, True, event)
+            events -= done_events
+            done_events = {event for event in events if event.can_reach(state)}
+
+        sphere = {location for location in locations if location.can_reach(state)}
+        if not sphere:
+            spheres.append(sphere)
+            spheres.append(locations)
+            break
+        for location in sphere:
+            state.collect(location.item, True, location)
+        locations -= sphere
+        spheres.append(sphere)
+    return spheres
+
+
+class TestSphereAnalysis(unittest.TestCase):
+    def test_shared_analysis(self) -> None:
+        """Ensure the spheres read from the shared analysis match the ones swept for each consumer."""
+        for game_name, world_type in AutoWorldRegister.world_types.items():
+            if world_type.hidden:
+                continue
+            multiworld = setup_solo_multiworld(world_type)
+            with self.subTest(game=game_name, seed=multiworld.seed):
+                distribute_items_restrictive(multiworld)
+                call_all(multiworld, "post_fill")
+
+                spheres = sweep_spheres(multiworld)
+                sendable_spheres = sweep_sendable_spheres(multiworld)
+                accessible = multiworld.fulfills_accessibility()
+                self.assertEqual(list(multiworld.get_spheres()), spheres)
+
+                analysis = multiworld.analyze_spheres()
+                self.assertEqual(list(multiworld.get_spheres()), spheres)
+                self.assertEqual(list(multiworld.get_sendable_spheres()), sendable_spheres)
+                self.assertEqual(multiworld.fulfills_accessibility(), accessible)
+                states = analysis.get_sphere_states()
+                for number, sphere in enumerate(analysis.spheres):
+                    for location in sphere:
+                        self.assertTrue(location.item.advancement)
+                        self.assertEqual(analysis.sphere_index[location], number)
+                        self.assertTrue(location.can_reach(states[number]))
+                        if number:
+                            self.assertFalse(location.can_reach(states[number - 1]))
+
+                multiworld.spoiler.create_playthrough(create_paths=False)
+                required = {location for sphere in list(multiworld.spoiler.playthrough.values())[1:]
+                            for location in sphere}
+                self.assertLessEqual(required, {str(location) for location in analysis.sphere_index})
+
+    def test_pruned_spheres(self) -> None:
+        """Ensure pruning spheres in batches keeps the same locations as checking if each location is required."""
+        for game_name, world_type in AutoWorldRegister.world_types.items():
+            if world_type.hidden:
+                continue
+            multiworld = setup_solo_multiworld(world_type)
+            with self.subTest(game=game_name, seed=multiworld.seed):
+                distribute_items_restrictive(multiworld)
+                call_all(multiworld, "post_fill")
+                analysis = multiworld.analyze_spheres()
+                states = analysis.get_sphere_states()
+
+                spheres = [list(sphere) for sphere in analysis.spheres]
+                pruned_spheres: List[Set[Location]] = []
+                for number, sphere in reversed(tuple(enumerate(spheres))):
+                    required = set(sphere).union(*pruned_spheres)
+                    for location in sphere:
+                        required.remove(location)
+                        if not multiworld.can_beat_game(states[number], required):
+                            required.add(location)
+                    removed = multiworld.spoiler._prune_sphere(states[number], sphere, pruned_spheres)
+                    self.assertEqual(set(sphere) - removed, required & set(sphere))
+                    pruned_spheres.insert(0, set(sphere) - removed)
@@ -1,7 +1,9 @@
 import unittest
 
-from worlds.AutoWorld import AutoWorldRegister, call_all
-from . import setup_solo_multiworld
+from BaseClasses import (CollectionState, CopyOnWriteCollectionState, IndexedCounter, Item, ItemClassification, Location,
+                         Region)
+from worlds.AutoWorld import AutoWorldRegister, LogicMixin, call_all
+from . import generate_test_multiworld, setup_solo_multiworld
 
 
 class TestBase(unittest.TestCase):
@@ -27,3 +29,148 @@ class TestBase(unittest.TestCase):
                     with self.subTest("Step", step=step):
                         call_all(multiworld, step)
                         self.assertTrue(multiworld.get_all_state(False, allow_partial_entrances=True))
+
+
+class TestCopyOnWriteState(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+        for player in self.multiworld.player_ids:
+            menu = self.multiworld.get_region("Menu", player)
+            locked = Region("Locked", player, self.multiworld)
+            self.multiworld.regions.append(locked)
+            menu.connect(locked, rule=lambda state, player=player: state.has("Key", player))
+        self.state = CopyOnWriteCollectionState(self.multiworld)
+
+    def test_copies_are_independent(self) -> None:
+        """Ensure collecting into a copy or its original does not leak into the other."""
+        key = Item("Key", ItemClassification.progression, None, 1)
+        self.assertFalse(self.multiworld.get_region("Locked", 1).can_reach(self.state))
+        copied_state = self.state.copy()
+        self.assertIs(copied_state.prog_items[1], self.state.prog_items[1])
+        self.assertIs(copied_state.reachable_regions[1], self.state.reachable_regions[1])
+
+        copied_state.collect(key, True)
+        self.assertTrue(self.multiworld.get_region("Locked", 1).can_reach(copied_state))
+        self.assertFalse(self.multiworld.get_region("Locked", 1).can_reach(self.state))
+        self.assertFalse(self.state.has("Key", 1))
+        # the other player was not touched, so it is still shared
+        self.assertIs(copied_state.prog_items[2], self.state.prog_items[2])
+
+        self.state.collect(Item("Key", ItemClassification.progression, None, 2), True)
+        self.assertFalse(copied_state.has("Key", 2))
+        self.assertTrue(self.state.has("Key", 2))
+
+    def test_shared_attributes_copied_on_access(self) -> None:
+        """Ensure locations_checked and advancements of a copy are separate from the original."""
+        location = Location(1, "Spot", None, self.multiworld.get_region("Menu", 1))
+        copied_state = self.state.copy()
+        copied_state.collect(Item("Key", ItemClassification.progression, None, 1), True, location)
+        self.assertIn(location, copied_state.locations_checked)
+        self.assertNotIn(location, self.state.locations_checked)
+
+        copied_state.remove(Item("Key", ItemClassification.progression, None, 1))
+        self.assertFalse(self.multiworld.get_region("Locked", 1).can_reach(copied_state))
+        self.assertIsInstance(copied_state.copy(), CopyOnWriteCollectionState)
+
+    def test_writable_items_are_owned(self) -> None:
+        """Ensure prog_items written directly, like values cached by access rules, are not shared with the original."""
+        copied_state = self.state.copy()
+        copied_state.get_writable_items(1)["Cached Value"] = 5
+        self.assertEqual(copied_state.prog_items[1]["Cached Value"], 5)
+        self.assertNotIn("Cached Value", self.state.prog_items[1])
+        self.assertIs(copied_state.prog_items[2], self.state.prog_items[2])
+
+
+class TestIndexedProgItems(unittest.TestCase):
+    gen_steps = (
+        "generate_early",
+        "create_regions",
+        "create_items",
+    )
+
+    def test_group_counts_match(self) -> None:
+        """Ensure the indexed group helpers agree with the string based ones for each world's item pool."""
+        for game_name, world_type in AutoWorldRegister.world_types.items():
+            with self.subTest("Game", game=game_name):
+                multiworld = setup_solo_multiworld(world_type, self.gen_steps)
+                state = CollectionState(multiworld)
+                multiworld.worlds[1].indexed_prog_items = True
+                indexed_state = CollectionState(multiworld)
+                self.assertIsInstance(indexed_state.prog_items[1], IndexedCounter)
+                for item in multiworld.itempool:
+                    state.collect(item, True)
+                    indexed_state.collect(item, True)
+                # copies made before and after removing an item are independent
+                indexed_copy = indexed_state.copy()
+                if multiworld.itempool:
+                    state.remove(multiworld.itempool[0])
+                    indexed_state.remove(multiworld.itempool[0])
+                for group in world_type.item_name_groups:
+                    self.assertEqual(state.count_group(group, 1), indexed_state.count_group(group, 1), group)
+                    self.assertEqual(state.count_group_unique(group, 1), indexed_state.count_group_unique(group, 1),
+                                     group)
+                    self.assertEqual(state.has_group(group, 1, 2), indexed_state.has_group(group, 1, 2), group)
+                    self.assertEqual(state.has_group_unique(group, 1, 2), indexed_state.has_group_unique(group, 1, 2),
+                                     group)
+                    items = world_type.index_items(world_type.item_name_groups[group])
+                    self.assertEqual(state.has_all_indexed(items, 1), indexed_state.has_all_indexed(items, 1), group)
+                    self.assertEqual(state.has_any_indexed(items, 1), indexed_state.has_any_indexed(items, 1), group)
+                    self.assertEqual(indexed_copy.count_group(group, 1),
+                                     indexed_copy.count_from_list(world_type.item_name_groups[group], 1), group)
+
+    def test_unindexed_names(self) -> None:
+        """Ensure item names without an id, such as events, are still found by the indexed helpers."""
+        multiworld = setup_solo_multiworld(AutoWorldRegister.world_types["Archipelago"], ())
+        multiworld.worlds[1].indexed_prog_items = True
+        state = CollectionState(multiworld)
+        items = multiworld.worlds[1].index_items(("Victory", "Nothing"))
+        self.assertEqual(items.unindexed, ("Victory",))
+        self.assertFalse(state.has_any_indexed(items, 1))
+        state.add_item("Victory", 1)
+        self.assertTrue(state.has_any_indexed(items, 1))
+        self.assertFalse(state.has_all_indexed(items, 1))
+        state.add_item("Nothing", 1, 2)
+        self.assertTrue(state.has_all_indexed(items, 1))
+        self.assertEqual(state.count_indexed(items, 1), 3)
+        state.remove_item("Nothing", 1, 2)
+        self.assertEqual(state.prog_items[1].present, 0)
+        self.assertEqual(state.count_indexed(items, 1), 1)
+
+
+class TestLogicMixinScope(unittest.TestCase):
+    def test_hooks_of_absent_worlds_are_skipped(self) -> None:
+        """Tests that init_mixin and copy_mixin only run for worlds present in the multiworld"""
+        oot_init_functions = CollectionState.world_init_functions["worlds.oot"]
+        oot_copy_functions = CollectionState.world_copy_functions["worlds.oot"]
+
+        multiworld = generate_test_multiworld()
+        init_functions, copy_functions = multiworld.get_logic_mixin_functions()
+        for function in oot_init_functions:
+            self.assertNotIn(function, init_functions)
+        for function in oot_copy_functions:
+            self.assertNotIn(function, copy_functions)
+        self.assertFalse(hasattr(CollectionState(multiworld).copy(), "child_reachable_regions"))
+
+        oot_multiworld = setup_solo_multiworld(AutoWorldRegister.world_types["Ocarina of Time"], ())
+        init_functions, copy_functions = oot_multiworld.get_logic_mixin_functions()
+        for function in oot_init_functions:
+            self.assertIn(function, init_functions)
+        for function in oot_copy_functions:
+            self.assertIn(function, copy_functions)
+        self.assertTrue(hasattr(CollectionState(oot_multiworld).copy(), "child_reachable_regions"))
+
+    def test_hooks_of_libraries_are_not_scoped(self) -> None:
+        """Tests that hooks of world packages without a World, such as shared libraries, run for every multiworld"""
+        def init_mixin(state: CollectionState, multiworld) -> None:
+            state.library_initialized = True
+
+        multiworld = generate_test_multiworld()
+        CollectionState(multiworld)
+        type("LibraryMixin", (LogicMixin,), {"__module__": "worlds._test_library", "init_mixin": init_mixin})
+        try:
+            self.assertIn(init_mixin, multiworld.get_logic_mixin_functions()[0])
+            self.assertTrue(CollectionState(multiworld).library_initialized)
+        finally:
+            del CollectionState.world_init_functions["worlds._test_library"]
+            CollectionState.logic_mixin_registrations += 1
+        self.assertNotIn(init_mixin, multiworld.get_logic_mixin_functions()[0])
@@ -0,0 +1,67 @@
+import json
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+import worlds
+from Utils import Version
+from worlds.AutoWorld import AutoWorldRegister, WorldTypes
+
+
+class TestWorldIndex(unittest.TestCase):
+    def test_index_matches_worlds(self) -> None:
+        """Tests that the world index describes the loaded worlds, as it gets used in place of them"""
+        for game, entry in worlds.world_index.items():
+            with self.subTest(game):
+                world_type = AutoWorldRegister.world_types[game]
+                self.assertEqual(entry["world_version"], world_type.world_version.as_simple_string())
+                self.assertEqual(entry["hidden"], world_type.hidden)
+                self.assertEqual(entry["settings_key"], world_type.settings_key)
+                self.assertEqual(set(entry["hint_blacklist"]), world_type.hint_blacklist)
+                self.assertIn(game, worlds.network_data_package["games"])
+
+    def test_index_invalidation(self) -> None:
+        """Tests that the cached index is read back, unless a world source changed"""
+        with TemporaryDirectory() as tempdir, \
+                mock.patch.object(worlds, "world_index_path", os.path.join(tempdir, "world_index.json")):
+            worlds.write_world_index()
+            index = worlds.read_world_index()
+            self.assertIsNotNone(index)
+            self.assertEqual(index["games"], json.loads(json.dumps(worlds.world_index)))
+
+            source_path = next(iter(index["sources"]))
+            index["sources"][source_path][0] += 1
+            with open(worlds.world_index_path, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            self.assertIsNone(worlds.read_world_index())
+
+    def test_deferred_world_types(self) -> None:
+        """Tests that deferred worlds are only loaded when they are looked up or all of them are needed"""
+        world_types = WorldTypes()
+        loaded = []
+
+        def load_game(game: str) -> None:
+            loaded.append(game)
+            if game != "Broken":
+                world_types[game] = type(game, (), {})
+
+        def load_all() -> None:
+            for game in ("Game 1", "Game 2"):
+                if not world_types.is_loaded(game):
+                    load_game(game)
+
+        world_types.defer({"Game 1": Version(1, 0, 0), "Game 2": Version(0, 0, 0), "Broken": Version(0, 0, 0)},
+                          load_game, load_all)
+        self.assertIn("Game 1", world_types)
+        self.assertNotIn("Unknown", world_types)
+        self.assertEqual(loaded, [])
+
+        self.assertEqual(world_types["Game 1"].world_version, Version(1, 0, 0))
+        self.assertEqual(loaded, ["Game 1"])
+        self.assertIsNone(world_types.get("Broken"))
+        self.assertNotIn("Broken", world_types)
+        self.assertIsNone(world_types.get("Unknown"))
+
+        self.assertEqual(sorted(world_types), ["Game 1", "Game 2"])
+        self.assertEqual(loaded, ["Game 1", "Broken", "Game 2"])
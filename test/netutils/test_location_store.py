@@ -3,7 +3,7 @@ import os
 import typing
 import unittest
 import warnings
-from NetUtils import LocationStore, _LocationStore
+from NetUtils import CheckedLocations, LocationChecks, LocationStore, _LocationStore, decode_checked_locations
 
 State = typing.Dict[typing.Tuple[int, int], typing.Set[int]]
 RawLocations = typing.Dict[int, typing.Dict[int, typing.Tuple[int, int, int]]]
@@ -170,6 +170,60 @@ class Base:
             locations.intersection_update(self.store[1])
             self.assertEqual(locations, {11, 12})
 
+        def test_location_index(self) -> None:
+            self.assertEqual([self.store.get_location_index(2, location) for location in (21, 22, 23)], [0, 1, 2])
+            self.assertEqual(self.store.get_location_index(2, 20), -1)
+            self.assertEqual(self.store.get_location_index(2, 24), -1)
+            self.assertEqual(self.store.get_location_index(4, 9), 0)
+            self.assertEqual(self.store.get_checked_from_bits(2, b"\x05"), [21, 23])
+            self.assertEqual(self.store.get_checked_from_bits(2, b""), [])
+            with self.assertRaises(KeyError):
+                self.store.get_location_index(6, 9)
+
+        def test_checked_locations(self) -> None:
+            checked = CheckedLocations(self.store, 2, {23})
+            self.assertIn(23, checked)
+            self.assertNotIn(22, checked)
+            self.assertNotIn(9, checked)
+            self.assertEqual(len(checked), 1)
+            checked |= {21, 23}
+            self.assertEqual(list(checked), [21, 23])
+            self.assertEqual(checked, {21, 23})
+            self.assertEqual({21, 22, 23} - checked, {22})
+            self.assertEqual(checked - {21}, {23})
+            self.assertEqual(checked.to_bytes(), b"\x05")
+            with self.assertRaises(KeyError):
+                checked.add(9)
+            checked.discard(21)
+            checked.discard(9)
+            self.assertEqual(checked, {23})
+            self.assertEqual(CheckedLocations(self.store, 2, checked.to_bytes()), {23})
+            self.assertEqual(decode_checked_locations(checked.to_bytes(), self.store[2]), {23})
+
+        def test_get_checked_bits(self) -> None:
+            state = LocationChecks(self.store)
+            self.assertEqual(self.store.get_checked(state, 0, 1), [])
+            state[0, 1] |= {12}
+            self.assertEqual(self.store.get_checked(state, 0, 1), [12])
+            self.assertEqual(self.store.get_missing(state, 0, 1), [11, 13])
+            self.assertEqual(self.store.get_remaining(state, 0, 1), [(1, 13), (2, 21)])
+            state[0, 3] |= {9}
+            self.assertEqual(self.store.get_checked(state, 0, 3), [9])
+            self.assertEqual(self.store.get_missing(state, 0, 3), [])
+            self.assertEqual(self.store.get_remaining(state, 0, 3), [])
+
+        def test_location_checks_save(self) -> None:
+            state = LocationChecks(self.store)
+            state[0, 1] |= {11, 13}
+            state[1, 2] |= {22}
+            saved = state.dump()
+            self.assertEqual(saved, {(0, 1): b"\x05", (1, 2): b"\x02"})
+            loaded = LocationChecks(self.store)
+            loaded.load(saved)
+            loaded.load({(0, 3): {9}})  # older save files store sets
+            self.assertEqual(dict(loaded), {(0, 1): {11, 13}, (1, 2): {22}, (0, 3): {9}})
+            self.assertIsInstance(loaded[0, 3], CheckedLocations)
+
     class TestLocationStoreConstructor(unittest.TestCase):
         """Test constructors for a given store type."""
         type: type
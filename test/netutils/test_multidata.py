@@ -0,0 +1,71 @@
+# Tests for reading and writing the .archipelago multidata formats
+import io
+import mmap
+import pickle
+import tempfile
+import unittest
+import zlib
+
+from NetUtils import NetworkSlot, SectionedMultiData, SlotType, dump_multidata, load_multidata, \
+    multidata_format_version
+from Utils import VersionException
+
+sample_multidata = {
+    "seed_name": "12345",
+    "slot_info": {1: NetworkSlot("Player1", "Archipelago", SlotType.player)},
+    "locations": {1: {11: (21, 1, 0)}},
+    "spheres": [{1: {11}}],
+}
+
+
+def dump(multidata) -> bytes:
+    buffer = io.BytesIO()
+    dump_multidata(multidata, buffer)
+    return buffer.getvalue()
+
+
+class TestMultidata(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        data = dump(sample_multidata)
+        self.assertEqual(data[0], multidata_format_version)
+        multidata = load_multidata(data)
+        self.assertIsInstance(multidata, SectionedMultiData)
+        self.assertEqual(list(multidata), list(sample_multidata))
+        self.assertEqual(dict(multidata), sample_multidata)
+
+    def test_lazy_sections(self) -> None:
+        """Ensure sections are only decompressed when accessed and copied as they are when not."""
+        multidata = load_multidata(dump(sample_multidata))
+        self.assertEqual(multidata["seed_name"], "12345")
+        self.assertEqual(set(multidata.sections), {"seed_name"})
+        self.assertIn("spheres", multidata)
+        self.assertNotIn("datapackage", multidata)
+        self.assertEqual(multidata.get("datapackage", {}), {})
+
+        multidata["seed_name"] = "67890"
+        del multidata["spheres"]
+        rewritten = load_multidata(dump(multidata))
+        expected = {key: value for key, value in sample_multidata.items() if key != "spheres"}
+        expected["seed_name"] = "67890"
+        self.assertEqual(dict(rewritten), expected)
+        self.assertEqual(set(multidata.sections), {"seed_name"})
+
+    def test_release(self) -> None:
+        """Ensure a map of the file can be closed after releasing the multidata, keeping the accessed sections."""
+        with tempfile.TemporaryFile() as f:
+            f.write(dump(sample_multidata))
+            f.flush()
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        multidata = load_multidata(data)
+        self.assertEqual(multidata["seed_name"], "12345")
+        with self.assertRaises(BufferError):
+            data.close()
+        multidata.release()
+        data.close()
+        self.assertEqual(dict(multidata), {"seed_name": "12345"})
+
+    def test_legacy_format(self) -> None:
+        data = bytes([3]) + zlib.compress(pickle.dumps(sample_multidata), 9)
+        self.assertEqual(load_multidata(data), sample_multidata)
+        with self.assertRaises(VersionException):
+            load_multidata(bytes([multidata_format_version + 1]) + data[1:])
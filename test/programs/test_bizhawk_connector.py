@@ -0,0 +1,231 @@
+import asyncio
+import base64
+import json
+import unittest
+
+from worlds._bizhawk import BizHawkContext, ConnectionStatus, RequestFailedError, get_script_version, guarded_read, \
+    guarded_write, ping, read, unwatch, watch, write
+
+
+class MockConnector:
+    """
+    Stands in for connector_bizhawk_generic.lua, processing every message that arrived once per emulated frame.
+    """
+    frame_time: float = 0.01
+
+    def __init__(self) -> None:
+        self.memory = bytearray(range(256)) * 16
+        self.messages: int = 0
+        self.frames: int = 0
+        self.max_messages_per_frame: int = 0
+        self.watch_updates: int = 0
+        self.watches: dict[int, tuple[int, int, bytes]] = {}
+        self.server: asyncio.Server | None = None
+        self.handlers: list[asyncio.Task] = []
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle_client, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        for handler in self.handlers:
+            handler.cancel()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        self.handlers.clear()
+        assert self.server
+        self.server.close()
+        await self.server.wait_closed()
+
+    def process_request(self, request: dict) -> dict:
+        if request["type"] == "PING":
+            return {"type": "PONG"}
+        if request["type"] == "GUARD":
+            expected_data = base64.b64decode(request["expected_data"])
+            actual_data = self.memory[request["address"]:request["address"] + len(expected_data)]
+            return {"type": "GUARD_RESPONSE", "value": actual_data == expected_data, "address": request["address"]}
+        if request["type"] == "READ":
+            data = self.memory[request["address"]:request["address"] + request["size"]]
+            return {"type": "READ_RESPONSE", "value": base64.b64encode(data).decode("ascii")}
+        if request["type"] == "WRITE":
+            data = base64.b64decode(request["value"])
+            self.memory[request["address"]:request["address"] + len(data)] = data
+            return {"type": "WRITE_RESPONSE"}
+        if request["type"] == "WATCH":
+            watch_id = len(self.watches) + 1
+            data = bytes(self.memory[request["address"]:request["address"] + request["size"]])
+            self.watches[watch_id] = (request["address"], request["size"], data)
+            return {"type": "WATCH_RESPONSE", "id": watch_id, "value": base64.b64encode(data).decode("ascii")}
+        if request["type"] == "UNWATCH":
+            del self.watches[request["id"]]
+            return {"type": "UNWATCH_RESPONSE"}
+        return {"type": "ERROR", "err": f"Unknown command: {request['type']}"}
+
+    def process_message(self, line: bytes) -> str:
+        if line == b"VERSION":
+            return "3"
+        message = json.loads(line)
+        responses = []
+        failed_guard_response = None
+        for request in message["requests"]:
+            if failed_guard_response is not None:
+                responses.append(failed_guard_response)
+                continue
+            response = self.process_request(request)
+            if response["type"] == "GUARD_RESPONSE" and not response["value"]:
+                failed_guard_response = response
+            responses.append(response)
+        return json.dumps({"id": message["id"], "responses": responses})
+
+    def watch_updates_message(self) -> str | None:
+        updates = []
+        for watch_id, (address, size, old_data) in self.watches.items():
+            data = bytes(self.memory[address:address + size])
+            changed = [i for i in range(size) if data[i] != old_data[i]]
+            if changed:
+                value = data[changed[0]:changed[-1] + 1]
+                updates.append({"id": watch_id, "offset": changed[0], "value": base64.b64encode(value).decode("ascii")})
+                self.watches[watch_id] = (address, size, data)
+        if not updates:
+            return None
+        self.watch_updates += 1
+        return json.dumps({"watches": updates})
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.handlers.append(asyncio.current_task())
+        lines: asyncio.Queue[bytes] = asyncio.Queue()
+
+        async def receive() -> None:
+            while line := await reader.readline():
+                await lines.put(line.rstrip(b"\n"))
+
+        receiver = asyncio.create_task(receive())
+        try:
+            while not reader.at_eof():
+                await asyncio.sleep(self.frame_time)
+                self.frames += 1
+                processed = 0
+                while not lines.empty():
+                    writer.write(self.process_message(lines.get_nowait()).encode("utf-8") + b"\n")
+                    processed += 1
+                self.messages += processed
+                self.max_messages_per_frame = max(self.max_messages_per_frame, processed)
+                if watch_updates := self.watch_updates_message():
+                    writer.write(watch_updates.encode("utf-8") + b"\n")
+        except asyncio.CancelledError:
+            pass
+        finally:
+            receiver.cancel()
+            writer.close()
+
+
+class TestBizHawkConnector(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.connector = MockConnector()
+        port = await self.connector.start()
+        self.ctx = BizHawkContext()
+        self.ctx.streams = await asyncio.open_connection("127.0.0.1", port)
+        self.ctx.connection_status = ConnectionStatus.TENTATIVE
+
+    async def asyncTearDown(self) -> None:
+        await self.connector.stop()
+
+    async def test_version_and_ping(self) -> None:
+        self.assertEqual(await get_script_version(self.ctx), 3)
+        await ping(self.ctx)
+        self.assertEqual(self.ctx.connection_status, ConnectionStatus.CONNECTED)
+
+    async def test_concurrent_reads_are_batched(self) -> None:
+        """Ensure reads made in the same event loop iteration are sent as one message."""
+        results = await asyncio.gather(*(read(self.ctx, [(address, 4, "RAM")]) for address in range(0, 200, 10)))
+        self.assertEqual(results, [[bytes(range(address, address + 4))] for address in range(0, 200, 10)])
+        self.assertEqual(self.connector.messages, 1)
+
+    async def test_messages_are_drained(self) -> None:
+        """Ensure the writer is drained after each message, so messages don't pile up while BizHawk is busy."""
+        writer = self.ctx.streams[1]
+        drain = writer.drain
+        drains = 0
+
+        async def count_drain() -> None:
+            nonlocal drains
+            drains += 1
+            await drain()
+
+        writer.drain = count_drain
+        await asyncio.gather(*(read(self.ctx, [(address, 1, "RAM")]) for address in range(10)),
+                             guarded_read(self.ctx, [(0, 1, "RAM")], [(0, [0], "RAM")]))
+        self.assertEqual(drains, self.connector.messages)
+
+    async def test_guarded_reads_are_pipelined(self) -> None:
+        """Ensure guarded reads are not batched, as a failed guard would fail the others, but are all in flight."""
+        results = await asyncio.gather(*(guarded_read(self.ctx, [(address, 2, "RAM")],
+                                                      [(address, [address if address % 20 else 0], "RAM")])
+                                         for address in range(1, 200, 10)))
+        self.assertEqual(results, [None if address % 20 == 0 else [bytes((address, address + 1))]
+                                   for address in range(1, 200, 10)])
+        self.assertEqual(self.connector.messages, 20)
+        self.assertEqual(self.connector.max_messages_per_frame, 20)
+
+    async def test_poll_throughput(self) -> None:
+        """Ensure many concurrent polls finish within a few frames, where waiting for each response took 1000."""
+        await write(self.ctx, [(0, b"\x00\x00", "RAM")])
+        start_frames = self.connector.frames
+        for _ in range(5):
+            await asyncio.gather(*(read(self.ctx, [(address, 1, "RAM")]) for address in range(100)),
+                                 *(guarded_read(self.ctx, [(address, 1, "RAM")], [(0, [0], "RAM")])
+                                   for address in range(100)))
+        self.assertLessEqual(self.connector.frames - start_frames, 25)
+
+    async def test_watched_reads_are_local(self) -> None:
+        """Ensure reads and guards within watched memory are answered without sending a message."""
+        await watch(self.ctx, [(0x100, 16, "RAM"), (0x200, 4, "RAM")])
+        messages = self.connector.messages
+        self.assertEqual(await read(self.ctx, [(0x104, 4, "RAM"), (0x200, 4, "RAM")]),
+                         [b"\x04\x05\x06\x07", b"\x00\x01\x02\x03"])
+        self.assertEqual(await guarded_read(self.ctx, [(0x100, 1, "RAM")], [(0x201, [1], "RAM")]), [b"\x00"])
+        self.assertIsNone(await guarded_read(self.ctx, [(0x100, 1, "RAM")], [(0x201, [2], "RAM")]))
+        self.assertEqual(self.connector.messages, messages)
+
+        # not entirely within one watch
+        self.assertEqual(await read(self.ctx, [(0x10E, 4, "RAM")]), [b"\x0E\x0F\x10\x11"])
+        self.assertEqual(self.connector.messages, messages + 1)
+
+    async def test_watch_updates(self) -> None:
+        """Ensure the connector only sends watched memory when it changed, and that the changes are applied."""
+        await watch(self.ctx, [(0x100, 16, "RAM")])
+        await asyncio.sleep(self.connector.frame_time * 5)
+        self.assertEqual(self.connector.watch_updates, 0)
+
+        self.connector.memory[0x103:0x106] = b"abc"
+        self.connector.memory[0x10A] = 0xFF
+        while not self.connector.watch_updates:
+            await asyncio.sleep(self.connector.frame_time)
+        await asyncio.sleep(self.connector.frame_time)
+        self.assertEqual(await read(self.ctx, [(0x100, 16, "RAM")]),
+                         [b"\x00\x01\x02abc\x06\x07\x08\x09\xFF\x0B\x0C\x0D\x0E\x0F"])
+        self.assertEqual(self.connector.watch_updates, 1)
+
+        await unwatch(self.ctx, [(0x100, 16, "RAM")])
+        self.assertEqual(self.connector.watches, {})
+        messages = self.connector.messages
+        await read(self.ctx, [(0x100, 1, "RAM")])
+        self.assertEqual(self.connector.messages, messages + 1)
+
+    async def test_watched_writes(self) -> None:
+        """Ensure writes to watched memory are visible to reads right away."""
+        await watch(self.ctx, [(0x100, 4, "RAM")])
+        await write(self.ctx, [(0x0FE, b"wxyz", "RAM")])
+        self.assertEqual(await read(self.ctx, [(0x100, 4, "RAM")]), [b"yz\x02\x03"])
+        self.assertFalse(await guarded_write(self.ctx, [(0x102, b"!!", "RAM")], [(0x0FE, b"ww", "RAM")]))
+        self.assertEqual(await read(self.ctx, [(0x100, 4, "RAM")]), [b"yz\x02\x03"])
+
+    async def test_connection_closed(self) -> None:
+        """Ensure requests in flight fail when the connector closes the connection."""
+        request = asyncio.create_task(read(self.ctx, [(0, 1, "RAM")]))
+        await asyncio.sleep(0)
+        await self.connector.stop()
+        with self.assertRaises(RequestFailedError):
+            await request
+        self.assertEqual(self.ctx.connection_status, ConnectionStatus.NOT_CONNECTED)
+        self.assertIsNone(self.ctx.streams)
+        self.assertEqual(self.ctx.watches, {})
@@ -1,5 +1,24 @@
+import asyncio
+import os
+import tempfile
+import threading
+import typing
 import unittest
-from MultiServer import Context, ServerCommandProcessor
+import zlib
+from unittest import mock
+
+import websockets
+from typing_extensions import override
+
+from MultiServer import Client, Context, SaveJournal, ServerCommandProcessor, send_items_to, send_new_items
+from NetUtils import Hint, HintStatus, NetworkItem, decode
+from Utils import restricted_loads
+
+if typing.TYPE_CHECKING:
+    from NetUtils import ServerConnection
+
+Frame = typing.Tuple[typing.List[typing.Any], typing.List[typing.Dict[str, typing.Any]]]
+"""sockets a frame was sent to and the messages in it"""
 
 
 class TestResolvePlayerName(unittest.TestCase):
@@ -38,3 +57,283 @@ class TestResolvePlayerName(unittest.TestCase):
         assert p.resolve_player("ABC") == (1, 2, "abc"), "case insensitive resolves when 1 match"
         assert p.resolve_player("abcd") == (1, 3, "abCD"), "case insensitive resolves when 1 match"
         assert not p.resolve_player("aB"), "partial name shouldn't resolve to player"
+
+
+class TestSaveJournal(unittest.TestCase):
+    @override
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.save_filename = os.path.join(directory.name, "test.apsave")
+
+    def new_context(self) -> Context:
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.connect_names = {"Player1": (0, 1)}
+        ctx.save_filename = self.save_filename
+        ctx.saving = True
+        return ctx
+
+    def load(self) -> Context:
+        ctx = self.new_context()
+        with open(self.save_filename, "rb") as f:
+            savedata: typing.Dict[str, typing.Any] = restricted_loads(zlib.decompress(f.read()))
+        SaveJournal.replay(savedata, self.save_filename + ".journal")
+        ctx.set_save(savedata)
+        return ctx
+
+    def test_journal(self) -> None:
+        """Ensure changes are appended to the journal and restored from it."""
+        ctx = self.new_context()
+        ctx.save_journal = SaveJournal(self.save_filename + ".journal")
+        self.assertTrue(ctx.save(now=True))
+        with open(self.save_filename, "rb") as f:
+            full_save = f.read()
+        ctx.save_journal.save_size = 1 << 20  # don't compact
+
+        ctx.received_items[0, 1, True] = [NetworkItem(1, 2, 1)]
+        ctx.location_checks[0, 1] |= {2}
+        ctx.save_journal.location_checks[0, 1] |= {2}
+        ctx.hints[0, 1].add(Hint(1, 1, 3, 4, False))
+        ctx.index_hints(0, ctx.hints[0, 1])
+        ctx.save_journal.hints.add((0, 1))
+        ctx.stored_data["key"] = [5]
+        ctx.save_journal.stored_data.add("key")
+        ctx.hints_used[0, 1] = 1
+        # journaled saves only write the changes, instead of building the full save data
+        with mock.patch.object(Context, "get_save", side_effect=AssertionError):
+            self.assertTrue(ctx.save(now=True))
+
+            # checking the hinted location changes the hint, as in register_location_checks
+            ctx.received_items[0, 1, True].append(NetworkItem(4, 3, 1))
+            ctx.location_checks[0, 1] |= {3}
+            ctx.save_journal.location_checks[0, 1] |= {3}
+            ctx.recheck_location_hints(0, 1, {3})
+            self.assertTrue(ctx.save(now=True))
+
+        with open(self.save_filename, "rb") as f:
+            self.assertEqual(f.read(), full_save)
+        loaded = self.load()
+        self.assertEqual(loaded.get_save(), ctx.get_save())
+        self.assertEqual(loaded.hints[0, 1], {Hint(1, 1, 3, 4, True, status=HintStatus.HINT_FOUND)})
+        self.assertEqual(loaded.received_items[0, 1, True], [NetworkItem(1, 2, 1), NetworkItem(4, 3, 1)])
+
+    def test_compaction(self) -> None:
+        """Ensure a compacted save file does not get a stale journal replayed onto it."""
+        ctx = self.new_context()
+        ctx.save_journal = SaveJournal(self.save_filename + ".journal")
+        self.assertTrue(ctx.save(now=True))
+        ctx.save_journal.save_size = 1 << 20
+        ctx.stored_data["key"] = 1
+        ctx.save_journal.stored_data.add("key")
+        self.assertTrue(ctx.save(now=True))
+        with open(ctx.save_journal.filename, "rb") as f:
+            stale_journal = f.read()
+
+        ctx.stored_data["key"] = 2
+        ctx.save_journal.save_size = 0  # compact
+        self.assertTrue(ctx.save(now=True))
+        self.assertEqual(self.load().stored_data, {"key": 2})
+        with open(ctx.save_journal.filename, "wb") as f:
+            f.write(stale_journal)
+        self.assertEqual(self.load().stored_data, {"key": 2})
+
+    def test_legacy_save(self) -> None:
+        """Ensure a save file written without a journal is still loaded."""
+        ctx = self.new_context()
+        ctx.stored_data["key"] = 1
+        self.assertTrue(ctx.save(now=True))
+        self.assertFalse(os.path.exists(self.save_filename + ".journal"))
+        self.assertEqual(self.load().stored_data, {"key": 1})
+
+    def test_changes_are_taken_on_event_loop(self) -> None:
+        """Ensure saves from the saving thread take the changes on the event loop, which makes them."""
+        take_record = SaveJournal.take_record
+        threads: typing.List[threading.Thread] = []
+
+        def record_thread(journal: SaveJournal, ctx: Context) -> None:
+            threads.append(threading.current_thread())
+            take_record(journal, ctx)
+
+        async def save_from_thread() -> None:
+            ctx = self.new_context()
+            ctx.main_loop = asyncio.get_running_loop()
+            ctx.save_journal = SaveJournal(self.save_filename + ".journal")
+            self.assertTrue(ctx.save(now=True))
+            ctx.save_journal.save_size = 1 << 20
+            ctx.stored_data["key"] = 1
+            ctx.save_journal.stored_data.add("key")
+            with mock.patch.object(SaveJournal, "take_record", autospec=True, side_effect=record_thread):
+                self.assertTrue(await asyncio.to_thread(ctx.save, True))
+            self.assertEqual(threads, [threading.current_thread()])
+
+        asyncio.run(save_from_thread())
+        self.assertEqual(self.load().stored_data, {"key": 1})
+
+
+class TestSendNewItems(unittest.TestCase):
+    def test_pending_receivers(self) -> None:
+        """Ensure only clients of slots that received items are sent them, with one message per identical state."""
+        sent: typing.List[typing.Tuple[typing.List[Client], typing.List[typing.Dict[str, typing.Any]]]] = []
+
+        class RecordingContext(Context):
+            @override
+            def broadcast(self, endpoints: typing.Iterable[Client],
+                          msgs: typing.List[typing.Dict[str, typing.Any]]) -> None:
+                sent.append((list(endpoints), msgs))
+
+        ctx = RecordingContext("", 0, "", "", 0, 0, False)
+        ctx.clients = {0: {1: [], 2: []}}
+        for slot, remote_items in ((1, False), (1, False), (1, True), (2, False)):
+            client = Client(typing.cast("ServerConnection", None), ctx)
+            client.team = 0
+            client.slot = slot
+            client.remote_items = remote_items
+            ctx.clients[0][slot].append(client)
+
+        item = NetworkItem(1, 2, 1)
+        send_items_to(ctx, 0, 1, item)
+        self.assertEqual(ctx.pending_receivers, {(0, 1)})
+        send_new_items(ctx)
+        self.assertFalse(ctx.pending_receivers)
+        # the item was found by its receiver, so it is only sent to the client handling remote items
+        self.assertEqual(sent, [(ctx.clients[0][1][2:], [{"cmd": "ReceivedItems", "index": 0, "items": [item]}])])
+
+        sent.clear()
+        other_item = NetworkItem(2, 3, 2)
+        send_items_to(ctx, 0, 1, other_item)
+        send_new_items(ctx)
+        self.assertEqual(sent, [
+            (ctx.clients[0][1][:2], [{"cmd": "ReceivedItems", "index": 0, "items": [other_item]}]),
+            (ctx.clients[0][1][2:], [{"cmd": "ReceivedItems", "index": 1, "items": [other_item]}]),
+        ])
+        self.assertEqual([client.send_index for client in ctx.clients[0][1]], [1, 1, 2])
+        self.assertEqual(ctx.clients[0][2][0].send_index, 0)
+
+
+class TestHintIndex(unittest.TestCase):
+    def test_location_hints(self) -> None:
+        """Ensure hints are found by location and only the hints of checked locations are rechecked."""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        hint = Hint(2, 1, 10, 100, False)
+        other_hint = Hint(1, 1, 11, 101, False)
+        for slot, hints in ((1, {hint, other_hint}), (2, {hint})):
+            ctx.hints[0, slot] |= hints
+            ctx.index_hints(0, hints)
+        self.assertEqual(ctx.get_hint(0, 1, 10), hint)
+        self.assertIsNone(ctx.get_hint(0, 2, 10))
+        self.assertIsNone(ctx.get_hint(0, 1, 12))
+
+        ctx.location_checks[0, 1] |= {10, 11}
+        changed: typing.Set[typing.Tuple[int, int]] = set()
+        ctx.recheck_location_hints(0, 1, [10], changed)
+        found_hint = hint._replace(found=True, status=HintStatus.HINT_FOUND)
+        self.assertEqual(changed, {(0, 1), (0, 2)})
+        self.assertEqual(ctx.hints[0, 1], {found_hint, other_hint})
+        self.assertEqual(ctx.hints[0, 2], {found_hint})
+        self.assertEqual(ctx.get_hint(0, 1, 10), found_hint)
+        self.assertEqual(ctx.get_hint(0, 1, 11), other_hint)
+        self.assertEqual(ctx.hints_by_location[0, 1, 10], {found_hint}, "Replaced hint is still indexed.")
+
+        ctx.recheck_hints()
+        found_other_hint = other_hint._replace(found=True, status=HintStatus.HINT_FOUND)
+        self.assertEqual(ctx.get_hint(0, 1, 11), found_other_hint)
+        self.assertEqual(ctx.hints_by_location[0, 1, 11], {found_other_hint}, "Replaced hint is still indexed.")
+
+
+class TestOutbox(unittest.IsolatedAsyncioTestCase):
+    class Socket:
+        """Stands in for an open websocket connection."""
+        open = True
+
+        def __init__(self, frames: typing.List[Frame]) -> None:
+            self.frames = frames
+
+        async def send(self, frame: str) -> None:
+            self.frames.append(([self], decode(frame)))
+
+    @override
+    def setUp(self) -> None:
+        self.ctx = Context("", 0, "", "", 0, 0, False)
+        self.ctx.clients = {0: {1: [], 2: []}}
+        self.frames: typing.List[Frame] = []
+        self.sockets: typing.List[TestOutbox.Socket] = []
+        for slot in (1, 1, 2):
+            socket = self.Socket(self.frames)
+            self.sockets.append(socket)
+            client = Client(typing.cast("ServerConnection", socket), self.ctx)
+            client.auth = True
+            client.team = 0
+            client.slot = slot
+            self.ctx.clients[0][slot].append(client)
+            self.ctx.endpoints.append(client)
+
+        def broadcast(sockets: typing.Iterable[typing.Any], frame: str) -> None:
+            self.frames.append((list(sockets), decode(frame)))
+
+        patch = mock.patch("MultiServer.websockets.broadcast", broadcast)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    async def test_coalesced_frames(self) -> None:
+        """Ensure messages queued in one event loop iteration are sent in one frame, shared by identical queues."""
+        first, second, other = *self.ctx.clients[0][1], self.ctx.clients[0][2][0]
+        self.ctx.broadcast_text_all("text")
+        self.ctx.broadcast(self.ctx.clients[0][1], [{"cmd": "RoomUpdate", "hint_points": 1}])
+        self.assertTrue(await self.ctx.send_msgs(other, [{"cmd": "RoomUpdate", "hint_points": 2}, {"cmd": "Bounced"}]))
+
+        text = {"cmd": "PrintJSON", "data": [{"text": "text"}]}
+        self.assertEqual(self.frames, [
+            ([first.socket, second.socket], [text, {"cmd": "RoomUpdate", "hint_points": 1}]),
+            ([other.socket], [text, {"cmd": "RoomUpdate", "hint_points": 2}, {"cmd": "Bounced"}]),
+        ])
+        self.assertEqual([client.max_queue_depth for client in (first, second, other)], [2, 2, 2])
+        self.assertEqual([client.sent_frames for client in (first, second, other)], [1, 1, 1])
+        self.assertEqual(first.sent_bytes, second.sent_bytes)
+        self.assertGreater(other.sent_bytes, first.sent_bytes)
+        self.assertFalse(first.outbox or other.outbox or self.ctx.flushing_clients)
+
+    async def test_frame_size(self) -> None:
+        """Ensure queued messages are split across frames above the maximum frame size."""
+        other = self.ctx.clients[0][2][0]
+        self.ctx.max_frame_size = 2 * len(self.ctx.dumper([{"cmd": "Bounced", "data": 0}]))
+        for number in range(3):
+            self.ctx.broadcast((other,), [{"cmd": "Bounced", "data": number}])
+        await asyncio.sleep(0)
+        assert other.send_task
+        await other.send_task
+        self.assertEqual([frame for _, frame in self.frames], [
+            [{"cmd": "Bounced", "data": 0}, {"cmd": "Bounced", "data": 1}],
+            [{"cmd": "Bounced", "data": 2}],
+        ])
+        self.assertEqual(other.sent_frames, 2)
+
+    async def test_frames_stay_in_order(self) -> None:
+        """Ensure shared frames queue behind frames a client is still sending, and closed connections disconnect."""
+        first, second, other = *self.ctx.clients[0][1], self.ctx.clients[0][2][0]
+        send_started = asyncio.Event()
+        release_send = asyncio.Event()
+
+        async def slow_send(frame: str) -> None:
+            send_started.set()
+            await release_send.wait()
+            self.frames.append(([first.socket], decode(frame)))
+
+        with mock.patch.object(self.sockets[0], "send", slow_send):
+            sent = asyncio.create_task(self.ctx.send_msgs(first, [{"cmd": "Bounced", "data": 0}]))
+            await send_started.wait()
+            self.ctx.broadcast((first, second), [{"cmd": "Bounced", "data": 1}])
+            await asyncio.sleep(0)
+            self.assertEqual(self.frames, [([second.socket], [{"cmd": "Bounced", "data": 1}])])
+
+            release_send.set()
+            self.assertTrue(await sent)
+            await asyncio.sleep(0)
+        self.assertEqual([frame for sockets, frame in self.frames if sockets == [first.socket]],
+                         [[{"cmd": "Bounced", "data": 0}], [{"cmd": "Bounced", "data": 1}]])
+
+        async def closed_send(frame: str) -> None:
+            raise websockets.ConnectionClosed(None, None)
+
+        with mock.patch.object(self.sockets[2], "send", closed_send), self.assertLogs(self.ctx.logger, "ERROR"):
+            self.assertFalse(await self.ctx.send_msgs(other, [{"cmd": "Bounced"}]))
+        self.assertNotIn(other, self.ctx.endpoints)
@@ -191,3 +191,38 @@ class TestHostFakeRoom(TestBase):
         with db_session:
             commands = select(command for command in Command if command.room.id == self.room_id)  # type: ignore
             self.assertNotIn("/help", (command.commandtext for command in commands))
+
+    def test_host_room_own_post_dispatch(self) -> None:
+        """Verify queued commands get handed to the event loop of their running room and removed from the queue."""
+        import logging
+        from pony.orm import db_session, select
+        from WebHostLib.customserver import CommandDispatcher
+        from WebHostLib.models import Command
+
+        class RecordingLoop:
+            def __init__(self) -> None:
+                self.calls = []
+
+            def call_soon_threadsafe(self, callback, *args) -> None:
+                self.calls.append(args)
+
+        class RunningRoom:
+            def __init__(self, room_id: UUID) -> None:
+                self.room_id = room_id
+                self.main_loop = RecordingLoop()
+                self.logger = logging.getLogger("RunningRoom")
+
+        with self.app.app_context(), self.app.test_request_context():
+            self.client.post(url_for("host_room", room=self.room_id), data={"cmd": "/help"})
+            self.client.post(url_for("host_room", room=self.room_id), data={"cmd": "/status"})
+
+        dispatcher = CommandDispatcher()
+        self.assertEqual(dispatcher.dispatch(), 0)  # not running
+        room = RunningRoom(self.room_id)
+        dispatcher.add_room(room)  # type: ignore
+        self.assertEqual(dispatcher.dispatch(), 2)
+        self.assertEqual(room.main_loop.calls, [("/help",), ("/status",)])
+        with db_session:
+            commands = select(command for command in Command if command.room.id == self.room_id)  # type: ignore
+            self.assertFalse(commands)
+        self.assertEqual(dispatcher.dispatch(), 0)
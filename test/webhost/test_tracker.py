@@ -103,3 +103,42 @@ class TestTracker(TestBase):
                 self.assertEqual(response.status_code, 200)
             with self.client.open(url_for("api.tracker_slot_data", tracker=self.tracker_uuid)) as response:
                 self.assertEqual(response.status_code, 200)
+
+    def test_tracker_snapshot(self) -> None:
+        """Verify that a snapshot published by the room is read instead of the save, until the room drops it."""
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import TrackerData, update_tracker_snapshot
+
+        update_tracker_snapshot(self.room_id, {"location_checks": {(0, 1): set()}, "name_aliases": {(0, 1): "Alias"}})
+        update_tracker_snapshot(self.room_id, {"location_checks": {(0, 1): {1, 2}}})
+        try:
+            with db_session:
+                tracker_data = TrackerData(Room.get(id=self.room_id))
+                self.assertEqual(tracker_data.get_player_checked_locations(0, 1), {1, 2})
+                self.assertEqual(tracker_data.get_player_alias(0, 1), "Alias")
+        finally:
+            update_tracker_snapshot(self.room_id, None)
+
+        with db_session:
+            tracker_data = TrackerData(Room.get(id=self.room_id))
+            self.assertEqual(tracker_data.get_player_checked_locations(0, 1), set())
+            self.assertIsNone(tracker_data.get_player_alias(0, 1))
+
+    def test_shared_static_data(self) -> None:
+        """Verify that requests share the decoded multidata and data package tables without adding to them."""
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import TrackerData
+
+        with db_session:
+            first = TrackerData(Room.get(id=self.room_id))
+            second = TrackerData(Room.get(id=self.room_id))
+            self.assertIs(first._multidata, second._multidata)
+
+            game = first.get_player_game(1)
+            item_id_to_name = first.item_id_to_name[game]
+            self.assertEqual(item_id_to_name[-1], "Unknown Item (ID: -1)")
+            self.assertNotIn(-1, item_id_to_name)
+            self.assertNotIn(-1, second.item_id_to_name[game])
+            self.assertIsNone(item_id_to_name.get(-1))
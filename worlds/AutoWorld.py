@@ -11,7 +11,7 @@ from typing import (Any, Callable, ClassVar, Dict, FrozenSet, Iterable, List, Ma
                     TYPE_CHECKING, Type, Union)
 
 from Options import item_and_loc_options, ItemsAccessibility, OptionGroup, PerGameCommonOptions
-from BaseClasses import CollectionState
+from BaseClasses import CollectionState, IndexedItems, ItemIndex
 from Utils import Version
 
 if TYPE_CHECKING:
@@ -26,8 +26,84 @@ class InvalidItemError(KeyError):
     pass
 
 
+class WorldTypes(Dict[str, Type["World"]]):
+    """
+    Registered World classes by game name.
+
+    Acts like a regular dict, unless loading got deferred to a world index, in which case membership is answered from
+    the index and worlds are only imported when they are looked up. Anything that needs all worlds loads all of them.
+    """
+    _world_versions: Dict[str, Version] = {}
+    _deferred_games: Set[str] = set()
+    _load_game: Optional[Callable[[str], None]] = None
+    _load_all: Optional[Callable[[], None]] = None
+
+    def defer(self, world_versions: Dict[str, Version], load_game: Callable[[str], None],
+              load_all: Callable[[], None]) -> None:
+        """
+        Answer membership for the indexed games without importing them, importing them on lookup with load_game.
+        Their world_version is applied on registration, as their manifests are not read again.
+        """
+        self._world_versions = world_versions
+        self._deferred_games = set(world_versions)
+        self._load_game = load_game
+        self._load_all = load_all
+
+    def is_loaded(self, game: str) -> bool:
+        return super().__contains__(game)
+
+    def load_all(self) -> None:
+        load_all = self._load_all
+        if load_all:
+            self._load_game = self._load_all = None
+            self._deferred_games = set()
+            load_all()
+
+    def __contains__(self, game: object) -> bool:
+        return super().__contains__(game) or game in self._deferred_games
+
+    def __setitem__(self, game: str, world_type: Type[World]) -> None:
+        if game in self._world_versions:
+            world_type.world_version = self._world_versions[game]
+        super().__setitem__(game, world_type)
+
+    def __missing__(self, game: str) -> Type[World]:
+        if self._load_game and game in self._deferred_games:
+            self._deferred_games.discard(game)
+            self._load_game(game)
+            if self.is_loaded(game):
+                return super().__getitem__(game)
+        raise KeyError(game)
+
+    def get(self, game: str, default: Any = None) -> Any:
+        try:
+            return self[game]
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        self.load_all()
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        self.load_all()
+        return super().__len__()
+
+    def keys(self):
+        self.load_all()
+        return super().keys()
+
+    def values(self):
+        self.load_all()
+        return super().values()
+
+    def items(self):
+        self.load_all()
+        return super().items()
+
+
 class AutoWorldRegister(type):
-    world_types: Dict[str, Type[World]] = {}
+    world_types: WorldTypes = WorldTypes()
     __file__: str
     zip_path: Optional[str]
     settings_key: str
@@ -70,6 +146,7 @@ class AutoWorldRegister(type):
                                         in dct.get("location_name_groups", {}).items()}
             dct["location_name_groups"]["Everywhere"] = dct["location_names"]
             dct["all_item_and_group_names"] = frozenset(dct["item_names"] | set(dct.get("item_name_groups", {})))
+            dct["item_index"] = ItemIndex(dct["item_name_to_id"], dct["item_name_groups"])
 
             # move away from get_required_client_version function
             assert "get_required_client_version" not in dct, f"{name}: required_client_version is an attribute now"
@@ -88,11 +165,15 @@ class AutoWorldRegister(type):
         new_class = super().__new__(mcs, name, bases, dct)
         new_class.__file__ = sys.modules[new_class.__module__].__file__
         if "game" in dct:
-            if dct["game"] in AutoWorldRegister.world_types:
+            if AutoWorldRegister.world_types.is_loaded(dct["game"]):
                 raise RuntimeError(f"""Game {dct["game"]} already registered in 
                 {AutoWorldRegister.world_types[dct["game"]].__file__} when attempting to register from
                 {new_class.__file__}.""")
             AutoWorldRegister.world_types[dct["game"]] = new_class
+            package = get_world_package(new_class.__module__)
+            if package and package not in CollectionState.world_packages:
+                CollectionState.world_packages.add(package)
+                CollectionState.logic_mixin_registrations += 1
         if ".apworld" in new_class.__file__:
             new_class.zip_path = pathlib.Path(new_class.__file__).parents[1]
         if "settings_key" not in dct:
@@ -103,15 +184,31 @@ class AutoWorldRegister(type):
         return new_class
 
 
+def get_world_package(module: str) -> Optional[str]:
+    """Returns the package ("worlds.name") of a module within a world package."""
+    return ".".join(module.split(".", 2)[:2]) if module.startswith("worlds.") else None
+
+
 class AutoLogicRegister(type):
     def __new__(mcs, name: str, bases: Tuple[type, ...], dct: Dict[str, Any]) -> AutoLogicRegister:
         new_class = super().__new__(mcs, name, bases, dct)
+        # hooks of mixins in a world package only run for MultiWorlds containing a world from that package, unless the
+        # package does not register a World, such as shared libraries of worlds
+        package = get_world_package(new_class.__module__)
         function: Callable[..., Any]
         for item_name, function in dct.items():
+            if item_name in ("copy_mixin", "init_mixin"):
+                CollectionState.logic_mixin_registrations += 1
             if item_name == "copy_mixin":
-                CollectionState.additional_copy_functions.append(function)
+                if package:
+                    CollectionState.world_copy_functions.setdefault(package, []).append(function)
+                else:
+                    CollectionState.additional_copy_functions.append(function)
             elif item_name == "init_mixin":
-                CollectionState.additional_init_functions.append(function)
+                if package:
+                    CollectionState.world_init_functions.setdefault(package, []).append(function)
+                else:
+                    CollectionState.additional_init_functions.append(function)
             elif not item_name.startswith("__"):
                 if hasattr(CollectionState, item_name):
                     raise Exception(f"Name conflict on Logic Mixin {name} trying to overwrite {item_name}")
@@ -318,11 +415,25 @@ class World(metaclass=AutoWorldRegister):
     If False, everything is rechecked at every step, which is slower computationally, 
     but may be desirable in complex/dynamic worlds."""
 
+    incremental_reachability: bool = False
+    """If True, each blocked Entrance remembers which of this world's items its access rule looked up in
+    CollectionState.prog_items, and is only retested once one of those items changes. Sweeps and spheres likewise only
+    retest unreachable Locations once their items, their parent Region or Region reachability changed.
+    Only enable this if Entrance and Location access rules depend solely on this world's prog_items and reachable
+    Regions."""
+
+    indexed_prog_items: bool = False
+    """If True, this world's CollectionState.prog_items also keeps the counts of items from item_name_to_id in an
+    int array, which speeds up the has_group family and rules precompiled with World.index_items.
+    Only enable this if all counts of those items are ints. Can be combined with incremental_reachability."""
+
     multiworld: "MultiWorld"
     """autoset on creation. The MultiWorld object for the currently generating multiworld."""
     player: int
     """autoset on creation. The player number for this World"""
 
+    item_index: ClassVar[ItemIndex]
+    """automatically generated item name -> index table for indexed_prog_items"""
     item_id_to_name: ClassVar[Dict[int, str]]
     """automatically generated reverse lookup of item id to name"""
     location_id_to_name: ClassVar[Dict[int, str]]
@@ -568,6 +679,14 @@ class World(metaclass=AutoWorldRegister):
     def push_precollected(self, item: Item) -> None:
         self.multiworld.push_precollected(item)
 
+    @classmethod
+    def index_items(cls, item_names: Iterable[str]) -> IndexedItems:
+        """
+        Precompiles item names for CollectionState.has_all_indexed, has_any_indexed and count_indexed.
+        Intended to be called once when creating rules, not from within rules.
+        """
+        return cls.item_index.compile(item_names)
+
     @property
     def player_name(self) -> str:
         return self.multiworld.get_player_name(self.player)
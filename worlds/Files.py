@@ -1,26 +1,109 @@
 from __future__ import annotations
 
 import abc
+import concurrent.futures
 import json
 import zipfile
 from enum import IntEnum
+from multiprocessing import resource_tracker, shared_memory
 import os
+import struct
 import threading
 from io import BytesIO
 
-from typing import (ClassVar, Dict, List, Literal, Tuple, Any, Optional, Union, BinaryIO, overload, Sequence,
-                    TYPE_CHECKING)
+from typing import (Callable, ClassVar, Dict, List, Literal, Tuple, Any, Optional, Type, Union, BinaryIO, overload,
+                    Sequence, TYPE_CHECKING)
 
 import bsdiff4
 
 semaphore = threading.Semaphore(os.cpu_count() or 4)
 
-del threading
-
 if TYPE_CHECKING:
     from Utils import Version
 
 
+class DeltaPatchProcessPool:
+    """
+    Process pool that APDeltaPatch hands its bsdiff4 diff to, so diffing roms is not serialized with the output of other
+    worlds by the GIL. Patching the rom itself still runs in the world's output thread.
+    The base data of patch classes is copied into shared memory once, where the worker processes read it.
+    While entered, it is available as `delta_patch_process_pool`.
+    """
+    processes: int
+    executor: Optional[concurrent.futures.ProcessPoolExecutor]
+    shared_source_data: Dict[Type[APProcedurePatch], Tuple[shared_memory.SharedMemory, int]]
+
+    def __init__(self, processes: int) -> None:
+        self.processes = processes
+        self.executor = None
+        self.shared_source_data = {}
+        self.lock = threading.Lock()
+
+    def __enter__(self) -> DeltaPatchProcessPool:
+        global delta_patch_process_pool
+        if self.processes > 0:
+            if os.name == "posix":
+                # workers have to share the resource tracker, or theirs would remove the shared memory when they exit.
+                # Elsewhere shared memory is not tracked, and lives as long as this process keeps it open.
+                resource_tracker.ensure_running()
+            self.executor = concurrent.futures.ProcessPoolExecutor(self.processes)
+            # start the workers now, before output threads are running
+            self.executor.submit(int).result()
+            delta_patch_process_pool = self
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        global delta_patch_process_pool
+        if delta_patch_process_pool is self:
+            delta_patch_process_pool = None
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
+        for memory, _ in self.shared_source_data.values():
+            memory.close()
+            memory.unlink()
+        self.shared_source_data.clear()
+
+    def share_source_data(self, patch_type: Type[APProcedurePatch]) -> Tuple[str, int]:
+        """Returns name and size of the shared memory holding the base data of patch_type."""
+        with self.lock:
+            if patch_type not in self.shared_source_data:
+                source_data = patch_type.get_source_data_with_cache()
+                memory = shared_memory.SharedMemory(create=True, size=max(len(source_data), 1))
+                memory.buf[:len(source_data)] = source_data
+                self.shared_source_data[patch_type] = memory, len(source_data)
+            memory, size = self.shared_source_data[patch_type]
+        return memory.name, size
+
+    def diff(self, patch_type: Type[APProcedurePatch], patched_path: str) -> bytes:
+        """Creates the bsdiff4 delta from the base data of patch_type to the file at patched_path in a worker."""
+        assert self.executor, "DeltaPatchProcessPool has to be entered before use"
+        source_name, source_size = self.share_source_data(patch_type)
+        return self.executor.submit(_diff_from_shared_source, source_name, source_size, patched_path).result()
+
+
+delta_patch_process_pool: Optional[DeltaPatchProcessPool] = None
+_worker_source_data: Dict[str, bytes] = {}
+
+
+def _diff_from_shared_source(source_name: str, source_size: int, patched_path: str) -> bytes:
+    """
+    Runs in an DeltaPatchProcessPool worker, which copies shared base data only the first time it needs it.
+    Sharing it still saves pickling the base data through the worker's pipe for every patch.
+    """
+    source_data = _worker_source_data.get(source_name)
+    if source_data is None:
+        memory = shared_memory.SharedMemory(source_name)
+        try:
+            # bsdiff4 can't read from the shared memory directly, it rejects buffers that have to be released again,
+            # such as memoryview and mmap
+            source_data = _worker_source_data[source_name] = bytes(memory.buf[:source_size])
+        finally:
+            memory.close()
+    with open(patched_path, "rb") as f:
+        return bsdiff4.diff(source_data, f.read())
+
+
 class ImproperlyConfiguredAutoPatchError(Exception):
     pass
 
@@ -344,7 +427,7 @@ class APProcedurePatch(APAutoPatchInterface):
 
     def patch(self, target: str) -> None:
         self.read()
-        base_data = self.get_source_data_with_cache()
+        data: Union[bytes, bytearray] = self.get_source_data_with_cache()
         patch_extender = AutoPatchExtensionRegister.get_handler(self.game)
         assert not isinstance(self.procedure, str), f"{type(self)} must define procedures"
         for step, args in self.procedure:
@@ -354,11 +437,13 @@ class APProcedurePatch(APAutoPatchInterface):
             else:
                 extension = getattr(patch_extender, step, None)
             if extension is not None:
-                base_data = extension(self, base_data, *args)
+                if isinstance(data, bytearray) and not getattr(extension, "accepts_bytearray", False):
+                    data = bytes(data)
+                data = extension(self, data, *args)
             else:
                 raise NotImplementedError(f"Unknown procedure {step} for {self.game}.")
         with open(target, 'wb') as f:
-            f.write(base_data)
+            f.write(data)
 
 
 class APDeltaPatch(APProcedurePatch):
@@ -374,8 +459,12 @@ class APDeltaPatch(APProcedurePatch):
         self.patched_path = patched_path
 
     def write_contents(self, opened_zipfile: zipfile.ZipFile) -> None:
-        self.write_file("delta.bsdiff4",
-                        bsdiff4.diff(self.get_source_data_with_cache(), open(self.patched_path, "rb").read()))
+        if delta_patch_process_pool:
+            delta = delta_patch_process_pool.diff(type(self), self.patched_path)
+        else:
+            with open(self.patched_path, "rb") as f:
+                delta = bsdiff4.diff(self.get_source_data_with_cache(), f.read())
+        self.write_file("delta.bsdiff4", delta)
         super(APDeltaPatch, self).write_contents(opened_zipfile)
 
 
@@ -457,6 +546,20 @@ class APTokenMixin:
         self._tokens.append((token_type, offset, data))
 
 
+_token_count = struct.Struct("<I")
+_token_header = struct.Struct("<BII")
+_token_range = struct.Struct("<II")
+
+
+def accepts_bytearray(function: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Marks a patch extension function that also accepts the data to patch as a bytearray, which it may change in place
+    and return, instead of bytes. Steps after unmarked ones get bytes, so the procedure avoids copies between steps.
+    """
+    function.accepts_bytearray = True  # type: ignore[attr-defined]
+    return function
+
+
 class APPatchExtension(metaclass=AutoPatchExtensionRegister):
     """Class that defines patch extension functions for a given game.
     Patch extension functions must have the following two arguments in the following order:
@@ -468,6 +571,7 @@ class APPatchExtension(metaclass=AutoPatchExtensionRegister):
     Further arguments are passed in from the procedure as defined.
 
     Patch extension functions must return the changed bytes.
+    Functions marked with accepts_bytearray may also be given a bytearray, and return it after changing it in place.
     """
     game: str
     required_extensions: ClassVar[Tuple[str, ...]] = ()
@@ -478,44 +582,42 @@ class APPatchExtension(metaclass=AutoPatchExtensionRegister):
         return bsdiff4.patch(rom, caller.get_file(patch))
 
     @staticmethod
-    def apply_tokens(caller: APProcedurePatch, rom: bytes, token_file: str) -> bytes:
+    @accepts_bytearray
+    def apply_tokens(caller: APProcedurePatch, rom: Union[bytes, bytearray], token_file: str) -> bytearray:
         """Applies the given token file from the patch onto the current file."""
-        token_data = caller.get_file(token_file)
-        rom_data = bytearray(rom)
-        token_count = int.from_bytes(token_data[0:4], "little")
-        bpr = 4
+        token_data = memoryview(caller.get_file(token_file))
+        rom_data = rom if isinstance(rom, bytearray) else bytearray(rom)
+        token_count, = _token_count.unpack_from(token_data)
+        bpr = _token_count.size
         for _ in range(token_count):
-            token_type = token_data[bpr:bpr + 1][0]
-            offset = int.from_bytes(token_data[bpr + 1:bpr + 5], "little")
-            size = int.from_bytes(token_data[bpr + 5:bpr + 9], "little")
-            data = token_data[bpr + 9:bpr + 9 + size]
-            if token_type in [APTokenTypes.AND_8, APTokenTypes.OR_8, APTokenTypes.XOR_8]:
-                arg = data[0]
-                if token_type == APTokenTypes.AND_8:
-                    rom_data[offset] = rom_data[offset] & arg
-                elif token_type == APTokenTypes.OR_8:
-                    rom_data[offset] = rom_data[offset] | arg
-                else:
-                    rom_data[offset] = rom_data[offset] ^ arg
-            elif token_type in [APTokenTypes.COPY, APTokenTypes.RLE]:
-                length = int.from_bytes(data[:4], "little")
-                value = int.from_bytes(data[4:], "little")
-                if token_type == APTokenTypes.COPY:
-                    rom_data[offset: offset + length] = rom_data[value: value + length]
-                else:
-                    rom_data[offset: offset + length] = bytes([value] * length)
-            else:
-                rom_data[offset:offset + len(data)] = data
-            bpr += 9 + size
-        return bytes(rom_data)
+            token_type, offset, size = _token_header.unpack_from(token_data, bpr)
+            bpr += _token_header.size
+            if token_type == APTokenTypes.COPY:
+                length, source = _token_range.unpack_from(token_data, bpr)
+                rom_data[offset:offset + length] = rom_data[source:source + length]
+            elif token_type == APTokenTypes.RLE:
+                length, value = _token_range.unpack_from(token_data, bpr)
+                rom_data[offset:offset + length] = bytes((value,)) * length
+            elif token_type == APTokenTypes.AND_8:
+                rom_data[offset] &= token_data[bpr]
+            elif token_type == APTokenTypes.OR_8:
+                rom_data[offset] |= token_data[bpr]
+            elif token_type == APTokenTypes.XOR_8:
+                rom_data[offset] ^= token_data[bpr]
+            else:  # APTokenTypes.WRITE
+                rom_data[offset:offset + size] = token_data[bpr:bpr + size]
+            bpr += size
+        return rom_data
 
     @staticmethod
-    def calc_snes_crc(caller: APProcedurePatch, rom: bytes) -> bytes:
+    @accepts_bytearray
+    def calc_snes_crc(caller: APProcedurePatch, rom: Union[bytes, bytearray]) -> bytearray:
         """Calculates and applies a valid CRC for the SNES rom header."""
-        rom_data = bytearray(rom)
+        rom_data = rom if isinstance(rom, bytearray) else bytearray(rom)
         if len(rom) < 0x8000:
             raise Exception("Tried to calculate SNES CRC on file too small to be a SNES ROM.")
-        crc = (sum(rom_data[:0x7FDC] + rom_data[0x7FE0:]) + 0x01FE) & 0xFFFF
+        with memoryview(rom_data) as view:
+            crc = (sum(view[:0x7FDC]) + sum(view[0x7FE0:]) + 0x01FE) & 0xFFFF
         inv = crc ^ 0xFFFF
         rom_data[0x7FDC:0x7FE0] = [inv & 0xFF, (inv >> 8) & 0xFF, crc & 0xFF, (crc >> 8) & 0xFF]
-        return bytes(rom_data)
+        return rom_data
@@ -11,10 +11,11 @@ import dataclasses
 import json
 from pathlib import Path
 from types import ModuleType
-from typing import List, Sequence
+from typing import Dict, List, Optional, Sequence, TypedDict
 
+import Utils
 from NetUtils import DataPackage
-from Utils import local_path, user_path, Version, version_tuple, tuplize_version
+from Utils import cache_path, local_path, user_path, Version, version_tuple, tuplize_version, __version__
 
 local_folder = os.path.dirname(__file__)
 user_folder = user_path("worlds") if user_path() != local_path() else user_path("custom_worlds")
@@ -30,6 +31,7 @@ __all__ = {
     "local_folder",
     "user_folder",
     "failed_world_loads",
+    "world_index",
 }
 
 
@@ -72,6 +74,39 @@ class WorldSource:
             failed_world_loads.append(os.path.basename(self.path).rsplit(".", 1)[0])
             return False
 
+    def signature(self) -> List[int]:
+        """Cheap change detection, made from modification times and sizes of the files making up this source."""
+        path = self.resolved_path
+        if self.is_zip:
+            stat = os.stat(path)
+            return [stat.st_mtime_ns, stat.st_size]
+        latest = size = count = 0
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = [dirname for dirname in dirnames if dirname != "__pycache__"]
+            # a directory's mtime changes when files get added or removed
+            latest = max(latest, os.stat(dirpath).st_mtime_ns)
+            for file in filenames:
+                stat = os.stat(os.path.join(dirpath, file))
+                latest = max(latest, stat.st_mtime_ns)
+                size += stat.st_size
+                count += 1
+        return [latest, size, count]
+
+
+class WorldIndexEntry(TypedDict):
+    source: str  # resolved path of the WorldSource providing the game
+    world_version: str
+    hidden: bool
+    settings_key: str
+    settings_class: Optional[str]  # "module.ClassName" of the world, if it has settings
+    hint_blacklist: List[str]
+
+
+world_index_path = cache_path("world_index.json")
+# metadata of all worlds, which unlike AutoWorldRegister.world_types does not require them to be imported
+world_index: Dict[str, WorldIndexEntry]
+network_data_package: DataPackage
+
 
 # find potential world containers, currently folders and zip-importable .apworld's
 world_sources: List[WorldSource] = []
@@ -93,110 +128,213 @@ for folder in (folder for folder in (user_folder, local_folder) if folder):
 
 # import all submodules to trigger AutoWorldRegister
 world_sources.sort()
-apworlds: list[WorldSource] = []
-for world_source in world_sources:
-    # load all loose files first:
-    if world_source.is_zip:
-        apworlds.append(world_source)
-    else:
-        world_source.load()
-
 from .AutoWorld import AutoWorldRegister
 
-for world_source in world_sources:
-    if not world_source.is_zip:
-        # look for manifest
-        manifest = {}
-        for dirpath, dirnames, filenames in os.walk(world_source.resolved_path):
-            for file in filenames:
-                if file.endswith("archipelago.json"):
-                    with open(os.path.join(dirpath, file), mode="r", encoding="utf-8") as manifest_file:
-                        manifest = json.load(manifest_file)
+apworld_module_specs: Dict[str, importlib.machinery.ModuleSpec] = {}
+importable_apworlds: List[WorldSource] = []  # in load order
+
+
+class APWorldModuleFinder(importlib.abc.MetaPathFinder):
+    def find_spec(
+            self, fullname: str, _path: Sequence[str] | None, _target: ModuleType = None
+    ) -> importlib.machinery.ModuleSpec | None:
+        return apworld_module_specs.get(fullname)
+
+
+def add_apworld_spec(apworld_source: WorldSource) -> None:
+    """Makes the world module inside an .apworld importable."""
+    if not apworld_module_specs:
+        sys.meta_path.insert(0, APWorldModuleFinder())
+    importer = zipimport.zipimporter(apworld_source.resolved_path)
+    world_name = Path(apworld_source.path).stem
+    apworld_module_specs[f"worlds.{world_name}"] = importer.find_spec(f"worlds.{world_name}")
+    importable_apworlds.append(apworld_source)
+
+
+def core_signature() -> list:
+    """Changes to the core version or world loading invalidate the world index."""
+    from . import AutoWorld
+    return [__version__, *(os.stat(file).st_mtime_ns for file in (__file__, AutoWorld.__file__))]
+
+
+def read_world_index() -> dict | None:
+    """Returns the cached world index, if it was built from the world sources as they are now."""
+    try:
+        with open(world_index_path, mode="r", encoding="utf-8") as index_file:
+            index = json.load(index_file)
+        if index["core"] != core_signature() or \
+                index["sources"] != {source.resolved_path: source.signature() for source in world_sources}:
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return index
+
+
+def build_world_index() -> Dict[str, WorldIndexEntry]:
+    """Collects the metadata of all loaded worlds."""
+    sources_by_module: Dict[str, WorldSource] = {}
+    for source in world_sources:
+        sources_by_module.setdefault(f"worlds.{Path(source.path).stem}", source)
+    index: Dict[str, WorldIndexEntry] = {}
+    for game, world in AutoWorldRegister.world_types.items():
+        source = sources_by_module.get(".".join(world.__module__.split(".", 2)[:2]))
+        if not source:
+            continue
+        annotation = world.__annotations__.get("settings", None)
+        has_settings = annotation is not None and annotation != "ClassVar[Optional['Group']]"
+        index[game] = {
+            "source": source.resolved_path,
+            "world_version": world.world_version.as_simple_string(),
+            "hidden": world.hidden,
+            "settings_key": world.settings_key,
+            "settings_class": f"{world.__module__}.{world.__name__}" if has_settings else None,
+            "hint_blacklist": sorted(world.hint_blacklist),
+        }
+    return index
+
+
+def write_world_index() -> None:
+    index = {
+        "core": core_signature(),
+        "sources": {source.resolved_path: source.signature() for source in world_sources},
+        "apworlds": [source.resolved_path for source in importable_apworlds],
+        "failed_world_loads": failed_world_loads,
+        "games": world_index,
+        "data_package": network_data_package,
+    }
+    try:
+        os.makedirs(os.path.dirname(world_index_path), exist_ok=True)
+        temp_path = world_index_path + ".tmp"
+        with open(temp_path, mode="w", encoding="utf-8") as index_file:
+            json.dump(index, index_file)
+        os.replace(temp_path, world_index_path)
+    except OSError as e:
+        logging.warning(f"Could not write world index to {world_index_path}: {e}")
+
+
+cached_index = read_world_index() if Utils.lazy_world_loading else None
+if cached_index:
+    # import worlds when they are first looked up instead
+    world_index = cached_index["games"]
+    failed_world_loads.extend(cached_index["failed_world_loads"])
+    network_data_package = cached_index["data_package"]
+
+    def defer_world_loading() -> None:
+        sources_by_path = {source.resolved_path: source for source in world_sources}
+        for apworld_path in cached_index["apworlds"]:
+            add_apworld_spec(sources_by_path[apworld_path])
+        # same order as regular loading, loose files first, then .apworld's by version
+        deferred_sources = [source for source in world_sources if not source.is_zip] + importable_apworlds
+
+        def load_game(game: str) -> None:
+            source = sources_by_path[world_index[game]["source"]]
+            if source in deferred_sources:
+                deferred_sources.remove(source)
+                source.load()
+
+        def load_all() -> None:
+            while deferred_sources:
+                deferred_sources.pop(0).load()
+
+        AutoWorldRegister.world_types.defer(
+            {game: tuplize_version(entry["world_version"]) for game, entry in world_index.items()},
+            load_game, load_all)
+    defer_world_loading()
+    del defer_world_loading
+else:
+    apworlds: list[WorldSource] = []
+    for world_source in world_sources:
+        # load all loose files first:
+        if world_source.is_zip:
+            apworlds.append(world_source)
+        else:
+            world_source.load()
+
+    for world_source in world_sources:
+        if not world_source.is_zip:
+            # look for manifest
+            manifest = {}
+            for dirpath, dirnames, filenames in os.walk(world_source.resolved_path):
+                for file in filenames:
+                    if file.endswith("archipelago.json"):
+                        with open(os.path.join(dirpath, file), mode="r", encoding="utf-8") as manifest_file:
+                            manifest = json.load(manifest_file)
+                        break
+                if manifest:
                     break
-            if manifest:
-                break
-        game = manifest.get("game")
-        if game in AutoWorldRegister.world_types:
-            AutoWorldRegister.world_types[game].world_version = tuplize_version(manifest.get("world_version", "0.0.0"))
-
-if apworlds:
-    # encapsulation for namespace / gc purposes
-    def load_apworlds() -> None:
-        global apworlds
-        from .Files import APWorldContainer, InvalidDataError
-        core_compatible: list[tuple[WorldSource, APWorldContainer]] = []
-
-        def fail_world(game_name: str, reason: str, add_as_failed_to_load: bool = True) -> None:
-            if add_as_failed_to_load:
-                failed_world_loads.append(game_name)
-            logging.warning(reason)
-
-        for apworld_source in apworlds:
-            apworld: APWorldContainer = APWorldContainer(apworld_source.resolved_path)
-            # populate metadata
-            try:
-                apworld.read()
-            except InvalidDataError as e:
-                if version_tuple < (0, 7, 0):
-                    logging.error(
-                        f"Invalid or missing manifest file for {apworld_source.resolved_path}. "
-                        "This apworld will stop working with Archipelago 0.7.0."
-                    )
-                    logging.error(e)
+            game = manifest.get("game")
+            if game in AutoWorldRegister.world_types:
+                AutoWorldRegister.world_types[game].world_version = tuplize_version(manifest.get("world_version", "0.0.0"))
+
+    if apworlds:
+        # encapsulation for namespace / gc purposes
+        def load_apworlds() -> None:
+            global apworlds
+            from .Files import APWorldContainer, InvalidDataError
+            core_compatible: list[tuple[WorldSource, APWorldContainer]] = []
+
+            def fail_world(game_name: str, reason: str, add_as_failed_to_load: bool = True) -> None:
+                if add_as_failed_to_load:
+                    failed_world_loads.append(game_name)
+                logging.warning(reason)
+
+            for apworld_source in apworlds:
+                apworld: APWorldContainer = APWorldContainer(apworld_source.resolved_path)
+                # populate metadata
+                try:
+                    apworld.read()
+                except InvalidDataError as e:
+                    if version_tuple < (0, 7, 0):
+                        logging.error(
+                            f"Invalid or missing manifest file for {apworld_source.resolved_path}. "
+                            "This apworld will stop working with Archipelago 0.7.0."
+                        )
+                        logging.error(e)
+                    else:
+                        raise e
+
+                if apworld.minimum_ap_version and apworld.minimum_ap_version > version_tuple:
+                    fail_world(apworld.game,
+                               f"Did not load {apworld_source.path} "
+                               f"as its minimum core version {apworld.minimum_ap_version} "
+                               f"is higher than current core version {version_tuple}.")
+                elif apworld.maximum_ap_version and apworld.maximum_ap_version < version_tuple:
+                    fail_world(apworld.game,
+                               f"Did not load {apworld_source.path} "
+                               f"as its maximum core version {apworld.maximum_ap_version} "
+                               f"is lower than current core version {version_tuple}.")
                 else:
-                    raise e
-
-            if apworld.minimum_ap_version and apworld.minimum_ap_version > version_tuple:
-                fail_world(apworld.game,
-                           f"Did not load {apworld_source.path} "
-                           f"as its minimum core version {apworld.minimum_ap_version} "
-                           f"is higher than current core version {version_tuple}.")
-            elif apworld.maximum_ap_version and apworld.maximum_ap_version < version_tuple:
-                fail_world(apworld.game,
-                           f"Did not load {apworld_source.path} "
-                           f"as its maximum core version {apworld.maximum_ap_version} "
-                           f"is lower than current core version {version_tuple}.")
-            else:
-                core_compatible.append((apworld_source, apworld))
-        # load highest version first
-        core_compatible.sort(
-            key=lambda element: element[1].world_version if element[1].world_version else Version(0, 0, 0),
-            reverse=True)
-
-        apworld_module_specs = {}
-        class APWorldModuleFinder(importlib.abc.MetaPathFinder):
-            def find_spec(
-                    self, fullname: str, _path: Sequence[str] | None, _target: ModuleType = None
-            ) -> importlib.machinery.ModuleSpec | None:
-                return apworld_module_specs.get(fullname)
+                    core_compatible.append((apworld_source, apworld))
+            # load highest version first
+            core_compatible.sort(
+                key=lambda element: element[1].world_version if element[1].world_version else Version(0, 0, 0),
+                reverse=True)
 
-        sys.meta_path.insert(0, APWorldModuleFinder())
+            for apworld_source, apworld in core_compatible:
+                if apworld.game and apworld.game in AutoWorldRegister.world_types:
+                    fail_world(apworld.game,
+                               f"Did not load {apworld_source.path} "
+                               f"as its game {apworld.game} is already loaded.",
+                               add_as_failed_to_load=False)
+                else:
+                    add_apworld_spec(apworld_source)
+                    apworld_source.load()
+                    if apworld.game in AutoWorldRegister.world_types:
+                        # world could fail to load at this point
+                        if apworld.world_version:
+                            AutoWorldRegister.world_types[apworld.game].world_version = apworld.world_version
+        load_apworlds()
+        del load_apworlds
 
-        for apworld_source, apworld in core_compatible:
-            if apworld.game and apworld.game in AutoWorldRegister.world_types:
-                fail_world(apworld.game,
-                           f"Did not load {apworld_source.path} "
-                           f"as its game {apworld.game} is already loaded.",
-                           add_as_failed_to_load=False)
-            else:
-                importer = zipimport.zipimporter(apworld_source.resolved_path)
-                world_name = Path(apworld.path).stem
-
-                spec = importer.find_spec(f"worlds.{world_name}")
-                apworld_module_specs[f"worlds.{world_name}"] = spec
-
-                apworld_source.load()
-                if apworld.game in AutoWorldRegister.world_types:
-                    # world could fail to load at this point
-                    if apworld.world_version:
-                        AutoWorldRegister.world_types[apworld.game].world_version = apworld.world_version
-    load_apworlds()
-    del load_apworlds
-
-del apworlds
-
-# Build the data package for each game.
-network_data_package: DataPackage = {
-    "games": {world_name: world.get_data_package_data() for world_name, world in AutoWorldRegister.world_types.items()},
-}
+    del apworlds
+
+    world_index = build_world_index()
+    # Build the data package for each game.
+    network_data_package = {
+        "games": {world_name: world.get_data_package_data()
+                  for world_name, world in AutoWorldRegister.world_types.items()},
+    }
+    if Utils.lazy_world_loading:
+        write_world_index()
 
+del cached_index
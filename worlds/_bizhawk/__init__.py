@@ -7,6 +7,7 @@ naively passed to BizHawk without validation or modification.
 
 import asyncio
 import base64
+import collections
 import enum
 import json
 import sys
@@ -43,50 +44,222 @@ class SyncError(Exception):
     pass
 
 
+class MemoryWatch:
+    """A range of memory the connector sends updates for whenever it changes, and its latest known data"""
+    watch_id: int
+    address: int
+    size: int
+    domain: str
+    data: bytearray
+
+    def __init__(self, watch_id: int, address: int, size: int, domain: str, data: bytes) -> None:
+        self.watch_id = watch_id
+        self.address = address
+        self.size = size
+        self.domain = domain
+        self.data = bytearray(data)
+
+    def covers(self, address: int, size: int, domain: str) -> bool:
+        return domain == self.domain and self.address <= address and address + size <= self.address + self.size
+
+    def get(self, address: int, size: int) -> bytes:
+        start = address - self.address
+        return bytes(self.data[start:start + size])
+
+    def update(self, address: int, data: bytes) -> None:
+        """Copies the part of `data` written at `address` that falls within this watch."""
+        start = max(address, self.address)
+        end = min(address + len(data), self.address + self.size)
+        if start < end:
+            self.data[start - self.address:end - self.address] = data[start - address:end - address]
+
+
 class BizHawkContext:
     streams: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None
     connection_status: ConnectionStatus
-    _lock: asyncio.Lock
     _port: int | None
+    _request_id: int
+    _pending_responses: dict[int, asyncio.Future[list[dict[str, Any]]]]
+    """Futures for the responses of messages in flight, by message id"""
+    _raw_responses: collections.deque[asyncio.Future[str]]
+    """Futures for the responses of messages that are not JSON, such as VERSION, in the order they were sent"""
+    _batch: list[tuple[list[dict[str, Any]], asyncio.Future[list[dict[str, Any]]]]] | None
+    """Requests to be sent as one message once the current iteration of the event loop is done"""
+    _batch_sender: asyncio.Task[None] | None
+    _receiver: asyncio.Task[None] | None
+    watches: dict[int, MemoryWatch]
+    """Watched memory by watch id, kept up to date by the connector"""
 
     def __init__(self) -> None:
         self.streams = None
         self.connection_status = ConnectionStatus.NOT_CONNECTED
-        self._lock = asyncio.Lock()
         self._port = None
+        self._request_id = 0
+        self._pending_responses = {}
+        self._raw_responses = collections.deque()
+        self._batch = None
+        self._batch_sender = None
+        self._receiver = None
+        self.watches = {}
+
+    def find_watch(self, address: int, size: int, domain: str) -> MemoryWatch | None:
+        """Returns a watch containing the whole range, if there is one."""
+        for memory_watch in self.watches.values():
+            if memory_watch.covers(address, size, domain):
+                return memory_watch
+        return None
+
+    async def _send_message(self, message: str) -> str:
+        """Sends a message that is not a list of requests, such as VERSION, and returns the response."""
+        if self.streams is None:
+            raise NotConnectedError("You tried to send a request before a connection to BizHawk was made")
+
+        await self._flush_batch()
+        response = asyncio.get_running_loop().create_future()
+        self._raw_responses.append(response)
+        self._write(message)
+        await self._drain()
+        return await self._wait_for_response(response)
+
+    async def _send_requests(self, requests: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Sends requests and returns their responses. Requests without guards that are made during the same iteration
+        of the event loop are sent together, as the connector skips every request after a failed guard in a message.
+        """
+        if self.streams is None:
+            raise NotConnectedError("You tried to send a request before a connection to BizHawk was made")
+        if not requests:
+            return []
+
+        if any(request["type"] == "GUARD" for request in requests):
+            await self._flush_batch()
+            response = self._write_requests(requests)
+            await self._drain()
+        else:
+            response = asyncio.get_running_loop().create_future()
+            if self._batch is None:
+                self._batch = []
+                self._batch_sender = asyncio.create_task(self._flush_batch(), name="BizHawkBatch")
+            self._batch.append((requests, response))
+        return await self._wait_for_response(response)
+
+    async def _flush_batch(self) -> None:
+        """Sends the requests collected in the current batch as one message."""
+        batch, self._batch = self._batch, None
+        if not batch:
+            return
+        if self.streams is None:
+            for _, response in batch:
+                if not response.done():
+                    response.set_exception(NotConnectedError("Connection to BizHawk was closed"))
+            return
+
+        def split_responses(combined_response: asyncio.Future[list[dict[str, Any]]]) -> None:
+            if combined_response.cancelled():
+                exception: BaseException | None = RequestFailedError("Request was cancelled")
+            else:
+                exception = combined_response.exception()
+            start = 0
+            for requests, response in batch:
+                if response.done():
+                    pass
+                elif exception is not None:
+                    response.set_exception(exception)
+                else:
+                    response.set_result(combined_response.result()[start:start + len(requests)])
+                start += len(requests)
+
+        self._write_requests([request for requests, _ in batch for request in requests]) \
+            .add_done_callback(split_responses)
+        await self._drain()
+
+    def _write_requests(self, requests: list[dict[str, Any]]) -> asyncio.Future[list[dict[str, Any]]]:
+        """Sends a message with the requests and returns a future for their responses."""
+        self._request_id += 1
+        response = asyncio.get_running_loop().create_future()
+        self._pending_responses[self._request_id] = response
+        self._write(json.dumps({"id": self._request_id, "requests": requests}))
+        return response
+
+    def _write(self, message: str) -> None:
+        assert self.streams is not None
+        reader, writer = self.streams
+        if self._receiver is None:
+            self._receiver = asyncio.create_task(self._receive(reader), name="BizHawkReceiver")
+        writer.write(message.encode("utf-8") + b"\n")
+
+    async def _drain(self) -> None:
+        """Waits until the written messages fit the buffer of the connection again, in case BizHawk stopped reading."""
+        if self.streams is None:
+            return
+        try:
+            await self.streams[1].drain()
+        except ConnectionError:
+            self._close(RequestFailedError("Connection reset"))
 
-    async def _send_message(self, message: str):
-        async with self._lock:
-            if self.streams is None:
-                raise NotConnectedError("You tried to send a request before a connection to BizHawk was made")
-
-            try:
-                reader, writer = self.streams
-                writer.write(message.encode("utf-8") + b"\n")
-                await asyncio.wait_for(writer.drain(), timeout=5)
+    async def _wait_for_response(self, response: asyncio.Future[Any]) -> Any:
+        try:
+            return await asyncio.wait_for(response, timeout=5)
+        except asyncio.TimeoutError as exc:
+            self._close(RequestFailedError("Connection timed out"))
+            raise RequestFailedError("Connection timed out") from exc
 
-                res = await asyncio.wait_for(reader.readline(), timeout=5)
+    async def _receive(self, reader: asyncio.StreamReader) -> None:
+        """Matches responses from the connector to the messages in flight until the connection is closed."""
+        try:
+            while True:
+                res = await reader.readline()
 
                 if res == b"":
-                    writer.close()
-                    self.streams = None
-                    self.connection_status = ConnectionStatus.NOT_CONNECTED
-                    raise RequestFailedError("Connection closed")
+                    self._close(RequestFailedError("Connection closed"))
+                    return
 
                 if self.connection_status == ConnectionStatus.TENTATIVE:
                     self.connection_status = ConnectionStatus.CONNECTED
 
-                return res.decode("utf-8")
-            except asyncio.TimeoutError as exc:
-                writer.close()
-                self.streams = None
-                self.connection_status = ConnectionStatus.NOT_CONNECTED
-                raise RequestFailedError("Connection timed out") from exc
-            except ConnectionResetError as exc:
-                writer.close()
-                self.streams = None
-                self.connection_status = ConnectionStatus.NOT_CONNECTED
-                raise RequestFailedError("Connection reset") from exc
+                if res.startswith(b"{"):
+                    message = json.loads(res)
+                    if "watches" in message:
+                        self._update_watches(message["watches"])
+                        continue
+                    response = self._pending_responses.pop(message["id"], None)
+                    if response is not None and not response.done():
+                        response.set_result(message["responses"])
+                elif self._raw_responses:
+                    raw_response = self._raw_responses.popleft()
+                    if not raw_response.done():
+                        raw_response.set_result(res.decode("utf-8"))
+        except ConnectionResetError:
+            self._close(RequestFailedError("Connection reset"))
+        except Exception as exc:
+            self._close(RequestFailedError(f"Invalid response: {exc}"))
+
+    def _update_watches(self, updates: list[dict[str, Any]]) -> None:
+        """Applies the changes the connector found in watched memory at the end of a frame."""
+        for update in updates:
+            memory_watch = self.watches.get(update["id"])
+            if memory_watch is not None:
+                memory_watch.update(memory_watch.address + update["offset"], base64.b64decode(update["value"]))
+
+    def _close(self, exception: Exception) -> None:
+        """Closes the connection and fails every message in flight with exception."""
+        if self.streams is not None:
+            self.streams[1].close()
+            self.streams = None
+        self.connection_status = ConnectionStatus.NOT_CONNECTED
+        if self._receiver is not None and self._receiver is not asyncio.current_task():
+            self._receiver.cancel()
+        self._receiver = None
+        responses = [*self._pending_responses.values(), *self._raw_responses]
+        if self._batch:
+            responses.extend(response for _, response in self._batch)
+        self._pending_responses.clear()
+        self._raw_responses.clear()
+        self._batch = None
+        self.watches.clear()
+        for response in responses:
+            if not response.done():
+                response.set_exception(exception)
 
 
 async def connect(ctx: BizHawkContext) -> bool:
@@ -112,10 +285,7 @@ async def connect(ctx: BizHawkContext) -> bool:
 
 def disconnect(ctx: BizHawkContext) -> None:
     """Closes the connection to the connector script."""
-    if ctx.streams is not None:
-        ctx.streams[1].close()
-        ctx.streams = None
-    ctx.connection_status = ConnectionStatus.NOT_CONNECTED
+    ctx._close(NotConnectedError("Disconnected from BizHawk"))
 
 
 async def get_script_version(ctx: BizHawkContext) -> int:
@@ -126,7 +296,7 @@ async def send_requests(ctx: BizHawkContext, req_list: list[dict[str, Any]]) ->
     """Sends a list of requests to the BizHawk connector and returns their responses.
 
     It's likely you want to use the wrapper functions instead of this."""
-    responses = json.loads(await ctx._send_message(json.dumps(req_list)))
+    responses = await ctx._send_requests(req_list)
     errors: list[ConnectorError] = []
 
     for response in responses:
@@ -249,7 +419,19 @@ async def guarded_read(ctx: BizHawkContext, read_list: Sequence[tuple[int, int,
     - `domain` is the name of the region of memory the address corresponds to
 
     Returns None if any item in guard_list failed to validate. Otherwise returns a list of bytes in the order they
-    were requested."""
+    were requested.
+
+    If every item in both lists is within a watched range, see `watch`, the data is taken from the watches without a
+    request to the connector."""
+    watched_guards = [ctx.find_watch(address, len(expected_data), domain)
+                      for address, expected_data, domain in guard_list]
+    watched_reads = [ctx.find_watch(address, size, domain) for address, size, domain in read_list]
+    if all(watched_guards) and all(watched_reads):
+        for memory_watch, (address, expected_data, _) in zip(watched_guards, guard_list):
+            if memory_watch.get(address, len(expected_data)) != bytes(expected_data):
+                return None
+        return [memory_watch.get(address, size) for memory_watch, (address, size, _) in zip(watched_reads, read_list)]
+
     res = await send_requests(ctx, [{
         "type": "GUARD",
         "address": address,
@@ -323,6 +505,12 @@ async def guarded_write(ctx: BizHawkContext, write_list: Sequence[tuple[int, Seq
             if item["type"] != "WRITE_RESPONSE":
                 raise SyncError(f"Expected response of type WRITE_RESPONSE or GUARD_RESPONSE but got {item['type']}")
 
+    # The connector only sends changes to watches at the end of the frame, so later reads see the write right away
+    for address, value, domain in write_list:
+        for memory_watch in ctx.watches.values():
+            if memory_watch.domain == domain:
+                memory_watch.update(address, bytes(value))
+
     return True
 
 
@@ -334,3 +522,45 @@ async def write(ctx: BizHawkContext, write_list: Sequence[tuple[int, Sequence[in
     - `value` is a list of bytes to write, in order, starting at `address`
     - `domain` is the name of the region of memory the address corresponds to"""
     await guarded_write(ctx, write_list, [])
+
+
+async def watch(ctx: BizHawkContext, watch_list: Sequence[tuple[int, int, str]]) -> None:
+    """Asks the connector to send updates for 1 or more ranges of memory whenever their data changes. Reads within a
+    watched range are then answered from the latest update instead of being sent to the connector, which is much cheaper
+    for memory that is checked often but changes rarely.
+
+    Items in `watch_list` should be organized `(address, size, domain)` where
+    - `address` is the address of the first byte of data
+    - `size` is the number of bytes to watch
+    - `domain` is the name of the region of memory the address corresponds to
+
+    Ranges that are already watched are skipped. Watches are dropped when the connection is closed."""
+    watch_list = [(address, size, domain) for address, size, domain in watch_list
+                  if ctx.find_watch(address, size, domain) is None]
+    res = await send_requests(ctx, [{
+        "type": "WATCH",
+        "address": address,
+        "size": size,
+        "domain": domain
+    } for address, size, domain in watch_list])
+
+    for item, (address, size, domain) in zip(res, watch_list):
+        if item["type"] != "WATCH_RESPONSE":
+            raise SyncError(f"Expected response of type WATCH_RESPONSE but got {item['type']}")
+
+        ctx.watches[item["id"]] = MemoryWatch(item["id"], address, size, domain, base64.b64decode(item["value"]))
+
+
+async def unwatch(ctx: BizHawkContext, watch_list: Sequence[tuple[int, int, str]]) -> None:
+    """Stops watching 1 or more ranges of memory. See `watch` for the organization of items in `watch_list`, which have
+    to match a watched range exactly."""
+    watch_ids = [memory_watch.watch_id for memory_watch in list(ctx.watches.values())
+                 if (memory_watch.address, memory_watch.size, memory_watch.domain) in watch_list]
+    for watch_id in watch_ids:
+        del ctx.watches[watch_id]
+
+    res = await send_requests(ctx, [{"type": "UNWATCH", "id": watch_id} for watch_id in watch_ids])
+
+    for item in res:
+        if item["type"] != "UNWATCH_RESPONSE":
+            raise SyncError(f"Expected response of type UNWATCH_RESPONSE but got {item['type']}")
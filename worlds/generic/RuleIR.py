@@ -0,0 +1,364 @@
+"""
+A small declarative representation of access rules.
+
+Unlike lambdas, rules built from these classes can be inspected, compared and combined by the core. They can be used
+as Location and Entrance access rules directly. RuleCompiler simplifies them, interns identical subrules across a world
+and caches the results of subrules that only look up a single player's items.
+"""
+from __future__ import annotations
+
+import typing
+
+from BaseClasses import CollectionState, Entrance, Location, TrackingCounter
+
+ItemDependencies = typing.FrozenSet[typing.Tuple[str, int]]
+"""(item name, player) pairs"""
+RegionDependencies = typing.FrozenSet[typing.Tuple[str, int]]
+"""(region name, player) pairs"""
+
+
+class Rule:
+    """Base class of all rules. Rules compare equal if they are of the same class and have the same contents."""
+    __slots__ = ()
+
+    def __call__(self, state: CollectionState) -> bool:
+        raise NotImplementedError
+
+    def __and__(self, other: Rule) -> Rule:
+        return And(self, other)
+
+    def __or__(self, other: Rule) -> Rule:
+        return Or(self, other)
+
+    def key(self) -> typing.Tuple[typing.Any, ...]:
+        """Returns the contents this rule is compared and hashed by."""
+        raise NotImplementedError
+
+    def item_dependencies(self) -> ItemDependencies:
+        """Returns the items this rule looks up."""
+        return frozenset()
+
+    def region_dependencies(self) -> RegionDependencies:
+        """Returns the regions whose reachability this rule checks."""
+        return frozenset()
+
+    def __eq__(self, other: object) -> bool:
+        return self is other or (self.__class__ is other.__class__ and self.key() == other.key())  # type: ignore
+
+    def __hash__(self) -> int:
+        return hash((self.__class__, self.key()))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}{self.key()!r}"
+
+
+class True_(Rule):  # noqa
+    __slots__ = ()
+    _instance: typing.ClassVar[typing.Optional[True_]] = None
+
+    def __new__(cls) -> True_:
+        # only a single instance is ever created
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __call__(self, state: CollectionState) -> bool:
+        return True
+
+    def key(self) -> typing.Tuple[typing.Any, ...]:
+        return ()
+
+
+class False_(Rule):  # noqa
+    __slots__ = ()
+    _instance: typing.ClassVar[typing.Optional[False_]] = None
+
+    def __new__(cls) -> False_:
+        # only a single instance is ever created
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __call__(self, state: CollectionState) -> bool:
+        return False
+
+    def key(self) -> typing.Tuple[typing.Any, ...]:
+        return ()
+
+
+true_ = True_()
+false_ = False_()
+
+
+class Has(Rule):
+    __slots__ = ("item", "player", "count")
+
+    item: str
+    player: int
+    count: int
+
+    def __init__(self, item: str, player: int, count: int = 1) -> None:
+        self.item = item
+        self.player = player
+        self.count = count
+
+    def __call__(self, state: CollectionState) -> bool:
+        return state.prog_items[self.player][self.item] >= self.count
+
+    def key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.item, self.player, self.count
+
+    def item_dependencies(self) -> ItemDependencies:
+        return frozenset(((self.item, self.player),))
+
+
+class _ItemsRule(Rule):
+    __slots__ = ("items", "player")
+
+    items: typing.Tuple[str, ...]
+    player: int
+
+    def __init__(self, items: typing.Iterable[str], player: int) -> None:
+        self.items = tuple(items)
+        self.player = player
+
+    def key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.items, self.player
+
+    def item_dependencies(self) -> ItemDependencies:
+        return frozenset((item, self.player) for item in self.items)
+
+
+class HasAll(_ItemsRule):
+    __slots__ = ()
+
+    def __call__(self, state: CollectionState) -> bool:
+        return state.has_all(self.items, self.player)
+
+
+class HasAny(_ItemsRule):
+    __slots__ = ()
+
+    def __call__(self, state: CollectionState) -> bool:
+        return state.has_any(self.items, self.player)
+
+
+class Count(_ItemsRule):
+    """True if the state holds at least `count` of the items combined."""
+    __slots__ = ("count",)
+
+    count: int
+
+    def __init__(self, items: typing.Iterable[str], player: int, count: int) -> None:
+        super().__init__(items, player)
+        self.count = count
+
+    def __call__(self, state: CollectionState) -> bool:
+        return state.has_from_list(self.items, self.player, self.count)
+
+    def key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.items, self.player, self.count
+
+
+class CanReachRegion(Rule):
+    __slots__ = ("region", "player")
+
+    region: str
+    player: int
+
+    def __init__(self, region: str, player: int) -> None:
+        self.region = region
+        self.player = player
+
+    def __call__(self, state: CollectionState) -> bool:
+        return state.can_reach_region(self.region, self.player)
+
+    def key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.region, self.player
+
+    def region_dependencies(self) -> RegionDependencies:
+        return frozenset(((self.region, self.player),))
+
+
+class _AggregateRule(Rule):
+    __slots__ = ("rules", "cache_player", "cache_items", "cache_generation", "cache_value", "_hash")
+
+    rules: typing.Tuple[Rule, ...]
+    cache_player: typing.Optional[int]
+    """set by RuleCompiler if the result only depends on this player's items"""
+    cache_items: typing.FrozenSet[str]
+    """the cache_player's item names this rule looks up"""
+    cache_generation: int
+    """CollectionState.item_generations of the cache_player when cache_value was evaluated"""
+    cache_value: bool
+
+    def __init__(self, *rules: Rule) -> None:
+        self.rules = rules
+        self.cache_player = None
+        self.cache_generation = -1
+        self._hash = None
+
+    def __call__(self, state: CollectionState) -> bool:
+        player = self.cache_player
+        if player is None:
+            return self.evaluate(state)
+        generation = state.item_generations[player]
+        if generation == self.cache_generation:
+            # incremental reachability has to learn about the lookups skipped by the cache
+            prog_items = state.prog_items[player]
+            if isinstance(prog_items, TrackingCounter) and prog_items.reads is not None:
+                prog_items.reads.update(self.cache_items)
+            return self.cache_value
+        value = self.cache_value = self.evaluate(state)
+        self.cache_generation = generation
+        return value
+
+    def evaluate(self, state: CollectionState) -> bool:
+        raise NotImplementedError
+
+    def key(self) -> typing.Tuple[typing.Any, ...]:
+        return self.rules
+
+    def __hash__(self) -> int:
+        # subrules are hashed again for each enclosing rule while compiling, so the hash is kept
+        if self._hash is None:
+            self._hash = hash((self.__class__, self.rules))
+        return self._hash
+
+    def item_dependencies(self) -> ItemDependencies:
+        return frozenset().union(*(rule.item_dependencies() for rule in self.rules))
+
+    def region_dependencies(self) -> RegionDependencies:
+        return frozenset().union(*(rule.region_dependencies() for rule in self.rules))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}{self.rules!r}"
+
+
+class And(_AggregateRule):
+    __slots__ = ()
+
+    def evaluate(self, state: CollectionState) -> bool:
+        for rule in self.rules:
+            if not rule(state):
+                return False
+        return True
+
+
+class Or(_AggregateRule):
+    __slots__ = ()
+
+    def evaluate(self, state: CollectionState) -> bool:
+        for rule in self.rules:
+            if rule(state):
+                return True
+        return False
+
+
+class RuleCompiler:
+    """
+    Simplifies rules and interns identical subrules, so that each distinct subrule of a world exists and caches its
+    result only once. Intended to be created once per World and used for all of its rules.
+
+    Cached results rely on CollectionState.item_generations, so while compiled rules are in use, prog_items may only be
+    changed through CollectionState's methods.
+    """
+    interned: typing.Dict[Rule, Rule]
+    """compiled rule -> the one instance of it"""
+    compiled: typing.Dict[Rule, Rule]
+    """rule -> its compiled rule"""
+
+    def __init__(self) -> None:
+        self.interned = {}
+        self.compiled = {}
+
+    def compile(self, rule: Rule) -> Rule:
+        try:
+            return self.compiled[rule]
+        except KeyError:
+            pass
+        simplified = self._simplify(rule)
+        compiled = self.interned.setdefault(simplified, simplified)
+        self.compiled[rule] = compiled
+        return compiled
+
+    def _simplify(self, rule: Rule) -> Rule:
+        if isinstance(rule, And):
+            return self._simplify_aggregate(rule, And, HasAll, true_, false_)
+        if isinstance(rule, Or):
+            return self._simplify_aggregate(rule, Or, HasAny, false_, true_)
+        if isinstance(rule, Has):
+            return true_ if rule.count <= 0 else rule
+        if isinstance(rule, HasAll):
+            items = tuple(dict.fromkeys(rule.items))
+            if not items:
+                return true_
+            return Has(items[0], rule.player) if len(items) == 1 else HasAll(items, rule.player)
+        if isinstance(rule, HasAny):
+            items = tuple(dict.fromkeys(rule.items))
+            if not items:
+                return false_
+            return Has(items[0], rule.player) if len(items) == 1 else HasAny(items, rule.player)
+        if isinstance(rule, Count):
+            if rule.count <= 0:
+                return true_
+            if rule.count == 1:
+                return self._simplify(HasAny(rule.items, rule.player))
+            if not rule.items:
+                return false_
+        return rule
+
+    def _simplify_aggregate(self, rule: _AggregateRule, aggregate_type: typing.Type[_AggregateRule],
+                            items_type: typing.Type[_ItemsRule], identity: Rule, complement: Rule) -> Rule:
+        # flatten nested rules of the same type and drop identities
+        rules: typing.List[Rule] = []
+        for subrule in rule.rules:
+            subrule = self.compile(subrule)
+            if subrule is complement:
+                return complement
+            if subrule.__class__ is aggregate_type:
+                rules.extend(subrule.rules)  # type: ignore
+            elif subrule is not identity:
+                rules.append(subrule)
+
+        # merge single item lookups of the same player into one HasAll/HasAny, at the position of the first one
+        merged_items: typing.Dict[int, typing.Dict[str, None]] = {}
+        positions: typing.Dict[int, int] = {}
+        result: typing.List[Rule] = []
+        for subrule in rules:
+            if subrule.__class__ is Has and subrule.count == 1:  # type: ignore
+                items: typing.Iterable[str] = (subrule.item,)  # type: ignore
+            elif subrule.__class__ is items_type:
+                items = subrule.items  # type: ignore
+            else:
+                result.append(subrule)
+                continue
+            player: int = subrule.player  # type: ignore
+            if player in merged_items:
+                merged_items[player].update(dict.fromkeys(items))
+            else:
+                merged_items[player] = dict.fromkeys(items)
+                positions[player] = len(result)
+                result.append(subrule)
+        for player, position in positions.items():
+            result[position] = self.compile(items_type(merged_items[player], player))
+
+        result = list(dict.fromkeys(result))
+        if not result:
+            return identity
+        if len(result) == 1:
+            return result[0]
+        compiled = aggregate_type(*result)
+        item_dependencies = compiled.item_dependencies()
+        players = {player for _, player in item_dependencies}
+        if len(players) == 1 and not compiled.region_dependencies():
+            compiled.cache_player = players.pop()
+            compiled.cache_items = frozenset(item for item, _ in item_dependencies)
+        return compiled
+
+
+def get_item_dependencies(spot: typing.Union[Location, Entrance]) -> typing.Optional[ItemDependencies]:
+    """Returns the items the access rule of `spot` looks up, or None if it is not a Rule and can't be inspected."""
+    if isinstance(spot.access_rule, Rule):
+        return spot.access_rule.item_dependencies()
+    return None